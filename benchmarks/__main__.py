@@ -0,0 +1,126 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+
+from benchmarks.corpus import CORPORA, generate
+from benchmarks.runner import TARGETS, run_isolated
+
+_DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser("benchmarks", description="Measure the throughput of cmakelint")
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale the size of the corpora by this factor")
+    parser.add_argument("--corpus-dir", default=os.path.join("tmp", "benchmarks"), help="Where to generate corpora")
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA), help="Only run these corpora")
+    parser.add_argument("--target", action="append", choices=list(TARGETS), help="Only run these targets")
+    parser.add_argument("--repeat", type=int, default=3, help="Keep the best of N runs of each target")
+    parser.add_argument("--rules", action="store_true", help="Also report the time spent in each rule and phase")
+    parser.add_argument("--save", metavar="FILE", nargs="?", const=_DEFAULT_BASELINE, help="Save the results")
+    parser.add_argument(
+        "--check",
+        metavar="FILE",
+        nargs="?",
+        const=_DEFAULT_BASELINE,
+        help="Fail if lines/sec regressed beyond --tolerance compared to the results saved in FILE",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown, 0.2 by default")
+    return parser.parse_args(argv)
+
+
+def _format_rss(rss):
+    return "-" if rss is None else f"{rss / (1024 * 1024):.0f} MB"
+
+
+def run(args):
+    results = {}
+    print(f"{'target':<16}{'corpus':<14}{'files/sec':>12}{'lines/sec':>14}{'peak RSS':>10}")
+    for corpus in args.corpus or list(CORPORA):
+        manifest = generate(corpus, args.corpus_dir, args.scale)
+        manifest_path = os.path.join(manifest["directory"], "manifest.json")
+        for target in args.target or list(TARGETS):
+            result = run_isolated(target, manifest_path, str(args.repeat))
+            results[f"{target}/{corpus}"] = result
+            print(
+                f"{target:<16}{corpus:<14}{result['files_per_sec']:>12,.1f}{result['lines_per_sec']:>14,.0f}"
+                f"{_format_rss(result['peak_rss']):>10}"
+            )
+        if args.rules:
+            timings = run_isolated("rules", manifest_path)
+            total = sum(timings.values())
+            print(f"  time per rule and phase on {corpus}:")
+            for name, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+                print(f"    {name:<26}{seconds * 1000:>10.1f} ms{100 * seconds / total:>7.1f}%")
+    return results
+
+
+def check(results, baseline, tolerance):
+    """
+    Return the messages of the results slower than the baseline by more
+    than tolerance.
+    """
+    regressions = []
+    for key, result in results.items():
+        expected = baseline["results"].get(key)
+        if expected is None:
+            continue
+        ratio = result["lines_per_sec"] / expected["lines_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{key}: {result['lines_per_sec']:,.0f} lines/sec, "
+                f"{100 * (1 - ratio):.0f}% slower than the baseline {expected['lines_per_sec']:,.0f}"
+            )
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    results = run(args)
+    if args.save:
+        baseline = {
+            "scale": args.scale,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": {
+                key: {"files_per_sec": result["files_per_sec"], "lines_per_sec": result["lines_per_sec"]}
+                for key, result in results.items()
+            },
+        }
+        with open(args.save, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+        if baseline["scale"] != args.scale:
+            sys.stderr.write(f"The baseline was measured at scale {baseline['scale']}, not {args.scale}\n")
+            return 2
+        regressions = check(results, baseline, args.tolerance)
+        for regression in regressions:
+            sys.stderr.write(f"Regression: {regression}\n")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
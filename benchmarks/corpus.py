@@ -0,0 +1,175 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+
+# Bump when the generated files change, so that stale corpora are rebuilt.
+_CORPUS_VERSION = 1
+_MANIFEST = "manifest.json"
+
+_COMMANDS = ["set", "list", "message", "add_library", "target_link_libraries", "add_definitions", "install"]
+_WORDS = ["foo", "BAR", "${SRC}", "PRIVATE", "PUBLIC", "value", "$<TARGET_FILE:foo>", "-DFOO=1", "lib/path.cc"]
+
+
+def _args(rng, count):
+    return " ".join(rng.choice(_WORDS) for _ in range(count))
+
+
+def _command(rng, indent=0):
+    return " " * indent + f"{rng.choice(_COMMANDS)}({_args(rng, rng.randint(1, 6))})"
+
+
+def _block(rng, depth=0):
+    """
+    A few commands, some of them in an if() block, some spanning several
+    lines, with a sprinkling of style issues.
+    """
+    indent = 2 * depth
+    lines = []
+    for _ in range(rng.randint(2, 6)):
+        kind = rng.random()
+        if kind < 0.15 and depth < 3:
+            lines.append(" " * indent + f"if({rng.choice(_WORDS)})")
+            lines.extend(_block(rng, depth + 1))
+            lines.append(" " * indent + rng.choice(["endif()", "endif(foo)", "ENDIF()"]))
+        elif kind < 0.35:
+            lines.append(" " * indent + f"{rng.choice(_COMMANDS)}(")
+            lines.extend(" " * (indent + 2) + _args(rng, rng.randint(1, 4)) for _ in range(rng.randint(1, 5)))
+            lines.append(" " * indent + ")")
+        elif kind < 0.45:
+            lines.append(_command(rng, indent) + rng.choice([" ", "\t", "", ""]) + f"# {_args(rng, 3)}")
+        else:
+            lines.append(_command(rng, indent + rng.choice([0, 0, 0, 1])))
+    return lines
+
+
+def _lines_small(rng):
+    lines = [f"project({rng.choice(_WORDS)})"]
+    while len(lines) < 30:
+        lines.extend(_block(rng))
+    return lines
+
+
+def _lines_large(rng, num_lines):
+    lines = []
+    while len(lines) < num_lines:
+        lines.extend(_block(rng))
+    return lines[:num_lines]
+
+
+def _lines_nested(rng, num_lines):
+    """
+    Commands spanning many lines with deeply nested generator expressions.
+    """
+    lines = []
+    while len(lines) < num_lines:
+        depth = rng.randint(5, 40)
+        lines.append(f"target_compile_options({rng.choice(_WORDS)} PRIVATE")
+        for level in range(depth):
+            lines.append("  " * (level + 1) + f"$<$<CONFIG:{rng.choice(_WORDS)}>:{_args(rng, 2)}")
+        for level in reversed(range(depth)):
+            lines.append("  " * (level + 1) + ">")
+        lines.append(")")
+    return lines[:num_lines]
+
+
+def _lines_comments(rng, num_lines):
+    lines = []
+    while len(lines) < num_lines:
+        kind = rng.random()
+        if kind < 0.6:
+            lines.append(f"# {_args(rng, rng.randint(3, 12))}")
+        elif kind < 0.8:
+            lines.append(_command(rng) + f" # {_args(rng, 4)} # {_args(rng, 2)}")
+        else:
+            lines.append(_command(rng))
+    return lines
+
+
+def _lines_quotes(rng, num_lines):
+    lines = []
+    while len(lines) < num_lines:
+        kind = rng.random()
+        if kind < 0.4:
+            lines.append(f'message(STATUS "{_args(rng, 4)} \\"{rng.choice(_WORDS)}\\" # not a comment")')
+        elif kind < 0.6:
+            lines.append(f'set(VAR "{_args(rng, 3)}')
+            lines.extend(f"  {_args(rng, 3)} ( ) #" for _ in range(rng.randint(1, 4)))
+            lines.append(f'{_args(rng, 2)}")')
+        else:
+            lines.append(f'{rng.choice(_COMMANDS)}("{_args(rng, 2)}" "{_args(rng, 2)}" {_args(rng, 2)})')
+    return lines
+
+
+def _write(path, lines):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return {"path": path, "lines": len(lines)}
+
+
+def _generate_small_files(rng, directory, scale):
+    files = []
+    num_files = max(1, int(10000 * scale))
+    for i in range(num_files):
+        name = "CMakeLists.txt" if i % 3 == 0 else f"module{i}.cmake"
+        files.append(_write(os.path.join(directory, f"dir{i // 100}", f"sub{i}", name), _lines_small(rng)))
+    return files
+
+
+def _generate_single(make_lines, num_lines):
+    def generate(rng, directory, scale):
+        lines = make_lines(rng, max(100, int(num_lines * scale)))
+        return [_write(os.path.join(directory, "CMakeLists.txt"), lines)]
+
+    return generate
+
+
+CORPORA = {
+    "small-files": _generate_small_files,
+    "huge-file": _generate_single(_lines_large, 1000000),
+    "nested": _generate_single(_lines_nested, 200000),
+    "comments": _generate_single(_lines_comments, 200000),
+    "quotes": _generate_single(_lines_quotes, 200000),
+}
+
+
+def generate(name, directory, scale=1.0, seed=0):
+    """
+    Generate the corpus name into directory, unless it is already there for
+    the same scale and seed, and return its manifest: the list of files with
+    their number of lines. At scale 1, small-files holds 10000 files of a few
+    dozen lines and huge-file a single file of a million lines.
+    """
+    directory = os.path.join(directory, name)
+    manifest_path = os.path.join(directory, _MANIFEST)
+    key = {"version": _CORPUS_VERSION, "scale": scale, "seed": seed}
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest["key"] == key:
+            return manifest
+    except (OSError, ValueError, KeyError):
+        pass
+    rng = random.Random(f"{name}-{seed}")
+    files = CORPORA[name](rng, directory, scale)
+    manifest = {"key": key, "directory": directory, "files": files}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f)
+    return manifest
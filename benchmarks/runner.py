@@ -0,0 +1,178 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+from cmakelint.__main__ import main
+from cmakelint.lint import CleansedLines, Linter, clean_comments, process_file
+from cmakelint.profile import Profile
+from cmakelint.state import LINT_STATE, _CMakeLintState
+
+
+def _peak_rss():
+    """
+    Peak resident set size of this process in bytes, None if unknown.
+    """
+    # ru_maxrss survives fork and exec on Linux, so it would report the peak
+    # of the parent when that is higher; VmHWM is reset by exec.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+@contextlib.contextmanager
+def _quiet():
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        yield
+
+
+def _read_lines(filenames):
+    lines = []
+    for filename in filenames:
+        with open(filename) as f:
+            lines.append(["# Lines start at 1", *f.read().splitlines(), "# Lines end here"])
+    return lines
+
+
+def _prepare_main(manifest, filenames):
+    argv = ["cmakelint", "--quiet", "--config=None", manifest["directory"]]
+
+    def run():
+        LINT_STATE.reset()
+        sys.argv = argv
+        with _quiet():
+            main()
+
+    return run
+
+
+def _prepare_process_file(manifest, filenames):
+    def run():
+        LINT_STATE.reset()
+        with _quiet():
+            for filename in filenames:
+                process_file(filename)
+
+    return run
+
+
+def _prepare_cleansed_lines(manifest, filenames):
+    files = _read_lines(filenames)
+
+    def run():
+        for lines in files:
+            CleansedLines(lines)
+
+    return run
+
+
+def _prepare_clean_comments(manifest, filenames):
+    files = _read_lines(filenames)
+
+    def run():
+        for lines in files:
+            quote = False
+            for line in lines:
+                _, quote = clean_comments(line, quote)
+
+    return run
+
+
+TARGETS = {
+    "main": _prepare_main,
+    "process_file": _prepare_process_file,
+    "CleansedLines": _prepare_cleansed_lines,
+    "clean_comments": _prepare_clean_comments,
+}
+
+
+def _load_manifest(manifest_path):
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    return manifest, [entry["path"] for entry in manifest["files"]]
+
+
+def measure(target, manifest_path, repeat):
+    """
+    Run target over the corpus of manifest_path repeat times and return the
+    best time, with the throughput and the peak RSS of the process.
+    """
+    manifest, filenames = _load_manifest(manifest_path)
+    run = TARGETS[target](manifest, filenames)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    num_lines = sum(entry["lines"] for entry in manifest["files"])
+    return {
+        "seconds": best,
+        "files_per_sec": len(filenames) / best,
+        "lines_per_sec": num_lines / best,
+        "peak_rss": _peak_rss(),
+    }
+
+
+def measure_rules(manifest_path):
+    """
+    Lint the corpus of manifest_path with profiling, and return the seconds
+    spent in each rule and phase.
+    """
+    manifest, filenames = _load_manifest(manifest_path)
+    profile = Profile()
+    linter = Linter(_CMakeLintState(), profile)
+    for filename in filenames:
+        linter.run_file(filename)
+    return {name: seconds for name, (calls, seconds, diagnostics) in profile.stats.items()}
+
+
+def run_isolated(*args):
+    """
+    Run a measurement in a fresh interpreter, so that each one gets its own
+    peak RSS and none pays for the imports or garbage of another.
+    """
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.runner", *args],
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+if __name__ == "__main__":
+    if sys.argv[1] == "rules":
+        result = measure_rules(sys.argv[2])
+    else:
+        result = measure(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    json.dump(result, sys.stdout)
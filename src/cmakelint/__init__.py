@@ -15,8 +15,18 @@ the License.
 
 from __future__ import annotations
 
-from . import cli as cli
-from . import error_code as error_code
-from . import lint as lint
-from . import rules as rules
-from . import state as state
+import importlib
+
+# Submodules are imported on first access, so that importing cmakelint does
+# not pull in argparse or the engine until they are used.
+_SUBMODULES = frozenset(["cli", "error_code", "lint", "rules", "state"])
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_SUBMODULES])
@@ -15,26 +15,146 @@ the License.
 
 from __future__ import annotations
 
+import itertools
 import sys
 
-from cmakelint.cli import parse_args
-from cmakelint.error_code import ERROR_CODE_FOUND_ISSUE
-from cmakelint.lint import process_file
-from cmakelint.state import LINT_STATE
 
+def run(argv, load_options=None, memory=None, resolver=None):
+    """
+    Lint as told by the command line argv and return the exit status.
+    load_options, memory and resolver are the option file loader, the
+    MemoryCache of results and the ConfigResolver of the daemon, if run by
+    it.
+    """
+    # Imported here so that --client does not import the engine.
+    from cmakelint.cli import parse_args
+    from cmakelint.config import ConfigError, load_option_file
+    from cmakelint.discovery import discover, read_file_list
+    from cmakelint.error_code import ERROR_CODE_FOUND_ISSUE, ERROR_CODE_WRONG_USAGE
+    from cmakelint.output import open_sink
+    from cmakelint.parallel import lint_files, lint_stdin
+    from cmakelint.profile import Profile
+    from cmakelint.state import LINT_STATE
 
-def main():
-    files = parse_args(sys.argv[1:])
+    files = parse_args(argv, load_options or load_option_file)
+    if LINT_STATE.daemon:
+        from cmakelint.daemon import serve
+
+        return serve(LINT_STATE.socket)
+    if LINT_STATE.lsp:
+        from cmakelint.lsp import serve
+
+        return serve(LINT_STATE)
+
+    if LINT_STATE.files_from is not None:
+        files = itertools.chain(files, read_file_list(LINT_STATE.files_from, LINT_STATE.null))
+    changes = None
+    if LINT_STATE.diff_base is not None:
+        from cmakelint.gitdiff import GitError, changed_files
+        from cmakelint.lint import is_valid_file
+
+        try:
+            changes = changed_files(LINT_STATE.diff_base, files)
+        except GitError as e:
+            sys.stderr.write(f"cmakelint: error: {e}\n")
+            return ERROR_CODE_WRONG_USAGE
+        files = [filename for filename in changes if is_valid_file(filename)]
+    else:
+        files = discover(files, LINT_STATE.excludes)
+    profile = Profile() if LINT_STATE.profile_rules else None
+    fixed = 0
+    projects = []
+    baseline = None
+    baselined = 0
+    if LINT_STATE.baseline is not None:
+        from cmakelint.baseline import Baseline
+
+        try:
+            baseline = Baseline.load(LINT_STATE.baseline, LINT_STATE.update_baseline)
+        except ConfigError as e:
+            sys.stderr.write(f"cmakelint: error: {e}\n")
+            return ERROR_CODE_WRONG_USAGE
 
-    for filename in files:
-        process_file(filename)
+    def apply_baseline(filename, diagnostics, lines):
+        nonlocal baselined
+        if LINT_STATE.update_baseline:
+            baseline.update(filename, diagnostics, lines)
+            baselined += len(diagnostics)
+            return []
+        return baseline.filter(filename, diagnostics, lines)
+
+    try:
+        with open_sink(LINT_STATE.output_format, LINT_STATE.output) as sink:
+            if LINT_STATE.stdin:
+                results = lint_stdin(LINT_STATE.stdin_filename, LINT_STATE, profile)
+            else:
+                results = lint_files(files, LINT_STATE, LINT_STATE.jobs, profile, memory, resolver)
+            for filename, diagnostics, lines, fix, project in results:
+                if diagnostics is None:
+                    sink.ignored(filename)
+                    continue
+                if project is not None:
+                    projects.append(project)
+                if fix is not None:
+                    if fix.error is not None:
+                        sys.stderr.write(f"cmakelint: cannot fix {filename}: {fix.error}\n")
+                    fixed += fix.fixed
+                    if fix.diff:
+                        sink.diff(fix.diff)
+                if changes is not None:
+                    diagnostics = [diagnostic for diagnostic in diagnostics if changes[filename].keeps(diagnostic)]
+                if baseline is not None:
+                    diagnostics = apply_baseline(filename, diagnostics, lines)
+                for diagnostic in diagnostics:
+                    LINT_STATE.errors += 1
+                    sink.diagnostic(diagnostic)
+            if LINT_STATE.project:
+                from cmakelint.project import analyze
+
+                # Reported once every file is linted, as they depend on all of them.
+                for diagnostic in analyze(projects):
+                    if baseline is not None and not apply_baseline(diagnostic.filename, [diagnostic], {}):
+                        continue
+                    LINT_STATE.errors += 1
+                    sink.diagnostic(diagnostic)
+    except ConfigError as e:
+        # Option files below the current directory are only read when reached,
+        # the entries of the baseline when their file is.
+        sys.stderr.write(f"cmakelint: error: {e}\n")
+        return ERROR_CODE_WRONG_USAGE
+    if LINT_STATE.update_baseline:
+        try:
+            baseline.save()
+        except OSError as e:
+            sys.stderr.write(f"cmakelint: error: cannot write {LINT_STATE.baseline}: {e}\n")
+            return 1
+        if baselined > 0 or not LINT_STATE.quiet:
+            sys.stderr.write(f"Baselined Errors: {baselined}\n")
+    if LINT_STATE.fix or LINT_STATE.fix_dry_run:
+        if fixed > 0 or not LINT_STATE.quiet:
+            label = "Fixable" if LINT_STATE.fix_dry_run else "Fixed"
+            sys.stderr.write(f"{label} Errors: {fixed}\n")
     if LINT_STATE.errors > 0 or not LINT_STATE.quiet:
         sys.stderr.write(f"Total Errors: {LINT_STATE.errors}\n")
+    if profile is not None:
+        if LINT_STATE.profile_output is not None:
+            with open(LINT_STATE.profile_output, "w") as f:
+                f.write(profile.to_json() + "\n")
+        else:
+            profile.report(sys.stderr)
     if LINT_STATE.errors > 0:
         return ERROR_CODE_FOUND_ISSUE
     else:
         return 0
 
 
+def main():
+    if "--client" in sys.argv[1:]:
+        from cmakelint.daemon import client_main
+
+        return client_main(sys.argv[1:])
+    return run(sys.argv[1:])
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+
+from cmakelint.cache import atomic_write
+from cmakelint.config import ConfigError
+
+_HEADER = "# cmakelint baseline 1\n"
+# The lines of the file names, the entries are indented.
+_RE_FILENAME = re.compile(r"\n([^\t\n][^\n]*)")
+
+
+class BaselineError(ConfigError):
+    pass
+
+
+def fingerprint(category, line):
+    """
+    Return the key of a diagnostic of category on line, which does not
+    depend on the whitespace of the line nor on where the line is.
+    """
+    digest = hashlib.sha256(" ".join(line.split()).encode()).hexdigest()[:16]
+    return f"{category}\t{digest}"
+
+
+def _fingerprints(diagnostics, lines):
+    return [fingerprint(diagnostic.category, lines.get(diagnostic.linenumber, "")) for diagnostic in diagnostics]
+
+
+class Baseline:
+    """
+    The diagnostics known to be reported: per file, as written from the
+    directory of the baseline, the fingerprint of each diagnostic with the
+    number of times it is reported.
+
+    Diagnostics are suppressed as long as their file has as many diagnostics
+    of the same category on lines with the same contents, wherever they are.
+    The file lists each file name on its own line, followed by its entries
+    indented by a tab. Only the file names are read when it is loaded, the
+    entries of a file are parsed the first time it is looked up.
+    """
+
+    def __init__(self, path, text=_HEADER):
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self._text = text
+        # The start and end in text of the entries of each file.
+        self._spans = {}
+        previous = None
+        for m in _RE_FILENAME.finditer(text, len(_HEADER) - 1):
+            if previous is not None:
+                self._spans[previous[0]] = (previous[1], m.start())
+            previous = m.group(1), m.end()
+        if previous is not None:
+            self._spans[previous[0]] = (previous[1], len(text))
+        # Count per fingerprint of the files parsed.
+        self._files = {}
+        self._updated = set()
+
+    @classmethod
+    def load(cls, path, missing_ok=False):
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            if not missing_ok:
+                raise BaselineError(f"{path}: no such file") from None
+            text = _HEADER
+        except (OSError, ValueError) as e:
+            raise BaselineError(f"{path}: {e}") from e
+        if not text.startswith(_HEADER):
+            raise BaselineError(f"{path}: not a cmakelint baseline")
+        return cls(path, text)
+
+    def _relpath(self, filename):
+        relpath = os.path.relpath(os.path.abspath(filename), self.directory)
+        return relpath.replace(os.sep, "/") if os.sep != "/" else relpath
+
+    def _counts(self, relpath):
+        counts = self._files.get(relpath)
+        if counts is not None:
+            return counts
+        counts = self._files[relpath] = {}
+        span = self._spans.pop(relpath, None)
+        if span is None:
+            return counts
+        for entry in self._text[span[0] : span[1]].split("\n"):
+            if entry:
+                key, _, count = entry[1:].rpartition("\t")
+                try:
+                    counts[key] = int(count)
+                except ValueError:
+                    raise BaselineError(f"{self.path}: invalid entry of {relpath}: {entry.strip()}") from None
+        return counts
+
+    def filter(self, filename, diagnostics, lines):
+        """
+        Return the diagnostics of filename that the baseline does not hold.
+        lines maps their line numbers to the raw text of the lines, as in
+        LintResult, the ones missing are taken as empty.
+        """
+        if not diagnostics:
+            return diagnostics
+        counts = self._counts(self._relpath(filename))
+        if not counts:
+            return diagnostics
+        kept = []
+        for diagnostic, key in zip(diagnostics, _fingerprints(diagnostics, lines)):
+            count = counts.get(key, 0)
+            if count:
+                counts[key] = count - 1
+            else:
+                kept.append(diagnostic)
+        return kept
+
+    def update(self, filename, diagnostics, lines):
+        """
+        Hold the diagnostics of filename, instead of the ones held before for
+        it the first time it is updated.
+        """
+        relpath = self._relpath(filename)
+        if relpath not in self._updated:
+            self._updated.add(relpath)
+            self._spans.pop(relpath, None)
+            self._files[relpath] = {}
+        counts = self._files[relpath]
+        for key in _fingerprints(diagnostics, lines):
+            counts[key] = counts.get(key, 0) + 1
+
+    def save(self):
+        """
+        Write the baseline, sorted, without the files that no longer exist.
+        """
+        entries = [_HEADER]
+        for relpath in sorted({*self._spans, *self._files}):
+            if relpath not in self._updated and not os.path.exists(os.path.join(self.directory, relpath)):
+                continue
+            counts = self._counts(relpath)
+            if counts:
+                entries.append(relpath + "\n")
+                entries.extend(f"\t{key}\t{counts[key]}\n" for key in sorted(counts))
+        atomic_write(os.path.abspath(self.path), "".join(entries).encode())
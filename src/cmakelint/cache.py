@@ -0,0 +1,260 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+from cmakelint.__version__ import VERSION as CMAKELINT_VERSION
+from cmakelint.lint import _STREAMING_THRESHOLD, Diagnostic, Edit, FileSummary, LintResult, enabled_plugins
+
+_INDEX_FILENAME = "index.json"
+_ENTRIES_DIRNAME = "entries"
+# Files modified this recently are not added to the stat index: a later write
+# within the same timestamp granularity could keep both mtime and size.
+_RACY_SECONDS = 2
+_HASH_BLOCKSIZE = 1024 * 1024
+
+
+def atomic_write(path, data):
+    """
+    Replace the file at path with data through a temporary file renamed over
+    it, so that readers never see it partly written.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _file_digest(filename):
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCKSIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_digest(config):
+    """
+    Hash the settings that change which diagnostics a file produces.
+
+    Filters are not part of it: results are stored before filtering, so a
+    change of --filter is answered from the cache, unless it changes which
+    third-party rules are loaded.
+    """
+    settings = [
+        CMAKELINT_VERSION,
+        config.spaces,
+        config.linelength,
+        config.encoding,
+        sorted(config.allowed_categories),
+        enabled_plugins(config),
+    ]
+    return hashlib.sha256(json.dumps(settings).encode()).hexdigest()
+
+
+class MemoryCache:
+    """
+    In-memory LRU of the LintResult of the last max_entries files linted,
+    keyed by settings digest, file name and the stat of the file. Used by
+    the daemon, which lints the same files over and over.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def lint(self, filename, settings, lint):
+        """
+        Return lint(filename), which returns (LintResult, update), from the
+        cache when possible. The update is None on a hit.
+        """
+        st = os.stat(filename)
+        key = (settings, filename, os.path.abspath(filename), st.st_mtime_ns, st.st_size)
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            return result, None
+        result, update = lint(filename)
+        if time.time() - st.st_mtime >= _RACY_SECONDS:
+            self.entries[key] = result
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return result, update
+
+
+class ResultCache:
+    """
+    Content addressed on-disk cache of LintResult.
+
+    Entries are keyed by the hash of the settings, the file name (it shows up
+    in messages and drives the file name checks) and the file contents. An
+    index of (mtime, size, content hash) per path avoids rehashing files that
+    did not change since the last run. Entries are evicted least recently used
+    first once the cache grows beyond max_size bytes.
+    """
+
+    def __init__(self, cache_dir, config, max_size):
+        self.cache_dir = cache_dir
+        self.entries_dir = os.path.join(cache_dir, _ENTRIES_DIRNAME)
+        self.max_size = max_size
+        # Settings digest per config, as configs may be resolved per directory.
+        self.settings = {}
+        self.index = self._load_index()
+        self.dirty = False
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, _INDEX_FILENAME)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _settings(self, config):
+        settings = self.settings.get(config)
+        if settings is None:
+            settings = self.settings[config] = settings_digest(config)
+        return settings
+
+    def _entry_path(self, filename, content_digest, settings):
+        key = hashlib.sha256(f"{settings}\0{filename}\0{content_digest}".encode()).hexdigest()
+        return os.path.join(self.entries_dir, key[:2], key[2:] + ".json")
+
+    def _read_entry(self, path):
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            # The modification time doubles as the last use time for eviction.
+            os.utime(path)
+            filename = entry["filename"]
+            diagnostics = [
+                (Diagnostic(filename, linenumber, category, message), state)
+                for linenumber, category, message, state in entry["diagnostics"]
+            ]
+            pragma_states = [(parent, tuple(filters)) for parent, filters in entry["pragma_states"]]
+            fixes = {index: tuple(Edit(*edit) for edit in edits) for index, edits in entry["fixes"]}
+            commands, uppercase, lowercase, packages, includes = entry["summary"]
+            summary = FileSummary(tuple(commands), uppercase, lowercase, tuple(packages), tuple(includes))
+            lines = {int(linenumber): line for linenumber, line in entry["lines"].items()}
+            return LintResult(diagnostics, pragma_states, fixes, summary, lines)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_entry(self, path, filename, result):
+        entry = {
+            "filename": filename,
+            "diagnostics": [
+                [diagnostic.linenumber, diagnostic.category, diagnostic.message, state]
+                for diagnostic, state in result.diagnostics
+            ],
+            "pragma_states": [[parent, list(filters)] for parent, filters in result.pragma_states],
+            "fixes": [[index, [list(edit) for edit in edits]] for index, edits in result.fixes.items()],
+            "summary": list(result.summary),
+            "lines": result.lines,
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, json.dumps(entry).encode())
+        except OSError:
+            pass
+
+    def lint(self, filename, linter):
+        """
+        Return the LintResult of filename, from the cache when possible.
+
+        The second item is None when the cache was left untouched, otherwise
+        the (path, index record) to pass to update_index(); the record is None
+        when the file is too recent to be trusted by its stat alone. Worker
+        processes hand it back so that a single process writes the index.
+        """
+        settings = self._settings(linter.config)
+        abspath = os.path.abspath(filename)
+        st = os.stat(filename)
+        record = self.index.get(abspath)
+        if record is not None and record[0] == st.st_mtime_ns and record[1] == st.st_size:
+            result = self._read_entry(self._entry_path(filename, record[2], settings))
+            if result is not None:
+                return result, None
+
+        # Large files are hashed and linted as streams rather than read whole.
+        data = None
+        if st.st_size > _STREAMING_THRESHOLD:
+            content_digest = _file_digest(filename)
+        else:
+            with open(filename, "rb") as f:
+                data = f.read()
+            content_digest = hashlib.sha256(data).hexdigest()
+        path = self._entry_path(filename, content_digest, settings)
+        result = self._read_entry(path)
+        if result is None:
+            result = linter.run_stream(filename) if data is None else linter.run_bytes(filename, data)
+            self._write_entry(path, filename, result)
+        record = None
+        if time.time() - st.st_mtime >= _RACY_SECONDS:
+            record = [st.st_mtime_ns, st.st_size, content_digest]
+        update = (abspath, record)
+        self.update_index(update)
+        return result, update
+
+    def update_index(self, update):
+        abspath, record = update
+        if record is not None:
+            self.index[abspath] = record
+        self.dirty = True
+
+    def save(self):
+        """
+        Write the index and evict the least recently used entries, if this
+        run changed anything.
+        """
+        if not self.dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        atomic_write(os.path.join(self.cache_dir, _INDEX_FILENAME), json.dumps(self.index).encode())
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        try:
+            subdirs = list(os.scandir(self.entries_dir))
+        except OSError:
+            return
+        for subdir in subdirs:
+            for entry in os.scandir(subdir.path):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= self.max_size:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_size:
+                break
@@ -16,43 +16,39 @@ the License.
 from __future__ import annotations
 
 import argparse
+import codecs
 import os
 import sys
 
+from cmakelint import rules
 from cmakelint.__version__ import VERSION as CMAKELINT_VERSION
+from cmakelint.config import apply_options, load_option_file, read_option_file
 from cmakelint.error_code import ERROR_CODE_WRONG_USAGE
-from cmakelint.rules import ERROR_CATEGORIES
+from cmakelint.output import SINKS
 from cmakelint.state import LINT_STATE
 
 _DEFAULT_FILENAME = "CMakeLists.txt"
 
 
 def print_categories():
-    sys.stderr.write(ERROR_CATEGORIES)
+    sys.stderr.write(rules.ERROR_CATEGORIES)
     sys.exit(0)
 
 
 def parse_option_file(contents, ignore_space):
-    filters = None
-    spaces = None
-    linelength = None
-    for line in contents:
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if line.startswith("filter="):
-            filters = line.replace("filter=", "")
-        if line.startswith("spaces="):
-            spaces = line.replace("spaces=", "")
-        if line == "quiet":
-            LINT_STATE.set_quiet(True)
-        if line.startswith("linelength="):
-            linelength = line.replace("linelength=", "")
-    LINT_STATE.set_filters(filters)
-    if spaces and not ignore_space:
-        LINT_STATE.set_spaces(int(spaces.strip()))
-    if linelength is not None:
-        LINT_STATE.set_line_length(linelength)
+    apply_options(read_option_file(contents), ignore_space)
+
+
+def parse_jobs(value):
+    if value == "auto":
+        return os.cpu_count() or 1
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid jobs value: '{value}'") from None
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"jobs should be a positive integer or 'auto', got {jobs}")
+    return jobs
 
 
 class ArgumentParser(argparse.ArgumentParser):
@@ -61,10 +57,14 @@ class ArgumentParser(argparse.ArgumentParser):
         self.exit(ERROR_CODE_WRONG_USAGE, f"{self.prog}: error: {message}\n")
 
 
-def parse_args(argv):
+def parse_args(argv, load_options=load_option_file):
+    """
+    Parse the command line into LINT_STATE and return the files to lint.
+    load_options returns the Options of the option file at a path.
+    """
     parser = ArgumentParser("cmakelint", description="cmakelint")
     parser.add_argument("-v", "--version", action="version", version=f"%(prog)s {CMAKELINT_VERSION}")
-    parser.add_argument("files", nargs="*", help="files to lint")
+    parser.add_argument("files", nargs="*", help="files or directories to lint")
     parser.add_argument(
         "--filter", default=None, metavar="-X,+Y", help="Specify a comma separated list of filters to apply"
     )
@@ -76,7 +76,10 @@ def parse_args(argv):
         $PWD/.cmakelintrc, ~/.config/cmakelintrc, $XDG_CONFIG_DIR/cmakelintrc or
         ~/.cmakelintrc is used if it exists. Use the value "None" to use no
         configuration file (./None for a file called literally None) Only the
-        option "filter=" is currently supported in this file.
+        option "filter=" is currently supported in this file. Unless given,
+        the .cmakelintrc files of the directories below the one of this file
+        apply on top of it to the files they hold, and the options of a
+        "[glob]" section only apply to the files matching glob.
         """,
     )
     parser.add_argument("--spaces", type=int, default=None, help="Indentation should be a multiple of N spaces")
@@ -86,6 +89,14 @@ def parse_args(argv):
         default=None,
         help="This is the allowed line length for the project. The default value is 80 characters.",
     )
+    parser.add_argument(
+        "--encoding",
+        default="utf-8",
+        help="""
+        Encoding of the files. Bytes that are not valid in it are replaced.
+        The default value is utf-8.
+        """,
+    )
     parser.add_argument(
         "--quiet",
         action="store_true",
@@ -100,8 +111,200 @@ def parse_args(argv):
         via build system and have no pollution of terminals or IDE.
         """,
     )
+    parser.add_argument(
+        "--format",
+        choices=list(SINKS),
+        default="text",
+        help="""
+        Output format: "text" for "file:line: message [category]" lines,
+        "jsonl" for one JSON object per diagnostic, "sarif" for a SARIF 2.1.0
+        log. The default value is text.
+        """,
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        metavar="FILE",
+        help="Write the diagnostics to FILE instead of stdout.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=parse_jobs,
+        default=1,
+        metavar="N",
+        help="""
+        Lint files in parallel using N worker processes. Use "auto" to use one
+        worker per CPU. Diagnostics are reported per file in the order the
+        files were given, as in a serial run.
+        """,
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="""
+        Skip files and directories matching GLOB, in .gitignore syntax, when
+        walking directories. Files ignored by .gitignore and CMake build trees
+        are always skipped. May be given several times.
+        """,
+    )
+    parser.add_argument(
+        "--files-from",
+        default=None,
+        metavar="PATH",
+        help="""
+        Also lint the files and directories listed in PATH, one per line, or
+        "-" to read them from stdin. The list is read as files are linted, so
+        it may be of any length.
+        """,
+    )
+    parser.add_argument(
+        "-0",
+        "--null",
+        action="store_true",
+        help="The paths of --files-from are separated by NUL characters instead of newlines.",
+    )
+    parser.add_argument(
+        "--stdin",
+        action="store_true",
+        help="Lint the contents read from stdin, as the file named by --stdin-filename.",
+    )
+    parser.add_argument(
+        "--stdin-filename",
+        default=None,
+        metavar="NAME",
+        help="""
+        Name of the file read with --stdin, which decides the checks that
+        apply and the option files used. The default value is CMakeLists.txt.
+        """,
+    )
+    parser.add_argument(
+        "--diff-base",
+        default=None,
+        metavar="REF",
+        help="""
+        Only lint the files changed since the merge base of REF and HEAD, in
+        the working tree, and only report diagnostics on changed lines. File
+        name and package checks are only reported for new or renamed files.
+        Without files, the current directory is used.
+        """,
+    )
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="""
+        Fix the diagnostics of the whitespace categories in place: trailing
+        whitespace, tabs, indentation, spaces around the parentheses of
+        commands and carriage returns. A file is rewritten at most once, only
+        if it changes, through a temporary file renamed over it. The
+        diagnostics left are reported.
+        """,
+    )
+    parser.add_argument(
+        "--fix-dry-run",
+        action="store_true",
+        help="Write the unified diff of the changes of --fix to stdout instead of making them.",
+    )
+    parser.add_argument(
+        "--project",
+        action="store_true",
+        help="""
+        Also check the files linted together as one project: Find modules
+        that no find_package() or include() uses, Find modules of the same
+        name in several directories and files whose command case differs from
+        most files. With --cache-dir, only the files that changed are read
+        again.
+        """,
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        metavar="FILE",
+        help="""
+        Do not report the diagnostics listed in FILE. They are told apart by
+        file, category and the contents of their line, so they stay
+        suppressed when lines move.
+        """,
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="""
+        Write the diagnostics of the files linted to the --baseline FILE instead
+        of reporting them, keeping the ones of the other files.
+        """,
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        metavar="DIR",
+        help="""
+        Cache the results in DIR and skip files whose contents and settings
+        did not change since they were last linted.
+        """,
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=None,
+        metavar="MB",
+        help="Evict the least recently used cache entries beyond this size. The default value is 256 MB.",
+    )
+    parser.add_argument(
+        "--profile-rules",
+        action="store_true",
+        help="""
+        Time each rule and each phase of linting a file (read, pragma scan,
+        clean_comments, tokenize, package done) and print their call count,
+        total and mean time and number of diagnostics at exit.
+        """,
+    )
+    parser.add_argument(
+        "--profile-output",
+        default=None,
+        metavar="FILE",
+        help="Write the profile of --profile-rules to FILE as JSON instead of printing it.",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="""
+        Serve lint runs forwarded by --client over a Unix socket, keeping the
+        parsed configuration files and recent results in memory.
+        """,
+    )
+    parser.add_argument(
+        "--client",
+        action="store_true",
+        help="""
+        Forward this run to the daemon and exit with its status. Runs directly
+        if no daemon is listening.
+        """,
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        metavar="PATH",
+        help="""
+        Socket of the daemon, in a directory of the current user that other
+        users cannot write to. The default value is cmakelint-<uid>.sock in
+        $XDG_RUNTIME_DIR or in a cmakelint-<uid> directory of the temporary
+        directory.
+        """,
+    )
+    parser.add_argument(
+        "--lsp",
+        action="store_true",
+        help="""
+        Serve the Language Server Protocol over stdin and stdout, publishing
+        the diagnostics of the documents open in the editor as they are edited.
+        """,
+    )
 
     args = parser.parse_args(argv)
+    LINT_STATE.set_plugins(rules.discover_plugins())
     ignore_space = args.spaces is not None
     if args.config is not None:
         if args.config == "None":
@@ -116,17 +319,60 @@ def parse_args(argv):
         if args.filter == "":
             print_categories()
     LINT_STATE.set_quiet(args.quiet)
+    try:
+        LINT_STATE.set_encoding(codecs.lookup(args.encoding).name)
+    except LookupError:
+        parser.error(f"unknown encoding: {args.encoding}")
+    LINT_STATE.set_output(args.format, args.output)
+    LINT_STATE.set_jobs(args.jobs)
+    LINT_STATE.set_cache(args.cache_dir, args.cache_max_size)
+    LINT_STATE.set_excludes(args.exclude)
+    LINT_STATE.set_diff_base(args.diff_base)
+    LINT_STATE.set_files_from(args.files_from, args.null)
+    LINT_STATE.set_stdin(args.stdin, args.stdin_filename or _DEFAULT_FILENAME)
+    if args.stdin and (args.files or args.files_from is not None or args.diff_base is not None):
+        parser.error("--stdin cannot be used with files, --files-from or --diff-base")
+    LINT_STATE.set_fix(args.fix, args.fix_dry_run)
+    if (args.fix or args.fix_dry_run) and (args.stdin or args.diff_base is not None):
+        parser.error("--fix and --fix-dry-run cannot be used with --stdin or --diff-base")
+    if args.fix_dry_run and args.format != "text" and args.output is None:
+        parser.error(f"--fix-dry-run writes diffs to stdout, --format {args.format} needs --output")
+    LINT_STATE.set_project(args.project)
+    if args.project and (args.stdin or args.diff_base is not None):
+        parser.error("--project cannot be used with --stdin or --diff-base")
+    LINT_STATE.set_baseline(args.baseline, args.update_baseline)
+    if args.update_baseline and args.baseline is None:
+        parser.error("--update-baseline needs --baseline")
+    if args.update_baseline and args.diff_base is not None:
+        parser.error("--update-baseline cannot be used with --diff-base")
+    if args.baseline is not None and not args.update_baseline and not os.path.isfile(args.baseline):
+        parser.error(f"--baseline: no such file: '{args.baseline}'")
+    if args.stdin_filename is not None and not args.stdin:
+        parser.error("--stdin-filename needs --stdin")
+    if args.null and args.files_from is None:
+        parser.error("--null needs --files-from")
+    if args.files_from not in (None, "-") and not os.path.isfile(args.files_from):
+        parser.error(f"--files-from: no such file: '{args.files_from}'")
+    LINT_STATE.set_profile(args.profile_rules, args.profile_output)
+    LINT_STATE.set_daemon(args.daemon, args.socket)
+    LINT_STATE.set_lsp(args.lsp)
+    if args.lsp and (args.files or args.stdin or args.files_from is not None or args.daemon):
+        parser.error("--lsp cannot be used with files, --stdin, --files-from or --daemon")
 
     try:
         if LINT_STATE.config and os.path.isfile(LINT_STATE.config):
-            with open(LINT_STATE.config) as f:
-                parse_option_file(f.readlines(), ignore_space)
+            apply_options(load_options(LINT_STATE.config), ignore_space)
+        num_filters = len(LINT_STATE.filters)
         LINT_STATE.set_filters(args.filter)
     except ValueError as e:
         parser.error(str(e))
+    # An explicit --config is the only option file used.
+    LINT_STATE.set_directory_rc(args.config is None, LINT_STATE.filters[num_filters:], ignore_space)
 
     filenames = args.files
-    if not filenames:
+    if not filenames and args.diff_base is not None:
+        filenames = [os.curdir]
+    elif not filenames and not (args.daemon or args.lsp or args.stdin or args.files_from is not None):
         if os.path.isfile(_DEFAULT_FILENAME):
             filenames = [_DEFAULT_FILENAME]
         else:
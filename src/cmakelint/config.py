@@ -0,0 +1,224 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import NamedTuple
+
+from cmakelint.discovery import relative_path, translate_glob
+from cmakelint.state import LINT_STATE
+
+RC_FILENAME = ".cmakelintrc"
+
+
+class ConfigError(ValueError):
+    pass
+
+
+class Options(NamedTuple):
+    """
+    The settings of an option file, None for the ones it does not set.
+    sections are the (glob, Options) of its [glob] sections, in order.
+    """
+
+    filters: str | None
+    spaces: str | None
+    linelength: str | None
+    quiet: bool
+    sections: tuple = ()
+
+
+def read_option_file(contents):
+    sections = []
+    filters = None
+    spaces = None
+    linelength = None
+    quiet = False
+    pattern = None
+
+    def options():
+        return Options(filters, spaces, linelength, quiet)
+
+    for line in contents:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            if pattern is None:
+                main = options()
+            else:
+                sections.append((pattern, options()))
+            pattern = line[1:-1].strip()
+            filters = spaces = linelength = None
+            quiet = False
+            continue
+        if line.startswith("filter="):
+            filters = line.replace("filter=", "")
+        if line.startswith("spaces="):
+            spaces = line.replace("spaces=", "")
+        if line == "quiet":
+            quiet = True
+        if line.startswith("linelength="):
+            linelength = line.replace("linelength=", "")
+    if pattern is None:
+        return options()
+    sections.append((pattern, options()))
+    return main._replace(sections=tuple(sections))
+
+
+def load_option_file(path):
+    with open(path) as f:
+        return read_option_file(f.readlines())
+
+
+def apply_options(options, ignore_space, state=LINT_STATE):
+    if options.quiet:
+        state.set_quiet(True)
+    state.set_filters(options.filters)
+    if options.spaces and not ignore_space:
+        state.set_spaces(int(options.spaces.strip()))
+    if options.linelength is not None:
+        state.set_line_length(options.linelength)
+
+
+def _is_ancestor(directory, path):
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+class _OptionFile(NamedTuple):
+    path: str
+    options: Options
+    # The compiled globs of the sections, relative to the file's directory.
+    sections: list
+
+
+class ConfigResolver:
+    """
+    Resolve the settings of each file from the .cmakelintrc files of its
+    directory and of the directories above it.
+
+    The option file of config, found by default_rc() or given with --config,
+    is applied first, as done by parse_args(). Unless it was given with
+    --config, the .cmakelintrc files below its directory are applied on top
+    of it, outermost first. The [glob] sections matching the file apply after
+    the options of their file, and the filters of the command line come
+    last. Option files are read with load_options, once per run, and the
+    files of a directory share their settings, unless sections tell them
+    apart. The daemon keeps a resolver across runs, see rebind(), with a
+    load_options that only parses the files that changed.
+    """
+
+    def __init__(self, config, load_options=load_option_file):
+        self.load_options = load_options
+        # The _OptionFile per path, reused while load_options returns the
+        # same Options for it.
+        self._option_files_by_path = {}
+        self.rebind(config)
+
+    def rebind(self, config):
+        """
+        Resolve the settings of the files of a new run with config. Option
+        files are looked up again, as they may have been added, changed or
+        removed since the last run.
+        """
+        self.config = config
+        self._directories = {}
+        self._configs = {}
+        base = None
+        if config.config and os.path.isfile(config.config):
+            base = self._load(os.path.abspath(config.config))
+        self._base = base
+        self._base_dir = None if base is None else os.path.dirname(base.path)
+        # parse_args() adds the filters of the command line last.
+        self._base_filters = config.filters[: len(config.filters) - len(config.cli_filters)]
+
+    def _load(self, path):
+        try:
+            options = self.load_options(path)
+        except OSError as e:
+            raise ConfigError(f"{path}: {e}") from e
+        option_file = self._option_files_by_path.get(path)
+        if option_file is not None and option_file.options is options:
+            return option_file
+        # Globs follow .gitignore syntax, a directory matches the files below it.
+        sections = [re.compile(translate_glob(pattern.rstrip("/"))) for pattern, _ in options.sections]
+        option_file = self._option_files_by_path[path] = _OptionFile(path, options, sections)
+        return option_file
+
+    def _option_files(self, directory):
+        """
+        Return the tuple of the _OptionFile applying to the files of
+        directory, outermost first.
+        """
+        option_files = self._directories.get(directory)
+        if option_files is not None:
+            return option_files
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            option_files = () if self._base is None else (self._base,)
+        else:
+            option_files = self._option_files(parent)
+        path = os.path.join(directory, RC_FILENAME)
+        if not (self._base_dir is not None and _is_ancestor(directory, self._base_dir)) and os.path.isfile(path):
+            option_files = (*option_files, self._load(path))
+        self._directories[directory] = option_files
+        return option_files
+
+    def resolve(self, filename):
+        """
+        Return the config of filename, a copy of config unless no option
+        file changes it.
+        """
+        if self._base is None and not self.config.directory_rc:
+            return self.config
+        abspath = os.path.abspath(filename)
+        if self.config.directory_rc:
+            option_files = self._option_files(os.path.dirname(abspath))
+        else:
+            option_files = (self._base,)
+        key = []
+        for option_file in option_files:
+            matched = ()
+            directory = os.path.dirname(option_file.path)
+            if option_file.sections and _is_ancestor(directory, abspath):
+                relpath = relative_path(abspath, directory)
+                matched = tuple(i for i, regex in enumerate(option_file.sections) if regex.fullmatch(relpath))
+            if option_file is not self._base or matched:
+                key.append((option_file.path, matched))
+        if not key:
+            return self.config
+        key = tuple(key)
+        config = self._configs.get(key)
+        if config is None:
+            config = self._configs[key] = self._build(option_files, dict(key))
+        return config
+
+    def _build(self, option_files, matched):
+        config = self.config.copy()
+        config.filters = list(self._base_filters)
+        for option_file in option_files:
+            try:
+                # The base option file was applied by parse_args().
+                if option_file is not self._base:
+                    apply_options(option_file.options._replace(quiet=False), self.config.cli_spaces, config)
+                for i in matched.get(option_file.path, ()):
+                    options = option_file.options.sections[i][1]
+                    apply_options(options._replace(quiet=False), self.config.cli_spaces, config)
+            except ValueError as e:
+                raise ConfigError(f"{option_file.path}: {e}") from e
+        config.filters.extend(self.config.cli_filters)
+        return config
@@ -0,0 +1,329 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+import tempfile
+import traceback
+
+from cmakelint.error_code import ERROR_CODE_WRONG_USAGE
+
+# Environment variables of the client that change the outcome of a run.
+_FORWARDED_ENV = ("HOME", "XDG_CONFIG_DIR", "COLUMNS")
+# Number of files whose results the daemon keeps.
+_MEMORY_CACHE_ENTRIES = 4096
+
+
+def _uid():
+    return os.getuid() if hasattr(os, "getuid") else 0
+
+
+def default_socket_path():
+    """
+    Return cmakelint-<uid>.sock in $XDG_RUNTIME_DIR, or else in a private
+    cmakelint-<uid> directory of the temporary directory, which every user
+    may write to.
+    """
+    uid = _uid()
+    directory = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(tempfile.gettempdir(), f"cmakelint-{uid}")
+    return os.path.join(directory, f"cmakelint-{uid}.sock")
+
+
+def _check_owner(path):
+    """
+    Raise OSError unless path belongs to the current user and, if it is a
+    directory, other users cannot write to it, so that no other user can
+    serve or receive the runs of its socket.
+    """
+    st = os.stat(path)
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        raise OSError(f"{path} does not belong to the current user")
+    if stat.S_ISDIR(st.st_mode) and st.st_mode & stat.S_IWOTH:
+        raise OSError(f"{path} is writable by other users")
+
+
+def _check_socket(socket_path, directory_only=False):
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    _check_owner(directory)
+    if not directory_only:
+        _check_owner(socket_path)
+
+
+def _send(conn, message):
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _messages(conn):
+    with conn.makefile("rb") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+class _SocketStream:
+    """
+    A text stream sending what is written to it over the connection, as
+    messages tagged with the name of the stream it stands for.
+    """
+
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+
+    def write(self, text):
+        if text:
+            _send(self.conn, {self.name: text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class _OptionFiles:
+    """
+    Parsed option files, reloaded when their mtime or size changes.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def load(self, path):
+        from cmakelint.config import load_option_file
+
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == (st.st_mtime_ns, st.st_size):
+            return entry[1]
+        options = load_option_file(path)
+        self.entries[key] = ((st.st_mtime_ns, st.st_size), options)
+        return options
+
+
+@contextlib.contextmanager
+def _client_context(cwd, env):
+    """
+    Run in the directory and with the environment of the client.
+    """
+    saved_cwd = os.getcwd()
+    saved_env = {name: os.environ.get(name) for name in _FORWARDED_ENV}
+    try:
+        os.chdir(cwd)
+        for name in _FORWARDED_ENV:
+            if env.get(name) is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = env[name]
+        yield
+    finally:
+        os.chdir(saved_cwd)
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+class Server:
+    """
+    Serves the runs forwarded by clients, one at a time, with the engine
+    already imported, the option files parsed, the directories they apply to
+    resolved and the results of the files linted recently kept in memory.
+    """
+
+    def __init__(self, socket_path):
+        from cmakelint.cache import MemoryCache
+        from cmakelint.config import ConfigResolver
+        from cmakelint.state import LINT_STATE
+
+        self.socket_path = socket_path
+        self.option_files = _OptionFiles()
+        self.memory = MemoryCache(_MEMORY_CACHE_ENTRIES)
+        # Bound to the settings of each run by lint_files().
+        self.resolver = ConfigResolver(LINT_STATE, self.option_files.load)
+
+    def _bind(self):
+        directory = os.path.dirname(os.path.abspath(self.socket_path))
+        if not os.path.exists(directory):
+            os.mkdir(directory, 0o700)
+        exists = os.path.exists(self.socket_path)
+        _check_socket(self.socket_path, directory_only=not exists)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if exists:
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                # Left behind by a daemon that did not exit cleanly.
+                os.unlink(self.socket_path)
+            else:
+                sock.close()
+                raise OSError(f"A daemon is already listening on {self.socket_path}")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only the owner may connect: requests run with the daemon's rights.
+        with _umask(0o177):
+            sock.bind(self.socket_path)
+        sock.listen()
+        return sock
+
+    def serve_forever(self):
+        sock = self._bind()
+        try:
+            while True:
+                conn, _ = sock.accept()
+                with conn:
+                    self.handle(conn)
+        finally:
+            sock.close()
+            os.unlink(self.socket_path)
+
+    def handle(self, conn):
+        request = next(_messages(conn), None)
+        if request is None:
+            return
+        try:
+            status = self.run(conn, request)
+        except BrokenPipeError:
+            return
+        except Exception:
+            _send(conn, {"stderr": traceback.format_exc()})
+            status = 1
+        _send(conn, {"status": status})
+
+    def run(self, conn, request):
+        from cmakelint.__main__ import run
+        from cmakelint.state import LINT_STATE
+
+        argv = request["argv"]
+        stdout = _SocketStream(conn, "stdout")
+        stderr = _SocketStream(conn, "stderr")
+        if "--daemon" in argv:
+            stderr.write("cmakelint: error: --daemon cannot be forwarded to a daemon\n")
+            return ERROR_CODE_WRONG_USAGE
+        with _client_context(request["cwd"], request["env"]):
+            # The default option file is looked up again, in the client's cwd.
+            LINT_STATE.reset()
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    return run(argv, self.option_files.load, self.memory, self.resolver)
+                except SystemExit as e:
+                    if e.code is None or isinstance(e.code, int):
+                        return e.code or 0
+                    print(e.code, file=sys.stderr)
+                    return 1
+
+
+@contextlib.contextmanager
+def _umask(mask):
+    saved = os.umask(mask)
+    try:
+        yield
+    finally:
+        os.umask(saved)
+
+
+def serve(socket_path=None):
+    if not hasattr(socket, "AF_UNIX"):
+        sys.stderr.write("cmakelint: error: --daemon needs Unix domain sockets\n")
+        return ERROR_CODE_WRONG_USAGE
+    server = Server(socket_path or default_socket_path())
+    # Exit through serve_forever() so that the socket is removed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        sys.stderr.write(f"cmakelint: error: {e}\n")
+        return 1
+    return 0
+
+
+def _client_args(argv):
+    """
+    Return the arguments to forward, without --client and --socket, and
+    the path of the socket.
+    """
+    forwarded = []
+    socket_path = None
+    args = iter(argv)
+    for arg in args:
+        if arg == "--client":
+            continue
+        if arg == "--socket":
+            socket_path = next(args, None)
+        elif arg.startswith("--socket="):
+            socket_path = arg[len("--socket=") :]
+        else:
+            forwarded.append(arg)
+    return forwarded, socket_path or default_socket_path()
+
+
+def _reads_stdin(argv):
+    # The stdin of the client is not forwarded, such runs are done directly.
+    if "--stdin" in argv or "--lsp" in argv or "--files-from=-" in argv:
+        return True
+    return any(arg == "--files-from" and value == "-" for arg, value in zip(argv, argv[1:]))
+
+
+def client(argv):
+    """
+    Forward a run to the daemon and return its exit status, or None if no
+    daemon is listening.
+    """
+    argv, socket_path = _client_args(argv)
+    if not hasattr(socket, "AF_UNIX") or _reads_stdin(argv):
+        return None
+    if not os.path.exists(socket_path):
+        return None
+    try:
+        _check_socket(socket_path)
+    except OSError as e:
+        sys.stderr.write(f"cmakelint: warning: not using the daemon: {e}\n")
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with conn:
+        try:
+            conn.connect(socket_path)
+        except OSError:
+            return None
+        env = {name: os.environ.get(name) for name in _FORWARDED_ENV}
+        _send(conn, {"cwd": os.getcwd(), "argv": argv, "env": env})
+        streams = {"stdout": sys.stdout, "stderr": sys.stderr}
+        for message in _messages(conn):
+            if "status" in message:
+                sys.stdout.flush()
+                return message["status"]
+            for name, text in message.items():
+                streams[name].write(text)
+    sys.stderr.write("cmakelint: error: the daemon closed the connection\n")
+    return 1
+
+
+def client_main(argv):
+    """
+    Run as a client of the daemon, or directly if none is listening.
+    """
+    status = client(argv)
+    if status is None:
+        from cmakelint.__main__ import run
+
+        status = run(_client_args(argv)[0])
+    return status
@@ -0,0 +1,319 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+
+from cmakelint.lint import is_valid_file
+
+# A directory holding any of these is a CMake build tree and is not walked.
+_BUILD_DIR_MARKERS = frozenset(["CMakeCache.txt", "CMakeFiles", "_deps"])
+_SKIPPED_DIRS = frozenset([".git", ".hg", ".svn"])
+_READ_SIZE = 64 * 1024
+
+
+def translate_glob(pattern):
+    """
+    Translate a gitignore style glob to a regular expression matching a
+    path relative to the directory the pattern belongs to.
+    """
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    parts = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i) and i + 2 == n and (i == 0 or pattern[i - 1] == "/"):
+            parts.append(".*")
+            i += 2
+        elif c == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif c == "?":
+            parts.append("[^/]")
+            i += 1
+        elif c == "[":
+            # A "]" right after the opening bracket (or its negation) is literal.
+            end = pattern.find("]", i + 3 if pattern.startswith(("[!", "[^"), i) else i + 2)
+            if end == -1:
+                parts.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1 : end]
+            if body[0] in "!^":
+                body = "^" + body[1:]
+            parts.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    regex = "".join(parts)
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    # A pattern matching a directory also matches everything below it.
+    return regex + "(?:/.*)?"
+
+
+class IgnoreRules:
+    """
+    A list of gitignore style patterns compiled into two regular
+    expressions, one for files and one for directories.
+
+    The patterns are joined in reverse order, so the first alternative that
+    matches is the last pattern of the list, which is the one that decides
+    per gitignore rules.
+    """
+
+    def __init__(self, patterns):
+        self.negated = {}
+        file_alternatives = []
+        dir_alternatives = []
+        for index, pattern in enumerate(patterns):
+            pattern = pattern.rstrip("\n")
+            if not pattern.endswith("\\ "):
+                pattern = pattern.rstrip(" ")
+            if not pattern or pattern.startswith("#"):
+                continue
+            negated = pattern.startswith("!")
+            if negated:
+                pattern = pattern[1:]
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+            group = f"p{index}"
+            self.negated[group] = negated
+            alternative = f"(?P<{group}>{translate_glob(pattern)})"
+            dir_alternatives.append(alternative)
+            if not dir_only:
+                file_alternatives.append(alternative)
+        self._file_re = self._compile(file_alternatives)
+        self._dir_re = self._compile(dir_alternatives)
+
+    @staticmethod
+    def _compile(alternatives):
+        if not alternatives:
+            return None
+        return re.compile("|".join(reversed(alternatives)))
+
+    @classmethod
+    def from_file(cls, path):
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                return cls(f.readlines())
+        except OSError:
+            return None
+
+    def match(self, relpath, is_dir):
+        """
+        Return True if relpath is ignored, False if it is explicitly
+        re-included and None if no pattern matches it.
+        """
+        regex = self._dir_re if is_dir else self._file_re
+        if regex is None:
+            return None
+        m = regex.fullmatch(relpath)
+        if m is None:
+            return None
+        return not self.negated[m.lastgroup]
+
+
+def _join(directory, name):
+    # Keep the paths of files found under "." relative, as they were given.
+    return name if directory == os.curdir else os.path.join(directory, name)
+
+
+def _find_repo_root(path):
+    path = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _ancestor_ignores(root):
+    """
+    Return the (directory, IgnoreRules) of the .gitignore files between the
+    repository containing root and root itself, outermost first.
+    """
+    repo = _find_repo_root(root)
+    if repo is None:
+        return []
+    ignores = []
+    exclude = IgnoreRules.from_file(os.path.join(repo, ".git", "info", "exclude"))
+    if exclude is not None:
+        ignores.append((repo, exclude))
+    directory = repo
+    relative = os.path.relpath(os.path.abspath(root), repo)
+    parts = [] if relative == os.curdir else relative.split(os.sep)
+    for part in [None, *parts]:
+        if part is not None:
+            directory = os.path.join(directory, part)
+        rules = IgnoreRules.from_file(os.path.join(directory, ".gitignore"))
+        if rules is not None:
+            ignores.append((directory, rules))
+    # The rules of root itself are loaded by the walk.
+    if ignores and ignores[-1][0] == os.path.abspath(root):
+        ignores.pop()
+    return ignores
+
+
+def relative_path(abspath, directory):
+    """
+    Return abspath relative to directory, with "/" separators, as matched
+    by the patterns of translate_glob().
+    """
+    prefix = directory.rstrip(os.sep) + os.sep
+    if abspath.startswith(prefix):
+        relpath = abspath[len(prefix) :]
+    else:
+        relpath = os.path.relpath(abspath, directory)
+    return relpath.replace(os.sep, "/") if os.sep != "/" else relpath
+
+
+def _is_ignored(ignores, abspath, is_dir):
+    # Deeper .gitignore files take precedence over the ones above them.
+    for directory, rules in reversed(ignores):
+        ignored = rules.match(relative_path(abspath, directory), is_dir)
+        if ignored is not None:
+            return ignored
+    return False
+
+
+class _Walker:
+    def __init__(self, excludes):
+        self.excludes = [(os.getcwd(), IgnoreRules(excludes))] if excludes else []
+        self.seen_files = set()
+        self.seen_dirs = set()
+
+    def walk(self, root):
+        root = os.path.normpath(root)
+        realroot = os.path.realpath(root)
+        if realroot in self.seen_dirs:
+            return
+        self.seen_dirs.add(realroot)
+        yield from self._walk(root, os.path.abspath(root), realroot, _ancestor_ignores(root), True)
+
+    def _walk(self, directory, absdir, realdir, ignores, is_root=False):
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            return
+        names = {entry.name for entry in entries}
+        # Build trees are only walked when given explicitly.
+        if not is_root and not names.isdisjoint(_BUILD_DIR_MARKERS):
+            return
+        if ".gitignore" in names:
+            rules = IgnoreRules.from_file(os.path.join(directory, ".gitignore"))
+            if rules is not None:
+                ignores = [*ignores, (absdir, rules)]
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            abspath = os.path.join(absdir, entry.name)
+            if is_dir:
+                if entry.name not in _SKIPPED_DIRS and not self._is_excluded(ignores, abspath, True):
+                    subdirs.append(entry)
+                continue
+            if not is_valid_file(entry.name) or self._is_excluded(ignores, abspath, False):
+                continue
+            if entry.is_symlink():
+                realpath = os.path.realpath(entry.path)
+            else:
+                realpath = os.path.join(realdir, entry.name)
+            if realpath not in self.seen_files:
+                self.seen_files.add(realpath)
+                yield _join(directory, entry.name)
+        for entry in subdirs:
+            if entry.is_symlink():
+                realpath = os.path.realpath(entry.path)
+            else:
+                realpath = os.path.join(realdir, entry.name)
+            if realpath in self.seen_dirs:
+                continue
+            self.seen_dirs.add(realpath)
+            yield from self._walk(_join(directory, entry.name), os.path.join(absdir, entry.name), realpath, ignores)
+
+    def _is_excluded(self, ignores, abspath, is_dir):
+        return _is_ignored(self.excludes, abspath, is_dir) or _is_ignored(ignores, abspath, is_dir)
+
+
+def read_paths(f, null=False):
+    """
+    Yield the paths listed in the binary stream f, one per line or NUL
+    separated if null, as they are read. Empty entries are skipped.
+    """
+    if not null:
+        for line in f:
+            path = line.rstrip(b"\n").rstrip(b"\r")
+            if path:
+                yield os.fsdecode(path)
+        return
+    rest = b""
+    for block in iter(lambda: f.read(_READ_SIZE), b""):
+        paths = (rest + block).split(b"\0")
+        rest = paths.pop()
+        yield from (os.fsdecode(path) for path in paths if path)
+    if rest:
+        yield os.fsdecode(rest)
+
+
+def read_file_list(path, null=False):
+    """
+    Yield the paths listed in the file at path, or on stdin if path is "-".
+    """
+    if path == "-":
+        yield from read_paths(sys.stdin.buffer, null)
+        return
+    with open(path, "rb") as f:
+        yield from read_paths(f, null)
+
+
+def discover(paths, excludes=()):
+    """
+    Yield the files to lint for the given paths, as they are found.
+
+    Files are yielded as given. Directories are walked recursively for CMake
+    files, skipping files and directories ignored by .gitignore or matching
+    one of the gitignore style exclude patterns, and CMake build trees. Each
+    file is yielded once, even when reachable through several symlinks.
+    """
+    walker = _Walker(excludes)
+    for path in paths:
+        if os.path.isdir(path):
+            yield from walker.walk(path)
+        else:
+            realpath = os.path.realpath(path)
+            if realpath in walker.seen_files:
+                continue
+            walker.seen_files.add(realpath)
+            yield path
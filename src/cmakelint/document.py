@@ -0,0 +1,450 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import bisect
+import copy
+import itertools
+import re
+
+from cmakelint.lint import CleansedLines, Diagnostic, Linter, LintResult, check_file_name, clean_comments
+from cmakelint.pragmas import PRAGMA_PREFIX, compile_pragmas
+from cmakelint.rules import COMMAND
+from cmakelint.tokenizer import Tokenizer
+
+_RE_LINE_ENDING = re.compile(r"(\r\n|\r|\n)")
+# The rules reporting these categories depend on the lines before the one
+# they check (the case of the first command, the package state), so they
+# are run over the whole document after each edit rather than per line.
+_FILE_STATE_CATEGORIES = ("readability/mixedcase", "package/")
+_FIRST_LINE = "# Lines start at 1"
+_LAST_LINE = "# Lines end here"
+
+
+def _split_segments(text):
+    """
+    Split text into its lines with their line endings, the last one without
+    any, which is empty if text ends with a line ending.
+    """
+    parts = _RE_LINE_ENDING.split(text)
+    return [line + ending for line, ending in zip(parts[::2], parts[1::2])] + [parts[-1]]
+
+
+def _is_file_state_rule(rule):
+    return any(category.startswith(_FILE_STATE_CATEGORIES) for category in rule.categories)
+
+
+def _is_line_rule(rule):
+    return not _is_file_state_rule(rule)
+
+
+def _file_state(clean_lines):
+    return clean_lines.have_seen_uppercase, vars(clean_lines.package_state)
+
+
+def _shift_keys(mapping, start, end, delta):
+    """
+    Return mapping without the keys from start to end, and the keys after
+    them moved by delta.
+    """
+    return {(key + delta if key >= end else key): value for key, value in mapping.items() if not start <= key < end}
+
+
+class _DocumentLines(CleansedLines):
+    """
+    CleansedLines held in lists updated in place as the document is edited,
+    with the paren depth at the start of each line, so that the lines can be
+    tokenized again from any line where it is 0.
+    """
+
+    __slots__ = ("depths",)
+
+    def __init__(self, raw_lines, lint_state, package_state):
+        self.have_seen_uppercase = None
+        self.lint_state = lint_state
+        self.package_state = package_state
+        self.raw_lines = raw_lines
+        self.lines = [""] * len(raw_lines)
+        self.commands = [None] * len(raw_lines)
+        self.depths = [0] * len(raw_lines)
+        self.logic_keywords = {}
+        self.skipped_lines = {}
+        self.open_lines = {}
+        self.flagged = set()
+
+
+class _ReadLines:
+    """
+    The cleaned lines of a document as the checks read them, recording the
+    last line read.
+    """
+
+    __slots__ = ("lines", "last")
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.last = 0
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __getitem__(self, linenumber):
+        if linenumber > self.last:
+            self.last = linenumber
+        return self.lines[linenumber]
+
+
+class Document:
+    """
+    An open document, linted as a whole when opened and then again as it is
+    edited, only over the lines an edit may change.
+
+    Lines are numbered as in diagnostics: line 1 is the first line of the
+    text. The lines of the commands overlapping an edit are cleaned,
+    tokenized and checked again, from the closest line before the edit where
+    no command is open, up to the first line after it where the quoting and
+    the open commands are back to what they were. The rules depending on the
+    lines before the one they check (command case consistency and the
+    package checks) are run again over the command index from the same line,
+    or from the first command whose checks read up to it (the arguments of
+    a command without any are looked up on the lines after it), until the
+    state they share is back to what it was. The lint pragmas are
+    compiled again after each edit; no line is checked again for them, the
+    diagnostics are only filtered when reported.
+    """
+
+    def __init__(self, filename, text, config):
+        self.filename = filename
+        self.config = config
+        self.linter = Linter(config)
+        self._line_rules = self.linter.dispatcher(filename, _is_line_rule)
+        self._file_rules = self.linter.dispatcher(filename, _is_file_state_rule)
+        # The state shared by the file state rules before the first line.
+        self._initial_state = (None, vars(self.linter.package_state()))
+        self._segments = _split_segments(text)
+        self._carriage_returns = sum("\r" in segment for segment in self._segments)
+        self.relinted = (0, 0)
+        self._lint_all()
+
+    @property
+    def text(self):
+        return "".join(self._segments)
+
+    def line(self, index):
+        """
+        Return the line at index, counted from 0 as in the Language Server
+        Protocol, without its line ending.
+        """
+        return self._segments[index].rstrip("\r\n")
+
+    @property
+    def line_count(self):
+        return len(self._segments)
+
+    def _lint_all(self):
+        raw_lines = [_FIRST_LINE, *(segment.rstrip("\r\n") for segment in self._segments), _LAST_LINE]
+        self._pragma_lines = [linenumber for linenumber, line in enumerate(raw_lines) if line.startswith(PRAGMA_PREFIX)]
+        self._compile_pragmas(raw_lines)
+        self.clean_lines = _DocumentLines(raw_lines, self.config, self.linter.package_state())
+        self._diagnostics = [()] * len(raw_lines)
+        self._file_diagnostics = {}
+        # The last line read by the file state rules per line they read past.
+        self._reads = {}
+        self._checkpoints = []
+        self._relint(0, len(raw_lines), len(raw_lines), False)
+
+    def _compile_pragmas(self, raw_lines):
+        pragmas = [(linenumber, raw_lines[linenumber]) for linenumber in self._pragma_lines]
+        self._pragmas = compile_pragmas(pragmas, self.config.allowed_categories)
+
+    def edit(self, start, end, text):
+        """
+        Replace the text between the (line, column) positions start and end,
+        counted from 0 with columns in characters, with text and lint the
+        lines it may change. Positions past the end of a line or of the
+        document are moved back to it.
+        """
+        segments = self._segments
+        start = self._clamp(*start)
+        end = max(start, self._clamp(*end))
+        # The lines around the edit are split again as well: a carriage
+        # return and a newline on both sides of it make a single line ending.
+        first = max(start[0] - 1, 0)
+        last = min(end[0] + 1, len(segments) - 1)
+        old = segments[first : last + 1]
+        joined = "".join(old)
+        offset = sum(map(len, old[: start[0] - first]))
+        start_offset = offset + start[1]
+        end_offset = offset + sum(map(len, old[start[0] - first : end[0] - first])) + end[1]
+        new = _split_segments(joined[:start_offset] + text + joined[end_offset:])
+        if last < len(segments) - 1:
+            # The line after the last one starts right after its line ending.
+            new.pop()
+        segments[first : last + 1] = new
+        self._carriage_returns += sum("\r" in segment for segment in new) - sum("\r" in segment for segment in old)
+
+        self._splice(first + 1, last + 2, [segment.rstrip("\r\n") for segment in new])
+
+    def _clamp(self, line, column):
+        if line >= len(self._segments):
+            line = len(self._segments) - 1
+            column = len(self.line(line))
+        return line, max(0, min(column, len(self.line(line))))
+
+    def _splice(self, start, end, lines):
+        """
+        Replace the lines from start to end, exclusive, with lines and lint
+        the lines that may have changed.
+        """
+        clean_lines = self.clean_lines
+        count = len(lines)
+        delta = count - (end - start)
+        boundary_quote = clean_lines.open_lines.get(end - 1, False)
+        # Back to the closest line where no command is open.
+        first = start
+        while clean_lines.depths[first]:
+            first -= 1
+        clean_lines.raw_lines[start:end] = lines
+        clean_lines.lines[start:end] = [""] * count
+        clean_lines.commands[start:end] = [None] * count
+        clean_lines.depths[start:end] = [0] * count
+        self._diagnostics[start:end] = [()] * count
+        clean_lines.logic_keywords = _shift_keys(clean_lines.logic_keywords, start, end, delta)
+        clean_lines.open_lines = _shift_keys(clean_lines.open_lines, start, end, delta)
+        if clean_lines.flagged is not None:
+            clean_lines.flagged = {
+                linenumber + delta if linenumber >= end else linenumber
+                for linenumber in clean_lines.flagged
+                if not start <= linenumber < end
+            }
+        self._file_diagnostics = _shift_keys(self._file_diagnostics, start, end, delta)
+        self._reads = {
+            linenumber: last + delta if last >= end else last
+            for linenumber, last in _shift_keys(self._reads, start, end, delta).items()
+        }
+        # The state after the lines replaced is the one the lines after them
+        # were checked with, it is kept after the last line replacing them.
+        checkpoints = {}
+        for linenumber, state in self._checkpoints:
+            if start <= linenumber < end:
+                linenumber = start + count - 1
+            elif linenumber >= end:
+                linenumber += delta
+            checkpoints[linenumber] = state
+        self._checkpoints = sorted(checkpoints.items())
+        pragma_lines = [linenumber for linenumber in self._pragma_lines if not start <= linenumber < end]
+        pragma_lines = [linenumber + delta if linenumber >= end else linenumber for linenumber in pragma_lines]
+        pragma_lines.extend(start + index for index, line in enumerate(lines) if line.startswith(PRAGMA_PREFIX))
+        self._pragma_lines = sorted(pragma_lines)
+        self._compile_pragmas(clean_lines.raw_lines)
+        if delta:
+            for token in itertools.islice(clean_lines.commands, start + count, None):
+                if token is not None:
+                    token.linenumber += delta
+                    if token.first_close is not None:
+                        token.first_close = (token.first_close[0] + delta, token.first_close[1])
+                    if token.close is not None:
+                        token.close = (token.close[0] + delta, token.close[1])
+        self._relint(first, start + count, len(clean_lines.raw_lines), boundary_quote)
+
+    def _relint(self, first, changed_end, end, boundary_quote):
+        """
+        Clean, tokenize and check the lines from first on, at least up to
+        changed_end and until the state of the lines after them is the one
+        they were linted with, then run the rules depending on the whole
+        document. boundary_quote is the quoting at the end of the line before
+        changed_end before the edit.
+        """
+        clean_lines = self.clean_lines
+        lines = clean_lines.lines
+        open_lines = clean_lines.open_lines
+        logic_keywords = clean_lines.logic_keywords
+        depths = clean_lines.depths
+        quote = open_lines.get(first - 1, False)
+        old_quote = quote
+        tokenizer = Tokenizer()
+        tokenizer.linenumber = first
+        linenumber = first
+        while linenumber < end:
+            if (
+                linenumber >= changed_end
+                and tokenizer.depth == 0
+                and depths[linenumber] == 0
+                and quote == (boundary_quote if linenumber == changed_end else old_quote)
+            ):
+                break
+            old_quote = open_lines.pop(linenumber, False)
+            cleaned, quote = clean_comments(clean_lines.raw_lines[linenumber], quote)
+            if quote:
+                open_lines[linenumber] = quote
+            lines[linenumber] = cleaned
+            depths[linenumber] = tokenizer.depth
+            clean_lines.commands[linenumber], keyword = tokenizer.feed(cleaned)
+            if keyword is None:
+                logic_keywords.pop(linenumber, None)
+            else:
+                logic_keywords[linenumber] = keyword
+            linenumber += 1
+        self.relinted = (first, linenumber)
+
+        flagged = self.linter.precheck(clean_lines.raw_lines[first:linenumber], first)
+        if flagged is None:
+            clean_lines.flagged = None
+        elif clean_lines.flagged is not None:
+            clean_lines.flagged.difference_update(range(first, linenumber))
+            clean_lines.flagged |= flagged
+        clean_lines.skipped_lines = {}
+        for line in range(first, linenumber):
+            self._diagnostics[line] = self._check(line, self._line_rules)
+        # The checks of the lines before first may have read the lines changed.
+        file_first = min((line for line, last in self._reads.items() if last >= first), default=first)
+        self._check_file_state(min(first, file_first), linenumber)
+
+    def _check(self, linenumber, dispatcher):
+        """
+        Return the (line offset, category, message) of the diagnostics of the
+        rules of dispatcher on linenumber.
+        """
+        clean_lines = self.clean_lines
+        found = []
+
+        def errors(filename, line, category, message):
+            found.append((line - linenumber, category, message))
+
+        token = clean_lines.commands[linenumber]
+        command = None if token is None else token.name.lower()
+        flagged = clean_lines.flagged
+        raw = flagged is None or linenumber in flagged
+        for check in dispatcher.checks(command, linenumber in clean_lines.logic_keywords, raw):
+            check(self.filename, linenumber, clean_lines, errors)
+        return tuple(found)
+
+    def _check_file_state(self, first, stop):
+        """
+        Run the rules depending on the whole document on the lines from first
+        on, at least up to stop and until the state they share is the one the
+        lines after were checked with.
+
+        The state is kept as checkpoints: the lines after which it changed,
+        with a copy of it.
+        """
+        clean_lines = self.clean_lines
+        dispatcher = self._file_rules
+        subscriptions = {subscription for rule in dispatcher.rules for subscription in rule.subscriptions}
+        if all(subscription == COMMAND or not subscription.startswith("<") for subscription in subscriptions):
+            linenumbers = itertools.compress(
+                itertools.count(first), itertools.islice(clean_lines.commands, first, None)
+            )
+        else:
+            linenumbers = range(first, len(clean_lines.raw_lines))
+        old_checkpoints = self._checkpoints
+        old_lines = [linenumber for linenumber, _ in old_checkpoints]
+        index = bisect.bisect_left(old_lines, first)
+        checkpoints = old_checkpoints[:index]
+        state = checkpoints[-1][1] if checkpoints else self._initial_state
+        self._restore_file_state(state)
+        file_diagnostics = self._file_diagnostics = _shift_keys(self._file_diagnostics, first, stop, 0)
+        reads = self._reads = _shift_keys(self._reads, first, stop, 0)
+        clean_lines.skipped_lines = {}
+        lines = clean_lines.lines = _ReadLines(clean_lines.lines)
+        current = 0
+
+        def errors(filename, line, category, message):
+            file_diagnostics.setdefault(current, []).append((line - current, category, message))
+
+        commands = clean_lines.commands
+        logic_keywords = clean_lines.logic_keywords
+        flagged = clean_lines.flagged
+        try:
+            for current in linenumbers:
+                if current >= stop:
+                    index = bisect.bisect_left(old_lines, current)
+                    if _file_state(clean_lines) == (old_checkpoints[index - 1][1] if index else self._initial_state):
+                        checkpoints.extend(old_checkpoints[index:])
+                        break
+                    file_diagnostics.pop(current, None)
+                    reads.pop(current, None)
+                token = commands[current]
+                command = None if token is None else token.name.lower()
+                raw = flagged is None or current in flagged
+                lines.last = current
+                for check in dispatcher.checks(command, current in logic_keywords, raw):
+                    check(self.filename, current, clean_lines, errors)
+                if lines.last > current:
+                    reads[current] = lines.last
+                if _file_state(clean_lines) != state:
+                    state = copy.deepcopy(_file_state(clean_lines))
+                    checkpoints.append((current, state))
+        finally:
+            clean_lines.lines = lines.lines
+        self._checkpoints = checkpoints
+        # done() resets the package state, it is given a copy of it.
+        self._restore_file_state(checkpoints[-1][1] if checkpoints else self._initial_state)
+        self._done = []
+        clean_lines.package_state.done(
+            self.filename, lambda filename, line, category, message: self._done.append((line, category, message))
+        )
+
+    def _restore_file_state(self, state):
+        have_seen_uppercase, package_state = copy.deepcopy(state)
+        self.clean_lines.have_seen_uppercase = have_seen_uppercase
+        self.clean_lines.package_state = self.linter.package_state()
+        vars(self.clean_lines.package_state).update(package_state)
+
+    def result(self):
+        """
+        Return the unfiltered LintResult of the document, as Linter would.
+        Its fixes are empty and its summary None.
+        """
+        filename = self.filename
+        diagnostics = []
+        found = []
+
+        def errors(filename, linenumber, category, message):
+            found.append((linenumber, category, message))
+
+        check_file_name(filename, errors)
+        if self._carriage_returns:
+            errors(filename, 0, "whitespace/newline", "Unexpected carriage return found; better to use only \\n")
+        for linenumber, category, message in found:
+            diagnostics.append((Diagnostic(filename, linenumber, category, message), 0))
+        pragmas = self._pragmas
+        file_diagnostics = self._file_diagnostics
+        line_diagnostics = self._diagnostics
+        linenumbers = set(pragmas.errors).union(
+            file_diagnostics, itertools.compress(itertools.count(), line_diagnostics)
+        )
+        for linenumber in sorted(linenumbers):
+            state = pragmas.state_at(linenumber)
+            reported = line_diagnostics[linenumber]
+            if linenumber in pragmas.errors:
+                reported = ((0, "syntax", pragmas.errors[linenumber]), *reported)
+            for offset, category, message in itertools.chain(reported, file_diagnostics.get(linenumber, ())):
+                diagnostics.append((Diagnostic(filename, linenumber + offset, category, message), state))
+        for linenumber, category, message in self._done:
+            diagnostics.append((Diagnostic(filename, linenumber, category, message), 0))
+        raw_lines = self.clean_lines.raw_lines
+        lines = {diagnostic.linenumber: raw_lines[diagnostic.linenumber] for diagnostic, _ in diagnostics}
+        lines[0] = ""
+        return LintResult(diagnostics, pragmas.states, {}, None, lines)
+
+    def diagnostics(self):
+        """
+        Return the Diagnostic of the document that pass the filters, by line.
+        """
+        diagnostics = self.result().filtered(self.config.filters)
+        diagnostics.sort(key=lambda diagnostic: diagnostic.linenumber)
+        return diagnostics
@@ -0,0 +1,159 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import stat
+import tempfile
+from typing import NamedTuple
+
+_RE_LINE_ENDING = re.compile(r"(\r\n|\r|\n)")
+
+
+class FileFix(NamedTuple):
+    """
+    The outcome of fixing a file: the number of diagnostics fixed (or that
+    would be on a dry run), the unified diff of the changes on a dry run and
+    why the file was left unchanged, if it could not be fixed.
+    """
+
+    fixed: int
+    diff: str = ""
+    error: str | None = None
+
+
+def _overlaps(edit, edits):
+    # The fixes of several diagnostics may share an edit.
+    return any(
+        edit != other and (edit.start < other.end and other.start < edit.end or edit.start == other.start)
+        for other in edits
+    )
+
+
+def select_fixes(fixes):
+    """
+    Pick the fixes to apply together out of fixes, a dict of tuples of Edit.
+    A fix is left out if one of its edits overlaps a different edit of a fix
+    picked before it, in the order of the file; it is left for the next run.
+
+    Return the keys of the fixes picked and their edits, per line number.
+    """
+    selected = []
+    edits = {}
+    for key, fix in sorted(fixes.items(), key=lambda item: item[1][0][:3]):
+        if any(_overlaps(edit, edits.get(edit.linenumber, ())) for edit in fix):
+            continue
+        for edit in fix:
+            line_edits = edits.setdefault(edit.linenumber, [])
+            if edit not in line_edits:
+                line_edits.append(edit)
+        selected.append(key)
+    return selected, edits
+
+
+def apply_edits(text, edits):
+    """
+    Return text with edits, lists of non-overlapping Edit per line number,
+    applied in a single pass. Line 1 is the first line of text.
+    """
+    # The lines of text at even indices, their endings at odd ones.
+    parts = _RE_LINE_ENDING.split(text)
+    for linenumber, line_edits in edits.items():
+        if linenumber == 0:
+            parts[1::2] = [line_edits[0].replacement] * (len(parts) // 2)
+            continue
+        index = 2 * (linenumber - 1)
+        line = parts[index]
+        pieces = []
+        column = 0
+        for edit in sorted(line_edits):
+            pieces.append(line[column : edit.start])
+            pieces.append(edit.replacement)
+            column = edit.end
+        pieces.append(line[column:])
+        parts[index] = "".join(pieces)
+    return "".join(parts)
+
+
+def _lines(text):
+    parts = _RE_LINE_ENDING.split(text)
+    parts.append("")
+    lines = [line + ending for line, ending in zip(parts[::2], parts[1::2])]
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def unified_diff(filename, text, fixed_text):
+    # Only needed for dry runs, not imported upfront.
+    import difflib
+
+    diff = difflib.unified_diff(_lines(text), _lines(fixed_text), filename, filename)
+    return "".join(line if line.endswith("\n") else line + "\n" for line in diff)
+
+
+def _replace_file(filename, data):
+    """
+    Replace the contents of filename, or of the file it links to, with data
+    through a temporary file renamed over it, keeping its permissions.
+    """
+    path = os.path.realpath(filename)
+    mode = stat.S_IMODE(os.stat(path).st_mode)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".cmakelint-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def fix_file(filename, result, config):
+    """
+    Fix the diagnostics of result, the LintResult of the file at filename,
+    that pass the filters of config, by rewriting the file once, if it
+    changes and unless config.fix_dry_run.
+
+    Return the diagnostics left, all of them on a dry run, and the FileFix.
+    """
+    diagnostics = result.diagnostics
+    kept = list(result.kept(config.filters))
+    fixes = {index: result.fixes[index] for index in kept if index in result.fixes}
+    if not fixes:
+        return [diagnostics[index][0] for index in kept], FileFix(0)
+    with open(filename, "rb") as f:
+        data = f.read()
+    try:
+        text = data.decode(config.encoding)
+    except UnicodeDecodeError:
+        # The lint replaced the undecodable bytes, which must not be written back.
+        return [diagnostics[index][0] for index in kept], FileFix(0, error=f"not valid {config.encoding}")
+    selected, edits = select_fixes(fixes)
+    fixed_text = apply_edits(text, edits)
+    if config.fix_dry_run:
+        return [diagnostics[index][0] for index in kept], FileFix(
+            len(selected), unified_diff(filename, text, fixed_text)
+        )
+    if fixed_text != text:
+        try:
+            _replace_file(filename, fixed_text.encode(config.encoding))
+        except OSError as e:
+            return [diagnostics[index][0] for index in kept], FileFix(0, error=e.strerror or str(e))
+    fixed = set(selected)
+    return [diagnostics[index][0] for index in kept if index not in fixed], FileFix(len(selected))
@@ -0,0 +1,154 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import re
+import subprocess
+from typing import NamedTuple
+
+_RE_HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class GitError(Exception):
+    pass
+
+
+class ChangedFile(NamedTuple):
+    """
+    A file changed since the diff base: new is True if it was added or
+    renamed, starts and ends the sorted first and last line numbers of its
+    changed line ranges.
+    """
+
+    new: bool
+    starts: list
+    ends: list
+
+    def keeps(self, diagnostic):
+        """
+        Return True if diagnostic is on a changed line, or is about the file
+        as a whole (line 0) and the file is new.
+        """
+        if diagnostic.linenumber == 0:
+            return self.new
+        i = bisect.bisect_right(self.starts, diagnostic.linenumber) - 1
+        return i >= 0 and diagnostic.linenumber <= self.ends[i]
+
+
+def _git(args, cwd=None):
+    try:
+        proc = subprocess.run(["git", *args], cwd=cwd, capture_output=True)
+    except OSError as e:
+        raise GitError(f"cannot run git: {e}") from e
+    if proc.returncode != 0:
+        raise GitError(proc.stderr.decode(errors="replace").strip() or f"git {args[0]} failed")
+    return proc.stdout.decode("utf-8", errors="surrogateescape")
+
+
+def _unquote(path):
+    # Paths with special characters are C-quoted, non-ASCII bytes as octal.
+    if not path.startswith('"'):
+        return path
+    raw = path[1:-1].encode("latin-1").decode("unicode_escape").encode("latin-1")
+    return raw.decode("utf-8", errors="surrogateescape")
+
+
+def _strip_prefix(path):
+    # Unquoted paths with spaces are followed by a tab, for GNU patch.
+    if path.endswith("\t") and not path.startswith('"'):
+        path = path[:-1]
+    path = _unquote(path)
+    return path[2:] if path.startswith("b/") else path
+
+
+def parse_diff(diff):
+    """
+    Return {path: ChangedFile} from the output of git diff -U0, with the
+    paths of the files after the change.
+    """
+    changes = {}
+    path = None
+    new = False
+    starts = []
+    ends = []
+
+    def flush():
+        if path is not None:
+            changes[path] = ChangedFile(new, starts, ends)
+
+    in_header = False
+    # Not splitlines(): the lines of the files may hold other line breaks.
+    for line in diff.split("\n"):
+        if line.startswith("diff --git "):
+            flush()
+            in_header = True
+            path = None
+            new = False
+            starts = []
+            ends = []
+        elif line.startswith("@@"):
+            in_header = False
+            m = _RE_HUNK.match(line)
+            if m is None:
+                continue
+            count = 1 if m.group(2) is None else int(m.group(2))
+            # Hunks only removing lines do not touch any line of the file.
+            if count:
+                starts.append(int(m.group(1)))
+                ends.append(int(m.group(1)) + count - 1)
+        elif not in_header:
+            continue
+        elif line.startswith(("new file mode ", "rename from ")):
+            new = True
+        elif line.startswith("rename to "):
+            path = _unquote(line[len("rename to ") :])
+        elif line.startswith("+++ ") and line != "+++ /dev/null":
+            path = _strip_prefix(line[len("+++ ") :])
+    flush()
+    return changes
+
+
+def changed_files(base, paths=()):
+    """
+    Return {filename: ChangedFile} of the files under paths changed in the
+    working tree since the merge base of base and HEAD, with filenames
+    relative to the current directory. Deleted files are left out.
+    """
+    toplevel = _git(["rev-parse", "--show-toplevel"]).strip()
+    merge_base = _git(["merge-base", base, "HEAD"]).strip()
+    pathspecs = [os.path.relpath(os.path.realpath(path), toplevel) for path in paths]
+    diff = _git(
+        [
+            "-c",
+            "core.quotePath=true",
+            "diff",
+            "--no-color",
+            "--no-ext-diff",
+            "--no-textconv",
+            "--src-prefix=a/",
+            "--dst-prefix=b/",
+            "--unified=0",
+            "--find-renames",
+            "--diff-filter=d",
+            merge_base,
+            "--",
+            *pathspecs,
+        ],
+        cwd=toplevel,
+    )
+    return {os.path.relpath(os.path.join(toplevel, path)): change for path, change in parse_diff(diff).items()}
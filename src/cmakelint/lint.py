@@ -15,75 +15,492 @@ the License.
 
 from __future__ import annotations
 
+import functools
+import itertools
+import operator
 import os
 import re
+from array import array
+from typing import NamedTuple
 
+from cmakelint.pragmas import PRAGMA_PREFIX, compile_pragmas, parse_pragma
+from cmakelint.profile import phase
+from cmakelint.rules import COMMAND, LOGIC, RAW, RULES, load_plugins
 from cmakelint.state import LINT_STATE, PACKAGE_STATE, _CMakePackageState, is_find_package
+from cmakelint.tokenizer import LOGIC_COMMANDS, Tokenizer, tokenize
 
 _RE_COMMAND = re.compile(r"^\s*(\w+)(\s*)\(", re.VERBOSE)
-_RE_COMMAND_START_SPACES = re.compile(r"^\s*\w+\s*\((\s*)", re.VERBOSE)
-_RE_COMMAND_END_SPACES = re.compile(r"(\s*)\)", re.VERBOSE)
-_RE_LOGIC_CHECK = re.compile(r"(\w+)\s*\(\s*\S+[^)]+\)", re.VERBOSE)
+# The start of a match of r"(\w+)\s*\(\s*\S+[^)]+\)", which backtracks in
+# quadratic time on long lines: the rest only needs a ")" after it.
+_RE_LOGIC_CHECK = re.compile(r"(?<!\w)(\w+)\s*\(\s*\S\)*[^)]")
 _RE_COMMAND_ARG = re.compile(r"(\w+)", re.VERBOSE)
-_logic_commands = """
-else
-endforeach
-endfunction
-endif
-endmacro
-endwhile
-""".split()
+_RE_ARGUMENT = re.compile(r"[^\s()]+")
+_logic_commands = LOGIC_COMMANDS
+# Files larger than this are linted by streaming their lines.
+_STREAMING_THRESHOLD = 8 * 1024 * 1024
+_RE_NEWLINE = re.compile(r"\r\n|\r|\n")
+# The characters that may change the state of clean_comments() outside of
+# arguments: quotes, comments, bracket comments and bracket arguments.
+_RE_CODE_SPECIAL = re.compile(r'"|#(?:\[(=*)\[)?|\[(=*)\[')
+_RE_QUOTE_END = re.compile(r'(?<!\\)"')
+_BRACKET_PRECEDERS = frozenset(" \t()")
+# Files of at least this many lines are prechecked with NumPy, if installed.
+_NUMPY_LINES = 256 * 1024
+# Number of lines of a streamed file prechecked at once.
+_PRECHECK_LINES = 1024
+_LAST_CHARACTER = operator.itemgetter(slice(-1, None))
+_HAS_TAB = operator.methodcaller("__contains__", "\t")
+_LSTRIP_SPACES = operator.methodcaller("lstrip", " ")
+
+
+class _Bracket(NamedTuple):
+    """
+    A bracket argument, or a bracket comment, left open at the end of a line
+    and ended by close.
+    """
+
+    close: str
+    comment: bool
 
 
 def clean_comments(line, quote=False):
     """
-    quote means 'was in a quote starting this line' so that
-    quoted lines can be eaten/removed.
+    Return line without its comments and the contents of its quoted and
+    bracket arguments, and the state to clean the next line with.
+
+    quote is the state at the start of the line: False, True within a quoted
+    argument or the _Bracket of a bracket argument "[=[ ... ]=]" or bracket
+    comment "#[=[ ... ]=]" spanning lines. The scan jumps from one character
+    that may change the state to the next.
     """
-    if line.find("#") == -1 and line.find('"') == -1:
-        if quote:
-            return "", quote
-        else:
+    # Lines without comments nor quotes are left as they are, trailing
+    # whitespace included.
+    stripped = True
+    if quote is False:
+        stripped = "#" in line or '"' in line
+        if not stripped and "[" not in line:
             return line, quote
-    # else have to check for comment
+        # Most comments take a whole line.
+        head = line.lstrip()
+        if head[:1] == "#" and head[1:2] != "[":
+            return "", quote
+    elif quote is True:
+        if '"' not in line:
+            return "", quote
+    elif quote.close not in line:
+        return "", quote
     prior = []
-    prev = ""
-    for char in line:
-        try:
-            if char == '"':
-                if prev != "\\":
-                    quote = not quote
-                    prior.append(char)
-                continue
-            elif char == "#" and not quote:
+    pos = 0
+    while True:
+        if quote is True:
+            m = _RE_QUOTE_END.search(line, pos)
+            if m is None:
                 break
-            if not quote:
-                prior.append(char)
-        finally:
-            prev = char
-
+            prior.append('"')
+            pos = m.end()
+            quote = False
+        elif quote:
+            end = line.find(quote.close, pos)
+            if end == -1:
+                break
+            pos = end + len(quote.close)
+            if not quote.comment:
+                prior.append(quote.close)
+            quote = False
+        else:
+            m = _RE_CODE_SPECIAL.search(line, pos)
+            if m is None:
+                prior.append(line[pos:])
+                break
+            start = m.start()
+            prior.append(line[pos:start])
+            pos = m.end()
+            token = m.group()
+            if token == '"':
+                # An escaped quote is dropped.
+                if not (start and line[start - 1] == "\\"):
+                    prior.append(token)
+                    quote = True
+            elif token == "#":
+                break
+            elif token[0] == "#":
+                quote = _Bracket("]" + m.group(1) + "]", True)
+            elif start and line[start - 1] not in _BRACKET_PRECEDERS:
+                # Only an argument may start with a bracket.
+                prior.append("[")
+                pos = start + 1
+            else:
+                prior.append(token)
+                quote = _Bracket("]" + m.group(2) + "]", False)
+                stripped = True
     # rstrip removes trailing space between end of command and the comment # start
+    cleaned = "".join(prior)
+    return (cleaned.rstrip() if stripped else cleaned), quote
 
-    return "".join(prior).rstrip(), quote
 
+class _LineStore:
+    """
+    A sequence of lines held as one string, with the offset of the start of
+    each line in an array, rather than as one string object per line.
+    Indexing slices the line out; the last line sliced is kept, as the checks
+    of a line look it up several times.
+    """
+
+    __slots__ = ("text", "offsets", "_index", "_line")
 
-class CleansedLines:
     def __init__(self, lines):
+        self.text = "\n".join(lines)
+        # Each line is followed by a newline, the last one by the end of text.
+        starts = itertools.accumulate(map((1).__add__, map(len, lines)), initial=0)
+        self.offsets = array("I" if len(self.text) < 2**32 else "Q", starts)
+        self._index = -1
+        self._line = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index == self._index:
+            return self._line
+        offsets = self.offsets
+        if index < 0:
+            index += len(offsets) - 1
+            if index < 0:
+                raise IndexError(index)
+        try:
+            line = self.text[offsets[index] : offsets[index + 1] - 1]
+        except IndexError:
+            raise IndexError(index) from None
+        self._index = index
+        self._line = line
+        return line
+
+    def __iter__(self):
+        text = self.text
+        offsets = self.offsets
+        for start, end in zip(offsets, itertools.islice(offsets, 1, None)):
+            yield text[start : end - 1]
+
+
+class _CleanedLines:
+    """
+    The cleaned lines of a file. Most lines are left as they are by
+    clean_comments(), only the others are stored, the rest is read from the
+    raw lines.
+    """
+
+    __slots__ = ("raw_lines", "changed")
+
+    def __init__(self, raw_lines, changed):
+        self.raw_lines = raw_lines
+        self.changed = changed
+
+    def __len__(self):
+        return len(self.raw_lines)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.raw_lines)
+            if index < 0:
+                raise IndexError(index)
+        line = self.changed.get(index)
+        return self.raw_lines[index] if line is None else line
+
+    def __iter__(self):
+        changed = self.changed
+        for linenumber, line in enumerate(self.raw_lines):
+            yield changed.get(linenumber, line)
+
+
+class CleansedLines:
+    """
+    The lines of a file with comments and the contents of quoted and bracket
+    arguments removed.
+
+    The cleaned lines are tokenized once: commands holds the CommandToken
+    starting on each line (or None) and logic_keywords the logic keyword of
+    the lines that have one, for the checks to share.
+
+    Besides the lines, this holds the per-file state the checks share: the
+    lint state (settings and filters, which pragmas may change) and the
+    package state of Find modules. Both default to the global ones.
+
+    The cleaning and the tokenizing are timed in profile, if given.
+
+    flagged holds the line numbers flagged by the prechecks, the rules
+    subscribed to RAW only run on those. None means all lines are.
+
+    open_lines maps the numbers of the lines ending within a quoted or
+    bracket argument or a bracket comment to the state of clean_comments()
+    at their end. The fixes leave the whitespace of those alone.
+
+    The lines given are not kept: raw_lines and lines are compact sequences
+    of them, see _LineStore and _CleanedLines.
+    """
+
+    __slots__ = (
+        "have_seen_uppercase",
+        "lint_state",
+        "package_state",
+        "raw_lines",
+        "lines",
+        "commands",
+        "logic_keywords",
+        "skipped_lines",
+        "open_lines",
+        "flagged",
+    )
+
+    def __init__(self, lines, lint_state=None, package_state=None, profile=None):
         self.have_seen_uppercase = None
-        self.raw_lines = lines
-        self.lines = []
+        self.lint_state = LINT_STATE if lint_state is None else lint_state
+        self.package_state = PACKAGE_STATE if package_state is None else package_state
+        self.skipped_lines = {}
+        self.open_lines = {}
+        self.flagged = None
+        cleaned_lines = []
+        changed = {}
         quote = False
-        for line in lines:
-            cleaned, quote = clean_comments(line, quote)
-            self.lines.append(cleaned)
+        with phase(profile, "clean_comments"):
+            for linenumber, line in enumerate(lines):
+                cleaned, quote = clean_comments(line, quote)
+                if quote:
+                    self.open_lines[linenumber] = quote
+                if cleaned != line:
+                    changed[linenumber] = cleaned
+                cleaned_lines.append(cleaned)
+        with phase(profile, "tokenize"):
+            self.commands, self.logic_keywords = tokenize(cleaned_lines)
+        self.raw_lines = _LineStore(lines)
+        self.lines = _CleanedLines(self.raw_lines, changed)
 
     def line_numbers(self):
         return range(0, len(self.lines))
 
 
-def should_print_error(category):
-    should_print = True
-    for f in LINT_STATE.filters:
+class _Window:
+    """
+    The items of a sequence fed in order, addressed by their index, of which
+    only the ones not discarded yet are kept. Indexing past the items fed so
+    far calls pull until it returns False or the item is there.
+    """
+
+    __slots__ = ("items", "end", "pull")
+
+    def __init__(self, pull):
+        self.items = {}
+        self.end = 0
+        self.pull = pull
+
+    def __len__(self):
+        return self.end
+
+    def __getitem__(self, index):
+        while index >= self.end and self.pull():
+            pass
+        try:
+            return self.items[index]
+        except KeyError:
+            raise IndexError(index) from None
+
+    def append(self, item):
+        self.items[self.end] = item
+        self.end += 1
+
+    def discard(self, index):
+        self.items.pop(index, None)
+
+
+class StreamingCleansedLines(CleansedLines):
+    """
+    CleansedLines reading an iterator of lines as the checks need them.
+
+    line_numbers() hands out a line once the command starting on it is
+    closed, and forgets the lines before it as it goes, so that only the
+    lines of the command currently open are held in memory, whatever the
+    size of the file. A command left open holds the rest of the file.
+    """
+
+    __slots__ = ("_source", "_quote", "_tokenizer")
+
+    def __init__(self, lines, lint_state=None, package_state=None):
+        self.have_seen_uppercase = None
+        self.lint_state = LINT_STATE if lint_state is None else lint_state
+        self.package_state = PACKAGE_STATE if package_state is None else package_state
+        self.flagged = None
+        self._source = iter(lines)
+        self._quote = False
+        self._tokenizer = Tokenizer()
+        self.raw_lines = _Window(self._pull)
+        self.lines = _Window(self._pull)
+        self.commands = _Window(self._pull)
+        self.logic_keywords = {}
+        self.skipped_lines = {}
+        self.open_lines = {}
+
+    def _pull(self):
+        line = next(self._source, None)
+        if line is None:
+            return False
+        cleaned, self._quote = clean_comments(line, self._quote)
+        if self._quote:
+            self.open_lines[len(self.lines)] = self._quote
+        token, keyword = self._tokenizer.feed(cleaned)
+        if keyword is not None:
+            self.logic_keywords[len(self.lines)] = keyword
+        self.raw_lines.append(line)
+        self.lines.append(cleaned)
+        self.commands.append(token)
+        return True
+
+    def line_numbers(self):
+        linenumber = 0
+        while linenumber < len(self.lines) or self._pull():
+            token = self.commands[linenumber]
+            # The matching ")" comes last, so the first one is known as well.
+            while token is not None and token.close is None and self._pull():
+                pass
+            yield linenumber
+            self.raw_lines.discard(linenumber)
+            self.lines.discard(linenumber)
+            self.commands.discard(linenumber)
+            self.logic_keywords.pop(linenumber, None)
+            # The fixes of a line look at whether the line before it is open.
+            self.open_lines.pop(linenumber - 1, None)
+            linenumber += 1
+
+
+class Diagnostic(NamedTuple):
+    filename: str
+    linenumber: int
+    category: str
+    message: str
+
+    def __str__(self):
+        return f"{self.filename}:{self.linenumber}: {self.message} [{self.category}]"
+
+
+class Edit(NamedTuple):
+    """
+    Replace the columns start to end of a raw line with replacement. An edit
+    of line 0, where the diagnostics about the whole file are reported,
+    replaces the line endings of the file with replacement.
+    """
+
+    linenumber: int
+    start: int
+    end: int
+    replacement: str
+
+
+class FileSummary(NamedTuple):
+    """
+    What the project rules (see cmakelint.project) need to know about a file,
+    gathered while linting it: the commands it uses (lowercase), how many
+    commands are written in upper and in lower case, and the first unquoted
+    arguments of its find_package() and include() commands.
+    """
+
+    commands: tuple
+    uppercase: int
+    lowercase: int
+    packages: tuple
+    includes: tuple
+
+
+class _Summarizer:
+    """
+    Builds the FileSummary of a file from the command tokens of its lines.
+    """
+
+    __slots__ = ("spellings", "packages", "includes")
+
+    def __init__(self):
+        self.spellings = {}
+        self.packages = []
+        self.includes = []
+
+    def feed(self, token, clean_lines):
+        name = token.name
+        self.spellings[name] = self.spellings.get(name, 0) + 1
+        lower = name.lower()
+        if lower == "find_package" or lower == "include":
+            argument = get_first_argument(token, clean_lines)
+            if argument is not None:
+                (self.packages if lower == "find_package" else self.includes).append(argument)
+
+    def summary(self):
+        uppercase = lowercase = 0
+        for name, count in self.spellings.items():
+            if name.isupper():
+                uppercase += count
+            elif name.islower():
+                lowercase += count
+        commands = tuple(sorted({name.lower() for name in self.spellings}))
+        return FileSummary(commands, uppercase, lowercase, tuple(self.packages), tuple(self.includes))
+
+
+class LintResult(NamedTuple):
+    """
+    The diagnostics of a file before filtering.
+
+    Each diagnostic is stored together with the index of the pragma filter
+    state it was reported in, see cmakelint.pragmas.Pragmas, so the filtering
+    can be replayed later against any configured filters. fixes maps the
+    index of the diagnostics that can be fixed to the tuple of their Edit,
+    summary is the FileSummary of the file and lines maps the line numbers
+    diagnostics are reported on to the raw text of the line, empty for line
+    0, to fingerprint them without reading the file again.
+    """
+
+    diagnostics: list
+    pragma_states: list
+    fixes: dict
+    summary: FileSummary
+    lines: dict
+
+    def filtered(self, filters):
+        diagnostics = self.diagnostics
+        return [diagnostics[index][0] for index in self.kept(filters)]
+
+    def kept(self, filters):
+        """
+        Yield the indices of the diagnostics that pass filters.
+        """
+        states = self.pragma_states
+        # Whether a category is printed per (state, category), so that the
+        # filters of each state are folded in once per category.
+        printed = {}
+        for index, (diagnostic, state) in enumerate(self.diagnostics):
+            category = diagnostic.category
+            should_print = printed.get((state, category))
+            if should_print is None:
+                # Fold in the filters of the states up from the closest
+                # ancestor already known, or from the configured filters.
+                pending = []
+                ancestor = state
+                while ancestor >= 0 and (ancestor, category) not in printed:
+                    pending.append(ancestor)
+                    ancestor = states[ancestor][0]
+                if ancestor < 0:
+                    should_print = _fold_filters(category, filters, True)
+                else:
+                    should_print = printed[ancestor, category]
+                for ancestor in reversed(pending):
+                    should_print = _fold_filters(category, states[ancestor][1], should_print)
+                    printed[ancestor, category] = should_print
+            if should_print:
+                yield index
+
+
+def should_print_error(category, filters=None):
+    if filters is None:
+        filters = LINT_STATE.filters
+    return _fold_filters(category, filters, True)
+
+
+def _fold_filters(category, filters, should_print):
+    for f in filters:
         if f.startswith("-") and category.startswith(f[1:]):
             should_print = False
         elif f.startswith("+") and category.startswith(f[1:]):
@@ -91,6 +508,14 @@ def should_print_error(category):
     return should_print
 
 
+def enabled_plugins(config):
+    """
+    Return the categories of the third-party rules to run with config: they
+    are only imported when their category is not filtered out.
+    """
+    return [category for category in config.plugins if should_print_error(category, config.filters)]
+
+
 def error(filename, linenumber, category, message):
     if should_print_error(category):
         LINT_STATE.errors += 1
@@ -102,10 +527,9 @@ def check_line_length(filename, linenumber, clean_lines, errors):
     Check for lines longer than the recommended length
     """
     line = clean_lines.raw_lines[linenumber]
-    if len(line) > LINT_STATE.linelength:
-        return errors(
-            filename, linenumber, "linelength", "Lines should be <= %d characters long" % (LINT_STATE.linelength)
-        )
+    linelength = clean_lines.lint_state.linelength
+    if len(line) > linelength:
+        return errors(filename, linenumber, "linelength", "Lines should be <= %d characters long" % (linelength))
 
 
 def contains_command(line):
@@ -134,9 +558,9 @@ def check_upper_lower_case(filename, linenumber, clean_lines, errors):
     """
     Check that commands are either lower case or upper case, but not both
     """
-    line = clean_lines.lines[linenumber]
-    if contains_command(line):
-        command = get_command(line)
+    token = clean_lines.commands[linenumber]
+    if token is not None:
+        command = token.name
         if is_command_mixed_case(command):
             return errors(filename, linenumber, "readability/wonkycase", "Do not use mixed case commands")
         if clean_lines.have_seen_uppercase is None:
@@ -148,71 +572,58 @@ def check_upper_lower_case(filename, linenumber, clean_lines, errors):
 
 
 def get_initial_spaces(line):
-    initial_spaces = 0
-    while initial_spaces < len(line) and line[initial_spaces] == " ":
-        initial_spaces += 1
-    return initial_spaces
+    return len(line) - len(line.lstrip(" "))
 
 
 def check_command_spaces(filename, linenumber, clean_lines, errors):
     """
     No extra spaces between command and parenthesis
     """
-    line = clean_lines.lines[linenumber]
-    match = contains_command(line)
-    if match and len(match.group(2)):
-        errors(filename, linenumber, "whitespace/extra", f"Extra spaces between '{match.group(1)}' and its ()")
-    if match:
-        spaces_after_open = len(_RE_COMMAND_START_SPACES.match(line).group(1))
+    token = clean_lines.commands[linenumber]
+    if token is None:
+        return
+    if token.spaces_before_paren:
+        errors(filename, linenumber, "whitespace/extra", f"Extra spaces between '{token.name}' and its ()")
+    if token.first_close is None:
+        errors(filename, linenumber, "syntax", "Unable to find the end of this command")
+        return
+    end_linenumber, end_column = token.first_close
+    line = clean_lines.lines[end_linenumber]
+    spaces_before_end = end_column - len(line[:end_column].rstrip())
+    if end_linenumber != linenumber:
         initial_spaces = get_initial_spaces(line)
-        initial_linenumber = linenumber
-        end = None
-        while True:
-            line = clean_lines.lines[linenumber]
-            end = _RE_COMMAND_END_SPACES.search(line)
-            if end:
-                break
-            linenumber += 1
-            if linenumber >= len(clean_lines.lines):
-                break
-        if linenumber == len(clean_lines.lines) and not end:
-            errors(filename, initial_linenumber, "syntax", "Unable to find the end of this command")
-        if end:
-            spaces_before_end = len(end.group(1))
-            initial_spaces = get_initial_spaces(line)
-            if initial_linenumber != linenumber and spaces_before_end >= initial_spaces:
-                spaces_before_end -= initial_spaces
+        if spaces_before_end >= initial_spaces:
+            spaces_before_end -= initial_spaces
 
-            if spaces_after_open != spaces_before_end:
-                errors(
-                    filename, initial_linenumber, "whitespace/mismatch", "Mismatching spaces inside () after command"
-                )
+    if token.spaces_after_open != spaces_before_end:
+        errors(filename, linenumber, "whitespace/mismatch", "Mismatching spaces inside () after command")
 
 
 def check_repeat_logic(filename, linenumber, clean_lines, errors):
     """
     Check for logic inside else, endif etc
     """
+    cmd = clean_lines.logic_keywords.get(linenumber)
+    if cmd is None:
+        return
     line = clean_lines.lines[linenumber]
-    for cmd in _logic_commands:
-        if re.search(rf"\b{cmd}\b", line.lower()):
-            m = _RE_LOGIC_CHECK.search(line)
-            if m:
-                errors(
-                    filename,
-                    linenumber,
-                    "readability/logic",
-                    f"Expression repeated inside {cmd}; " + f"better to use only {m.group(1)}()",
-                )
-            break
+    m = _RE_LOGIC_CHECK.search(line)
+    if m and m.end() <= line.rfind(")"):
+        errors(
+            filename,
+            linenumber,
+            "readability/logic",
+            f"Expression repeated inside {cmd}; " + f"better to use only {m.group(1)}()",
+        )
 
 
 def check_indent(filename, linenumber, clean_lines, errors):
     line = clean_lines.raw_lines[linenumber]
     initial_spaces = get_initial_spaces(line)
-    remainder = initial_spaces % LINT_STATE.spaces
+    spaces = clean_lines.lint_state.spaces
+    remainder = initial_spaces % spaces
     if remainder != 0:
-        errors(filename, linenumber, "whitespace/indent", "Weird indentation; use %d spaces" % (LINT_STATE.spaces))
+        errors(filename, linenumber, "whitespace/indent", "Weird indentation; use %d spaces" % (spaces))
 
 
 def check_style(filename, linenumber, clean_lines, errors):
@@ -224,6 +635,14 @@ def check_style(filename, linenumber, clean_lines, errors):
     """
     check_indent(filename, linenumber, clean_lines, errors)
     check_command_spaces(filename, linenumber, clean_lines, errors)
+    check_whitespace(filename, linenumber, clean_lines, errors)
+    check_repeat_logic(filename, linenumber, clean_lines, errors)
+
+
+def check_whitespace(filename, linenumber, clean_lines, errors):
+    """
+    No tabs and no whitespace at the end of lines
+    """
     line = clean_lines.raw_lines[linenumber]
     if line.find("\t") != -1:
         errors(filename, linenumber, "whitespace/tabs", "Tab found; please use spaces")
@@ -231,8 +650,6 @@ def check_style(filename, linenumber, clean_lines, errors):
     if line and line[-1].isspace():
         errors(filename, linenumber, "whitespace/eol", "Line ends in whitespace")
 
-    check_repeat_logic(filename, linenumber, clean_lines, errors)
-
 
 def check_file_name(filename, errors):
     name_match = re.match(r"Find(.*)\.cmake", os.path.basename(filename))
@@ -251,65 +668,269 @@ def check_file_name(filename, errors):
 
 
 def get_command_argument(linenumber, clean_lines):
-    line = clean_lines.lines[linenumber]
-    skip = get_command(line)
-    while True:
-        line = clean_lines.lines[linenumber]
-        m = _RE_COMMAND_ARG.finditer(line)
-        for i in m:
-            if i.group(1) == skip:
-                continue
-            return i.group(1)
+    """
+    Return the first word of the command at linenumber which is not the
+    command name, looking past the end of the command if it has none.
+    """
+    token = clean_lines.commands[linenumber]
+    skip = ""
+    if token is not None:
+        skip = token.name
+        argument = _find_word(clean_lines, skip, (linenumber, token.open_column + 1), token.close)
+        if argument is not None:
+            return argument
+    argument = _find_word(clean_lines, skip, (linenumber, 0))
+    return "" if argument is None else argument
+
+
+def _find_word(clean_lines, skip, start, end=None):
+    """
+    Return the first word other than skip between the (linenumber, column)
+    positions start and end of the cleaned lines, or the end of the file if
+    end is None. Returns None if there is none.
+
+    The last run of lines holding no other word is kept per skip word in
+    clean_lines.skipped_lines and jumped over, so that the lookups of a file,
+    which go forward, scan each line once whatever the number of commands
+    left open or without arguments.
+    """
+    lines = clean_lines.lines
+    linenumber, column = start
+    first, last = clean_lines.skipped_lines.get(skip, (0, -1))
+    while end is None or linenumber <= end[0]:
+        if first <= linenumber <= last:
+            linenumber = last + 1
+            column = 0
+            continue
+        try:
+            line = lines[linenumber]
+        except IndexError:
+            return None
+        stop = end[1] if end is not None and linenumber == end[0] else len(line)
+        for m in _RE_COMMAND_ARG.finditer(line, column, stop):
+            if m.group() != skip:
+                return m.group()
+        if column == 0 and stop == len(line):
+            if linenumber != last + 1:
+                first = linenumber
+            last = linenumber
+            clean_lines.skipped_lines[skip] = (first, last)
         linenumber += 1
-    return ""
+        column = 0
+    return None
+
+
+def get_first_argument(token, clean_lines):
+    """
+    Return the first argument of the command of token as written on the
+    cleaned lines (empty quotes for a quoted one), or None if it has none or
+    is never closed.
+    """
+    end = token.close
+    if end is None:
+        return None
+    lines = clean_lines.lines
+    linenumber = token.linenumber
+    column = token.open_column + 1
+    while linenumber <= end[0]:
+        line = lines[linenumber]
+        stop = end[1] if linenumber == end[0] else len(line)
+        m = _RE_ARGUMENT.search(line, column, stop)
+        if m:
+            return m.group()
+        linenumber += 1
+        column = 0
+    return None
 
 
 def check_find_package(filename, linenumber, clean_lines, errors):
-    cmd = get_command(clean_lines.lines[linenumber])
-    if cmd:
+    token = clean_lines.commands[linenumber]
+    if token is not None:
+        cmd = token.name
         if cmd.lower() == "include":
             var_name = get_command_argument(linenumber, clean_lines)
-            PACKAGE_STATE.have_included(var_name)
+            clean_lines.package_state.have_included(var_name)
         elif cmd.lower() == "find_package_handle_standard_args":
             var_name = get_command_argument(linenumber, clean_lines)
-            PACKAGE_STATE.have_used_standard_args(filename, linenumber, var_name, errors)
+            clean_lines.package_state.have_used_standard_args(filename, linenumber, var_name, errors)
+
+
+def _code_edit(linenumber, clean_lines, start, end, replacement):
+    """
+    Return the Edit replacing the columns start to end of the cleaned line
+    on the raw line, or None if they cannot be located there.
+
+    The cleaned line is the raw line up to the first argument or comment it
+    drops. Past that, the columns are looked up at the same distance from
+    the end of the line, and only if cleaning the edited raw line gives the
+    edited cleaned line.
+    """
+    line = clean_lines.raw_lines[linenumber]
+    cleaned = clean_lines.lines[linenumber]
+    if line[:end] == cleaned[:end]:
+        return Edit(linenumber, start, end, replacement)
+    offset = len(line) - len(cleaned)
+    edited = line[: start + offset] + replacement + line[end + offset :]
+    quote = clean_lines.open_lines.get(linenumber - 1, False)
+    if clean_comments(edited, quote)[0] != cleaned[:start] + replacement + cleaned[end:]:
+        return None
+    return Edit(linenumber, start + offset, end + offset, replacement)
+
+
+def fix_eol(linenumber, clean_lines):
+    # Trailing whitespace within an argument is part of it.
+    if linenumber in clean_lines.open_lines:
+        return []
+    line = clean_lines.raw_lines[linenumber]
+    return [Edit(linenumber, len(line.rstrip()), len(line), "")]
+
+
+def fix_tabs(linenumber, clean_lines):
+    """
+    Expand the tabs of the indentation to the next multiple of spaces,
+    replace those between the words of the code with a space and remove the
+    trailing whitespace holding some. Not fixable if some of the tabs are
+    within arguments or comments.
+    """
+    spaces = clean_lines.lint_state.spaces
+    if spaces < 1 or linenumber - 1 in clean_lines.open_lines or linenumber in clean_lines.open_lines:
+        return []
+    line = clean_lines.raw_lines[linenumber]
+    cleaned = clean_lines.lines[linenumber]
+    end = len(line.rstrip())
+    indent = min(len(line) - len(line.lstrip(" \t")), end)
+    edits = []
+    covered = line.count("\t", 0, indent)
+    if covered:
+        edits.append(Edit(linenumber, 0, indent, line[:indent].expandtabs(spaces)))
+    # The cleaned line only holds code.
+    code_end = len(cleaned.rstrip())
+    column = cleaned.find("\t", indent, code_end)
+    while column != -1:
+        edit = _code_edit(linenumber, clean_lines, column, column + 1, " ")
+        if edit is not None and edit.end <= end:
+            edits.append(edit)
+            covered += 1
+        column = cleaned.find("\t", column + 1, code_end)
+    trailing = line.count("\t", end)
+    if trailing:
+        # The same edit as the one of fix_eol.
+        edits.append(Edit(linenumber, end, len(line), ""))
+        covered += trailing
+    return edits if covered == line.count("\t") else []
+
+
+def fix_indent(linenumber, clean_lines):
+    """
+    Round the indentation to the nearest multiple of spaces, unless it holds
+    tabs, left to fix_tabs.
+    """
+    if linenumber - 1 in clean_lines.open_lines:
+        return []
+    line = clean_lines.raw_lines[linenumber]
+    initial_spaces = get_initial_spaces(line)
+    if line[initial_spaces : initial_spaces + 1].isspace() or not line.strip():
+        return []
+    spaces = clean_lines.lint_state.spaces
+    indent = (initial_spaces + spaces // 2) // spaces * spaces
+    return [Edit(linenumber, 0, initial_spaces, " " * indent)]
+
+
+def fix_extra(linenumber, clean_lines):
+    token = clean_lines.commands[linenumber]
+    if token is None:
+        return []
+    edit = _code_edit(linenumber, clean_lines, token.name_end, token.open_column, "")
+    return [] if edit is None else [edit]
+
+
+def fix_mismatch(linenumber, clean_lines):
+    """
+    Reduce the spaces on the side of the parentheses that has more to the
+    number of the other side, for the commands ending on their first line.
+    """
+    token = clean_lines.commands[linenumber]
+    if token is None or token.first_close is None or token.first_close[0] != linenumber:
+        return []
+    end_column = token.first_close[1]
+    line = clean_lines.lines[linenumber]
+    spaces_before_end = end_column - len(line[:end_column].rstrip())
+    spaces_after_open = token.spaces_after_open
+    if spaces_after_open > spaces_before_end:
+        start = token.open_column + 1
+        edit = _code_edit(linenumber, clean_lines, start, start + spaces_after_open, " " * spaces_before_end)
+    else:
+        start = end_column - spaces_before_end
+        edit = _code_edit(linenumber, clean_lines, start, end_column, " " * spaces_after_open)
+    return [] if edit is None else [edit]
+
+
+def fix_newline(linenumber, clean_lines):
+    return [Edit(0, 0, 0, "\n")]
+
 
+RULES.register(check_line_length, ["linelength"], [RAW])
+RULES.register(check_upper_lower_case, ["readability/wonkycase", "readability/mixedcase"], [COMMAND])
+RULES.register(check_indent, ["whitespace/indent"], [RAW])
+RULES.register(check_command_spaces, ["whitespace/extra", "whitespace/mismatch", "syntax"], [COMMAND])
+RULES.register(check_whitespace, ["whitespace/tabs", "whitespace/eol"], [RAW])
+RULES.register(check_repeat_logic, ["readability/logic"], [LOGIC])
+RULES.register(
+    check_find_package,
+    ["package/stdargs"],
+    ["include", "find_package_handle_standard_args"],
+    files=is_find_package,
+)
+RULES.register_fix("whitespace/eol", fix_eol)
+RULES.register_fix("whitespace/tabs", fix_tabs)
+RULES.register_fix("whitespace/indent", fix_indent)
+RULES.register_fix("whitespace/extra", fix_extra)
+RULES.register_fix("whitespace/mismatch", fix_mismatch)
+RULES.register_fix("whitespace/newline", fix_newline)
 
-def process_line(filename, linenumber, clean_lines, errors):
+
+def process_line(filename, linenumber, clean_lines, errors, dispatcher=None):
     """
     Arguments:
         filename    the name of the file
         linenumber  the line number index
         clean_lines CleansedLines instance
         errors      the error handling function
+        dispatcher  the rules of the file, RULES.dispatcher(filename) by default
     """
-    check_lint_pragma(filename, linenumber, clean_lines.raw_lines[linenumber], errors)
-    check_line_length(filename, linenumber, clean_lines, errors)
-    check_upper_lower_case(filename, linenumber, clean_lines, errors)
-    check_style(filename, linenumber, clean_lines, errors)
-    if is_find_package(filename):
-        check_find_package(filename, linenumber, clean_lines, errors)
+    check_lint_pragma(filename, linenumber, clean_lines.raw_lines[linenumber], errors, clean_lines.lint_state)
+    run_rules(filename, linenumber, clean_lines, errors, dispatcher)
 
 
-def is_valid_file(filename):
-    return filename.endswith(".cmake") or os.path.basename(filename).lower() == "cmakelists.txt"
+def run_rules(filename, linenumber, clean_lines, errors, dispatcher=None):
+    """
+    Run the rules of a line, like process_line() without the lint pragmas.
+    """
+    if dispatcher is None:
+        dispatcher = RULES.dispatcher(filename)
+    token = clean_lines.commands[linenumber]
+    command = None if token is None else token.name.lower()
+    flagged = clean_lines.flagged
+    raw = flagged is None or linenumber in flagged
+    for check in dispatcher.checks(command, linenumber in clean_lines.logic_keywords, raw):
+        check(filename, linenumber, clean_lines, errors)
 
 
-def process_file(filename):
-    # Store and then restore the filters to prevent pragmas in the file from persisting.
-    original_filters = list(LINT_STATE.filters)
-    try:
-        return _process_file(filename)
-    finally:
-        LINT_STATE.filters = original_filters
+def is_valid_file(filename):
+    return filename.endswith(".cmake") or os.path.basename(filename).lower() == "cmakelists.txt"
 
 
-def check_lint_pragma(filename, linenumber, line, errors=None):
-    # Check this line to see if it is a lint_cmake pragma
-    linter_pragma_start = "# lint_cmake: "
-    if line.startswith(linter_pragma_start):
+def check_lint_pragma(filename, linenumber, line, errors=None, lint_state=None):
+    # Check this line to see if it is a lint_cmake pragma. Only plain lists
+    # of filters apply here, the scoped pragmas need the Linter.
+    if line.startswith(PRAGMA_PREFIX):
+        if lint_state is None:
+            lint_state = LINT_STATE
+        directive, filters = parse_pragma(line)
+        if directive is not None:
+            return
         try:
-            LINT_STATE.set_filters(line[len(linter_pragma_start) :])
+            lint_state.set_filters(filters)
         except ValueError as ex:
             if errors:
                 errors(filename, linenumber, "syntax", str(ex))
@@ -317,27 +938,265 @@ def check_lint_pragma(filename, linenumber, line, errors=None):
             print(f"Exception occurred while processing '{filename}:{linenumber}':")
 
 
-def _process_file(filename):
-    lines = ["# Lines start at 1"]
-    have_cr = False
+class _LineReader:
+    """
+    Reads the lines of a file the way the checks expect them: without their
+    line endings, between two sentinel lines so that the first line of the
+    file is line 1. The (linenumber, line) of the lint pragmas are collected
+    in pragmas as they are read, if given.
+    """
+
+    def __init__(self, pragmas=None):
+        self.pragmas = pragmas
+        self.have_cr = False
+
+    def read(self, raw_lines):
+        yield "# Lines start at 1"
+        for linenumber, line in enumerate(raw_lines, 1):
+            line = line.rstrip("\n")
+            if line.endswith("\r"):
+                self.have_cr = True
+                line = line.rstrip("\r")
+            if self.pragmas is not None and line.startswith(PRAGMA_PREFIX):
+                self.pragmas.append((linenumber, line))
+            yield line
+        yield "# Lines end here"
+
+
+def split_lines(text):
+    """
+    Split text at universal newlines, as readlines() of a file opened in
+    text mode would, without the line endings.
+    """
+    lines = _RE_NEWLINE.split(text) if "\r" in text else text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+@functools.lru_cache(maxsize=None)
+def _vectorized():
+    # NumPy is optional, and only worth importing for large files.
+    try:
+        from cmakelint import vectorized
+    except ImportError:
+        return None
+    return vectorized
+
+
+def precheck(lines, linelength, spaces, start=0, vectorize=None):
+    """
+    Return the set of the numbers, counted from start, of the lines with a
+    tab, trailing whitespace, more than linelength characters or an
+    indentation that is not a multiple of spaces, which must be positive.
+
+    The lengths, indentations and last characters of all the lines are
+    computed at once and the lines breaking a limit are picked from them.
+    If vectorize, by default for large files, ASCII lines are prechecked
+    with NumPy when it is installed.
+    """
+    if vectorize is None:
+        vectorize = len(lines) >= _NUMPY_LINES
+    if vectorize:
+        vectorized = _vectorized()
+        if vectorized is not None:
+            text = "\n".join(lines)
+            if text.isascii():
+                return vectorized.precheck(text.encode("ascii"), linelength, spaces, start)
+    flagged = set()
+
+    def pick(flags):
+        flagged.update(itertools.compress(itertools.count(start), flags))
+
+    lengths = list(map(len, lines))
+    if lengths and max(lengths) > linelength:
+        pick(map(linelength.__lt__, lengths))
+    pick(map(str.isspace, map(_LAST_CHARACTER, lines)))
+    if "\t" in "".join(lines):
+        pick(map(_HAS_TAB, lines))
+    if spaces > 1:
+        indents = map(operator.sub, lengths, map(len, map(_LSTRIP_SPACES, lines)))
+        pick(map(spaces.__rmod__, indents))
+    return flagged
+
+
+class Linter:
+    """
+    A lint engine bound to one configuration.
+
+    The configuration is only read, never modified: the filter states of the
+    pragmas and the package state are kept per file. A Linter can therefore
+    be reused for any number of files and shared between threads, unless it
+    is given a cmakelint.profile.Profile to record the time spent per rule.
+    """
+
+    def __init__(self, config=None, profile=None):
+        self.config = LINT_STATE if config is None else config
+        self.profile = profile
+        load_plugins(enabled_plugins(self.config))
+
+    def lint_file(self, filename):
+        """
+        Lint the file at filename and return the list of Diagnostic that
+        pass the filters.
+        """
+        return self.run_file(filename).filtered(self.config.filters)
+
+    def lint_text(self, filename, text):
+        """
+        Lint text as if it were the contents of the file filename.
+        """
+        return self.run_text(filename, text).filtered(self.config.filters)
+
+    def run_file(self, filename):
+        """
+        Lint the file at filename and return the unfiltered LintResult.
+        Large files are streamed, see run_stream(), others are read whole and
+        decoded at once.
+        """
+        size = os.path.getsize(filename)
+        if size > _STREAMING_THRESHOLD:
+            return self.run_stream(filename)
+        with open(filename, "rb") as f, phase(self.profile, "read"):
+            text = self._decode(f.read())
+        return self.run_text(filename, text)
+
+    def _decode(self, data):
+        # Undecodable bytes are replaced rather than failing the whole file.
+        # Pure ASCII data takes the fast path of the codecs that extend it.
+        return str(data, self.config.encoding, "replace")
+
+    def run_stream(self, filename):
+        """
+        Lint the file at filename without reading it into memory, with the
+        same result as run_file(). The file is read twice: pragmas may apply
+        to the whole file, so they are collected first.
+        """
+        reader = _LineReader([])
+        encoding = self.config.encoding
+        # The lines are prechecked along the way, a chunk at a time.
+        flagged = None if self.config.spaces < 1 else set()
+        chunk = []
+        start = 0
+        with open(filename, encoding=encoding, errors="replace", newline="") as f, phase(self.profile, "pragma scan"):
+            for line in reader.read(f):
+                if flagged is None:
+                    continue
+                chunk.append(line)
+                if len(chunk) == _PRECHECK_LINES:
+                    flagged |= self.precheck(chunk, start, True)
+                    start += len(chunk)
+                    chunk = []
+            if chunk:
+                flagged |= self.precheck(chunk, start, True)
+            pragmas = compile_pragmas(reader.pragmas, self.config.allowed_categories)
+        with open(filename, encoding=encoding, errors="replace", newline="") as f:
+            lines = _LineReader().read(f)
+            clean_lines = StreamingCleansedLines(lines, self.config, self.package_state())
+            clean_lines.flagged = flagged
+            return self._run(filename, clean_lines, reader.have_cr, pragmas)
+
+    def run_text(self, filename, text):
+        return self._run_lines(filename, split_lines(text), "\r" in text)
+
+    def run_bytes(self, filename, data):
+        """
+        Lint the contents of a file read in binary mode, decoded with the
+        configured encoding.
+        """
+        return self.run_text(filename, self._decode(data))
+
+    def dispatcher(self, filename, select=None):
+        """
+        Return the dispatcher of the rules run on filename, of the ones
+        select(rule) accepts only if given, timed if profiling.
+        """
+        dispatcher = RULES.dispatcher(filename, select)
+        if self.profile is not None:
+            dispatcher = self.profile.dispatcher(dispatcher)
+        return dispatcher
+
+    def package_state(self):
+        """
+        Return the package state a file is linted from.
+        """
+        return _CMakePackageState()
+
+    def precheck(self, lines, start=0, vectorize=None):
+        """
+        Return the line numbers of lines, counted from start, the raw line
+        checks must run on, or None if they must run on every line.
+        """
+        # Without a positive number of spaces, check_indent runs on every line.
+        config = self.config
+        if config.spaces < 1:
+            return None
+        return precheck(lines, config.linelength, config.spaces, start, vectorize)
+
+    def _run_lines(self, filename, raw_lines, have_cr=False):
+        reader = _LineReader([])
+        with phase(self.profile, "pragma scan"):
+            lines = list(reader.read(raw_lines))
+            pragmas = compile_pragmas(reader.pragmas, self.config.allowed_categories)
+        with phase(self.profile, "precheck"):
+            flagged = self.precheck(lines)
+        clean_lines = CleansedLines(lines, self.config, self.package_state(), self.profile)
+        clean_lines.flagged = flagged
+        # Only the compact copy of the lines is kept while the checks run.
+        del raw_lines, lines
+        return self._run(filename, clean_lines, have_cr or reader.have_cr, pragmas)
+
+    def _run(self, filename, clean_lines, have_cr, pragmas):
+        diagnostics = []
+        # The filter state of the line being checked, 0 for the whole file.
+        state = 0
+        fixes = {}
+        fixers = RULES.fixes
+        lines = {0: ""}
+
+        def errors(filename, linenumber, category, message):
+            diagnostic = Diagnostic(filename, linenumber, category, message)
+            if linenumber not in lines:
+                # Still held while the command it belongs to is checked.
+                lines[linenumber] = clean_lines.raw_lines[linenumber]
+            fixer = fixers.get(category)
+            if fixer is not None:
+                edits = fixer(linenumber, clean_lines)
+                if edits:
+                    fixes[len(diagnostics)] = tuple(edits)
+            diagnostics.append((diagnostic, state))
+
+        check_file_name(filename, errors)
+        if have_cr and os.linesep != "\r\n":
+            errors(filename, 0, "whitespace/newline", "Unexpected carriage return found; " "better to use only \\n")
+        dispatcher = self.dispatcher(filename)
+        summarizer = _Summarizer()
+        commands = clean_lines.commands
+        transitions = pragmas.transitions
+        pragma_errors = pragmas.errors
+        next_transition = 0
+        for line in clean_lines.line_numbers():
+            while next_transition < len(transitions) and transitions[next_transition][0] <= line:
+                state = transitions[next_transition][1]
+                next_transition += 1
+            if pragma_errors:
+                message = pragma_errors.get(line)
+                if message is not None:
+                    errors(filename, line, "syntax", message)
+            run_rules(filename, line, clean_lines, errors, dispatcher)
+            token = commands[line]
+            if token is not None:
+                summarizer.feed(token, clean_lines)
+        state = 0
+        with phase(self.profile, "package done", diagnostics):
+            clean_lines.package_state.done(filename, errors)
+        return LintResult(diagnostics, pragmas.states, fixes, summarizer.summary(), lines)
+
+
+def process_file(filename):
     if not is_valid_file(filename):
         print("Ignoring file: " + filename)
         return
-    global PACKAGE_STATE
-    PACKAGE_STATE = _CMakePackageState()
-    for line in open(filename).readlines():
-        line = line.rstrip("\n")
-        if line.endswith("\r"):
-            have_cr = True
-            line = line.rstrip("\r")
-        lines.append(line)
-        check_lint_pragma(filename, len(lines) - 1, line)
-    lines.append("# Lines end here")
-    # Check file name after reading lines incase of a # lint_cmake: pragma
-    check_file_name(filename, error)
-    if have_cr and os.linesep != "\r\n":
-        error(filename, 0, "whitespace/newline", "Unexpected carriage return found; " "better to use only \\n")
-    clean_lines = CleansedLines(lines)
-    for line in clean_lines.line_numbers():
-        process_line(filename, line, clean_lines, error)
-    PACKAGE_STATE.done(filename, error)
+    for diagnostic in Linter(LINT_STATE).lint_file(filename):
+        LINT_STATE.errors += 1
+        print(diagnostic)
@@ -0,0 +1,253 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import sys
+import traceback
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from cmakelint.__version__ import VERSION
+from cmakelint.config import ConfigError, ConfigResolver
+from cmakelint.lint import is_valid_file
+
+_METHOD_NOT_FOUND = -32601
+_INTERNAL_ERROR = -32603
+_SEVERITY_WARNING = 2
+_SYNC_INCREMENTAL = 2
+
+
+def read_message(stream):
+    """
+    Return the next message of the binary stream, or None at its end.
+    """
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    if length is None:
+        raise ValueError("message without a Content-Length header")
+    body = stream.read(length)
+    if len(body) < length:
+        return None
+    return json.loads(body)
+
+
+def write_message(stream, message):
+    body = json.dumps(message).encode()
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+def uri_to_filename(uri):
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
+        # Documents not saved yet, such as untitled:Untitled-1.
+        return parsed.path
+    return url2pathname(parsed.path)
+
+
+def _utf16_length(text):
+    return len(text) + sum(ord(c) > 0xFFFF for c in text)
+
+
+def _column(line, character, encoding):
+    """
+    Return the index in line of the position character, counted in the
+    code units of the negotiated encoding.
+    """
+    if encoding == "utf-32":
+        return character
+    units = 0
+    for index, c in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(c) > 0xFFFF else 1
+    return len(line)
+
+
+class Server:
+    """
+    Language server publishing the diagnostics of the open documents, linted
+    again as they are edited by cmakelint.document.Document.
+
+    Documents are synced incrementally. Positions are counted in UTF-32 code
+    units when the client supports it, in UTF-16 ones otherwise.
+    """
+
+    def __init__(self, config, output):
+        self.output = output
+        self.resolver = ConfigResolver(config)
+        self.documents = {}
+        self.encoding = "utf-16"
+        self.shutdown = False
+        self.exited = False
+        self.handlers = {
+            "initialize": self._initialize,
+            "shutdown": self._shutdown,
+            "exit": self._exit,
+            "textDocument/didOpen": self._did_open,
+            "textDocument/didChange": self._did_change,
+            "textDocument/didClose": self._did_close,
+        }
+
+    def handle(self, message):
+        """
+        Handle a request or a notification of the client.
+        """
+        method = message.get("method")
+        handler = self.handlers.get(method)
+        if "id" not in message:
+            # Unknown notifications are ignored, as the protocol asks.
+            if handler is not None:
+                try:
+                    handler(message.get("params") or {})
+                except Exception:
+                    sys.stderr.write(traceback.format_exc())
+            return
+        if handler is None:
+            error = {"code": _METHOD_NOT_FOUND, "message": f"Unknown method: {method}"}
+            self._send({"id": message["id"], "error": error})
+            return
+        try:
+            result = handler(message.get("params") or {})
+        except Exception as e:
+            sys.stderr.write(traceback.format_exc())
+            error = {"code": _INTERNAL_ERROR, "message": f"{type(e).__name__}: {e}"}
+            self._send({"id": message["id"], "error": error})
+            return
+        self._send({"id": message["id"], "result": result})
+
+    def _send(self, message):
+        write_message(self.output, {"jsonrpc": "2.0", **message})
+
+    def _notify(self, method, params):
+        self._send({"method": method, "params": params})
+
+    def _initialize(self, params):
+        encodings = params.get("capabilities", {}).get("general", {}).get("positionEncodings", [])
+        self.encoding = "utf-32" if "utf-32" in encodings else "utf-16"
+        return {
+            "capabilities": {
+                "positionEncoding": self.encoding,
+                "textDocumentSync": {"openClose": True, "change": _SYNC_INCREMENTAL},
+            },
+            "serverInfo": {"name": "cmakelint", "version": VERSION},
+        }
+
+    def _shutdown(self, params):
+        self.shutdown = True
+
+    def _exit(self, params):
+        self.exited = True
+
+    def _did_open(self, params):
+        from cmakelint.document import Document
+
+        item = params["textDocument"]
+        uri = item["uri"]
+        filename = uri_to_filename(uri)
+        if not (is_valid_file(filename) or item.get("languageId") == "cmake"):
+            return
+        try:
+            config = self.resolver.resolve(filename)
+        except ConfigError as e:
+            sys.stderr.write(f"cmakelint: error: {e}\n")
+            return
+        self.documents[uri] = Document(filename, item["text"], config)
+        self._publish(uri, item.get("version"))
+
+    def _did_change(self, params):
+        from cmakelint.document import Document
+
+        uri = params["textDocument"]["uri"]
+        document = self.documents.get(uri)
+        if document is None:
+            return
+        for change in params["contentChanges"]:
+            if "range" not in change:
+                document = Document(document.filename, change["text"], document.config)
+                continue
+            start = self._position(document, change["range"]["start"])
+            end = self._position(document, change["range"]["end"])
+            document.edit(start, end, change["text"])
+        self.documents[uri] = document
+        self._publish(uri, params["textDocument"].get("version"))
+
+    def _did_close(self, params):
+        uri = params["textDocument"]["uri"]
+        if self.documents.pop(uri, None) is not None:
+            self._notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    def _position(self, document, position):
+        line = position["line"]
+        if line >= document.line_count:
+            return line, 0
+        return line, _column(document.line(line), position["character"], self.encoding)
+
+    def _publish(self, uri, version):
+        document = self.documents[uri]
+        diagnostics = []
+        for diagnostic in document.diagnostics():
+            # Line 0 stands for the whole file.
+            line = min(max(diagnostic.linenumber - 1, 0), document.line_count - 1)
+            text = document.line(line)
+            length = len(text) if self.encoding == "utf-32" else _utf16_length(text)
+            diagnostics.append(
+                {
+                    "range": {"start": {"line": line, "character": 0}, "end": {"line": line, "character": length}},
+                    "severity": _SEVERITY_WARNING,
+                    "code": diagnostic.category,
+                    "source": "cmakelint",
+                    "message": diagnostic.message,
+                }
+            )
+        params = {"uri": uri, "diagnostics": diagnostics}
+        if version is not None:
+            params["version"] = version
+        self._notify("textDocument/publishDiagnostics", params)
+
+
+def serve(config, input=None, output=None):
+    """
+    Serve the Language Server Protocol over the binary streams input and
+    output, stdin and stdout by default, until the client exits. Returns the
+    exit status: 0 if the client shut the server down first, 1 otherwise.
+    """
+    input = input or sys.stdin.buffer
+    output = output or sys.stdout.buffer
+    server = Server(config, output)
+    # Anything printed would corrupt the messages sent on stdout.
+    with contextlib.redirect_stdout(sys.stderr):
+        while not server.exited:
+            try:
+                message = read_message(input)
+            except ValueError as e:
+                sys.stderr.write(f"cmakelint: error: {e}\n")
+                return 1
+            if message is None:
+                break
+            server.handle(message)
+    return 0 if server.shutdown else 1
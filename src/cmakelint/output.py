@@ -0,0 +1,200 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import abc
+import contextlib
+import os
+import sys
+
+from cmakelint import rules
+from cmakelint.__version__ import VERSION as CMAKELINT_VERSION
+
+# Output is written in chunks of about this many characters.
+_BUFFER_SIZE = 64 * 1024
+
+_SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+_INFORMATION_URI = "https://github.com/PFCCLab/cmake-lint-paddle"
+
+
+class Sink(abc.ABC):
+    """
+    Writes the report of a run to stream, one record at a time, buffering
+    the output in large chunks. Subclasses write each diagnostic.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._chunks = []
+        self._size = 0
+
+    def write(self, text):
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size >= _BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.stream.write("".join(self._chunks))
+        self.stream.flush()
+        self._chunks = []
+        self._size = 0
+
+    def start(self):
+        pass
+
+    def ignored(self, filename):
+        # Structured reports only hold diagnostics.
+        sys.stderr.write(f"Ignoring file: {filename}\n")
+
+    @abc.abstractmethod
+    def diagnostic(self, diagnostic):
+        pass
+
+    def diff(self, diff):
+        # The diffs of --fix-dry-run go to stdout, along with the report if
+        # it is written there, which only the text format allows.
+        if self.stream is sys.stdout:
+            self.write(diff)
+        else:
+            sys.stdout.write(diff)
+
+    def finish(self):
+        self.flush()
+
+
+class TextSink(Sink):
+    """
+    The historical output: "file:line: message [category]" per line.
+    """
+
+    def ignored(self, filename):
+        self.write(f"Ignoring file: {filename}\n")
+
+    def diagnostic(self, diagnostic):
+        self.write(f"{diagnostic}\n")
+
+
+class JsonLinesSink(Sink):
+    """
+    One JSON object per diagnostic, with the fields of Diagnostic.
+    """
+
+    def start(self):
+        # json is only imported by the structured formats.
+        from json import JSONEncoder
+
+        self._encode = JSONEncoder().encode
+
+    def diagnostic(self, diagnostic):
+        # Same as json.dumps(diagnostic._asdict()), without building a dict.
+        _encode = self._encode
+        filename, linenumber, category, message = diagnostic
+        self.write(
+            f'{{"filename": {_encode(filename)}, "linenumber": {int(linenumber)}, '
+            f'"category": {_encode(category)}, "message": {_encode(message)}}}\n'
+        )
+
+
+def _sarif_uri(filename):
+    # Only needed for SARIF logs, not imported upfront.
+    from pathlib import Path
+    from urllib.parse import quote
+
+    if os.path.isabs(filename):
+        return Path(filename).as_uri()
+    return quote(filename.replace(os.sep, "/"))
+
+
+class SarifSink(Sink):
+    """
+    A SARIF 2.1.0 log with a single run, whose results are streamed out as
+    they come: the document is written around them by start() and finish().
+    """
+
+    def start(self):
+        import json
+
+        self._dumps = json.dumps
+        self.categories = rules.ERROR_CATEGORIES.split()
+        self.rule_index = {category: index for index, category in enumerate(self.categories)}
+        self.separator = "\n"
+        log = {
+            "$schema": _SARIF_SCHEMA,
+            "version": "2.1.0",
+            "runs": [
+                {
+                    "tool": {
+                        "driver": {
+                            "name": "cmakelint",
+                            "version": CMAKELINT_VERSION,
+                            "informationUri": _INFORMATION_URI,
+                            "rules": [{"id": category} for category in self.categories],
+                        }
+                    },
+                    "results": [],
+                }
+            ],
+        }
+        # The results are the last list of the document.
+        head, self.tail = self._dumps(log).rsplit("[]", 1)
+        self.write(head + "[")
+
+    def diagnostic(self, diagnostic):
+        location = {"artifactLocation": {"uri": _sarif_uri(diagnostic.filename)}}
+        # Diagnostics about the whole file are reported on line 0.
+        if diagnostic.linenumber > 0:
+            location["region"] = {"startLine": diagnostic.linenumber}
+        result = {
+            "ruleId": diagnostic.category,
+            "level": "error",
+            "message": {"text": diagnostic.message},
+            "locations": [{"physicalLocation": location}],
+        }
+        if diagnostic.category in self.rule_index:
+            result["ruleIndex"] = self.rule_index[diagnostic.category]
+        self.write(self.separator + self._dumps(result))
+        self.separator = ",\n"
+
+    def finish(self):
+        self.write("\n]" + self.tail + "\n")
+        self.flush()
+
+
+SINKS = {
+    "text": TextSink,
+    "jsonl": JsonLinesSink,
+    "sarif": SarifSink,
+}
+
+
+@contextlib.contextmanager
+def open_sink(output_format="text", output=None):
+    """
+    Context manager returning the started sink of output_format, writing to
+    the file output or to stdout if None. The report is completed on exit.
+    """
+    with contextlib.ExitStack() as stack:
+        if output is None:
+            stream = sys.stdout
+        else:
+            stream = stack.enter_context(open(output, "w", encoding="utf-8"))
+        sink = SINKS[output_format](stream)
+        sink.start()
+        try:
+            yield sink
+        finally:
+            sink.finish()
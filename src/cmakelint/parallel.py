@@ -0,0 +1,223 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import itertools
+import sys
+from collections import deque
+
+from cmakelint.config import ConfigResolver
+from cmakelint.lint import Linter, is_valid_file
+from cmakelint.profile import Profile
+
+# Upper bound of files handed to a worker at once, small enough to keep the
+# workers balanced when a few files are much larger than the rest.
+_MAX_CHUNKSIZE = 64
+# Number of files per chunk when the number of files is not known upfront.
+_STREAM_CHUNKSIZE = 8
+# Number of chunks in flight per worker.
+_CHUNKS_PER_WORKER = 4
+
+
+class _FileLinter:
+    """
+    Lint one file at a time with the settings resolved for it, by resolver
+    if given, through the in-memory cache if given and the result cache if
+    one is configured, fix it with --fix and summarize it with --project.
+    """
+
+    def __init__(self, config, profile=None, memory=None, resolver=None):
+        self.linter = Linter(config, profile)
+        if resolver is None:
+            resolver = ConfigResolver(config)
+        else:
+            resolver.rebind(config)
+        self.resolver = resolver
+        # Linter and settings digest per resolved config.
+        self.linters = {config: self.linter}
+        self.settings = {}
+        self.cache = None
+        if config.cache_dir:
+            from cmakelint.cache import ResultCache
+
+            self.cache = ResultCache(config.cache_dir, config, config.cache_max_size)
+        self.memory = memory
+
+    def _linter(self, config):
+        linter = self.linters.get(config)
+        if linter is None:
+            linter = self.linters[config] = Linter(config, self.linter.profile)
+        return linter
+
+    def _settings(self, config):
+        from cmakelint.cache import settings_digest
+
+        settings = self.settings.get(config)
+        if settings is None:
+            settings = self.settings[config] = settings_digest(config)
+        return settings
+
+    def __call__(self, filename):
+        """
+        Returns (None, None, None, None, None) for files that would be
+        ignored, otherwise the list of Diagnostic of the file, the raw text of
+        the lines they are on (see LintResult), the update of the cache index,
+        the cmakelint.fix.FileFix of the file when fixing and its
+        cmakelint.project.ProjectFile with --project, None otherwise.
+        """
+        if not is_valid_file(filename):
+            return None, None, None, None, None
+        config = self.resolver.resolve(filename)
+        linter = self._linter(config)
+        if self.memory is None:
+            result, update = self._lint(linter, filename)
+        else:
+            settings = self._settings(config)
+            result, update = self.memory.lint(filename, settings, lambda filename: self._lint(linter, filename))
+        project = None
+        if config.project:
+            from cmakelint.project import project_file
+
+            project = project_file(filename, result, config)
+        if config.fix or config.fix_dry_run:
+            from cmakelint.fix import fix_file
+
+            diagnostics, fix = fix_file(filename, result, config)
+            return diagnostics, result.lines, update, fix, project
+        return result.filtered(config.filters), result.lines, update, None, project
+
+    def lint_bytes(self, filename, data):
+        """
+        Return (None, None) if filename would be ignored, otherwise the list
+        of Diagnostic of data as the contents of filename and the raw text of
+        the lines they are on.
+        """
+        if not is_valid_file(filename):
+            return None, None
+        config = self.resolver.resolve(filename)
+        result = self._linter(config).run_bytes(filename, data)
+        return result.filtered(config.filters), result.lines
+
+    def _lint(self, linter, filename):
+        if self.cache is None:
+            return linter.run_file(filename), None
+        return self.cache.lint(filename, linter)
+
+
+_FILE_LINTER = None
+
+
+def _init_worker(config, profile):
+    # Workers may be spawned rather than forked, so the parsed command line
+    # options are passed in explicitly instead of read from LINT_STATE.
+    global _FILE_LINTER
+    _FILE_LINTER = _FileLinter(config, Profile() if profile else None)
+
+
+def _lint_chunk(filenames):
+    results = [_FILE_LINTER(filename) for filename in filenames]
+    profile = _FILE_LINTER.linter.profile
+    return results, None if profile is None else profile.pop()
+
+
+def _chunksize(num_files, jobs):
+    return max(1, min(_MAX_CHUNKSIZE, num_files // (jobs * _CHUNKS_PER_WORKER)))
+
+
+def _chunks(filenames, size):
+    iterator = iter(filenames)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _lint_parallel(filenames, config, jobs, profile):
+    """
+    Yield (filename, results) from a pool of workers, in order.
+
+    Chunks are submitted as filenames produces them, with a bounded number
+    in flight, so linting starts while filenames is still being produced.
+    The profiles of the workers are merged into profile, if given.
+    """
+    # Imported here, it pulls in multiprocessing which serial runs do not need.
+    from concurrent.futures import ProcessPoolExecutor
+
+    def chunk_results(chunk, future):
+        results, stats = future.result()
+        if stats is not None:
+            profile.merge(stats)
+        return zip(chunk, results)
+
+    if isinstance(filenames, list):
+        size = _chunksize(len(filenames), jobs)
+    else:
+        size = _STREAM_CHUNKSIZE
+    pending = deque()
+    initargs = (config, profile is not None)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as executor:
+        for chunk in _chunks(filenames, size):
+            pending.append((chunk, executor.submit(_lint_chunk, chunk)))
+            if len(pending) >= jobs * _CHUNKS_PER_WORKER:
+                yield from chunk_results(*pending.popleft())
+        while pending:
+            yield from chunk_results(*pending.popleft())
+
+
+def lint_stdin(filename, config, profile=None):
+    """
+    Lint the contents of stdin as filename. Yields (filename, diagnostics,
+    lines, None, None) once, like lint_files().
+    """
+    diagnostics, lines = _FileLinter(config, profile).lint_bytes(filename, sys.stdin.buffer.read())
+    yield filename, diagnostics, lines, None, None
+
+
+def lint_files(filenames, config, jobs=1, profile=None, memory=None, resolver=None):
+    """
+    Lint filenames, with a pool of jobs worker processes if jobs > 1.
+
+    filenames may be any iterable, it is consumed lazily. Yields
+    (filename, diagnostics, lines, fix, project) in the order of filenames,
+    with diagnostics None for ignored files. The diagnostics of each file are
+    in the order they were reported, whichever process linted it: by line,
+    but for the package checks of the whole file, on line 0, which come last.
+    lines maps their line numbers to the raw text of the lines, see LintResult.
+    fix is None unless config.fix or config.fix_dry_run, then it is the
+    FileFix of the file (see cmakelint.fix) and diagnostics the ones left.
+    project is None unless config.project, then it is the ProjectFile of the
+    file to pass to cmakelint.project.analyze() once all are linted. The time
+    spent per rule is recorded in profile, if given. memory is a MemoryCache
+    of results and resolver a ConfigResolver kept between calls, only used
+    when linting in this process.
+    """
+    file_linter = _FileLinter(config, profile, memory, resolver)
+    if isinstance(filenames, list):
+        jobs = min(jobs, len(filenames))
+    if jobs > 1:
+        results = _lint_parallel(filenames, config, jobs, profile)
+    else:
+        results = ((filename, file_linter(filename)) for filename in filenames)
+    try:
+        for filename, (diagnostics, lines, update, fix, project) in results:
+            if update is not None and jobs > 1:
+                file_linter.cache.update_index(update)
+            yield filename, diagnostics, lines, fix, project
+    finally:
+        results.close()
+        if file_linter.cache is not None:
+            file_linter.cache.save()
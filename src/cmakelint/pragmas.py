@@ -0,0 +1,142 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+from typing import NamedTuple
+
+# The start of the lines holding lint pragmas.
+PRAGMA_PREFIX = "# lint_cmake: "
+_PUSH = "push"
+_POP = "pop"
+_DISABLE_NEXT_LINE = "disable-next-line"
+
+
+class Pragmas(NamedTuple):
+    """
+    The lint pragmas of a file compiled into the filter state of each line.
+
+    states is the list of the (parent, filters) filter states: the filters of
+    a state apply after the ones of its parent, and state 0, whose parent is
+    -1, holds the filters of the pragmas outside of push/pop blocks, which
+    apply to the whole file. transitions is the sorted list of the
+    (linenumber, state) in effect from linenumber on, state 0 before the
+    first one. errors maps the line number of the invalid pragmas to their
+    message.
+    """
+
+    states: list
+    transitions: list
+    errors: dict
+
+    def state_at(self, linenumber):
+        """
+        Return the index in states of the filter state of linenumber.
+        """
+        index = bisect.bisect_right(self.transitions, (linenumber, len(self.states)))
+        return self.transitions[index - 1][1] if index else 0
+
+
+def parse_pragma(line):
+    """
+    Return (directive, filters) for a pragma line: directive is None for a
+    plain list of filters, otherwise "push", "pop" or "disable-next-line",
+    the latter with the filters turning its categories off.
+    """
+    body = line[len(PRAGMA_PREFIX) :]
+    words = body.split(None, 1)
+    directive = words[0] if words else ""
+    if len(words) == 1 and directive in (_PUSH, _POP):
+        return directive, []
+    if directive == _DISABLE_NEXT_LINE:
+        categories = [c.strip() for c in words[1].split(",")] if len(words) > 1 else []
+        return directive, ["-" + c for c in categories if c] or ["-"]
+    return None, [f.strip() for f in body.split(",") if f]
+
+
+@functools.lru_cache(maxsize=16)
+def _category_prefixes(allowed_categories):
+    return frozenset(c[:i] for c in allowed_categories for i in range(len(c) + 1))
+
+
+def check_filters(filters, allowed_categories):
+    """
+    Return the error message of the first invalid filter of filters, None
+    if they are all valid. Each filter is checked in constant time.
+    """
+    prefixes = _category_prefixes(tuple(allowed_categories))
+    for f in filters:
+        if not f.startswith(("-", "+")):
+            return "Filter should start with - or +"
+        if f[1:] not in prefixes:
+            return f"Filter not allowed: {f}"
+    return None
+
+
+def compile_pragmas(pragmas, allowed_categories):
+    """
+    Compile the (linenumber, line) of the pragma lines of a file, in order,
+    into its Pragmas.
+
+    A list of filters applies from its line on, and outside of push/pop
+    blocks also before it, like the filters of the command line. "push"
+    saves the filter state and "pop" restores it. "disable-next-line"
+    turns the given categories, or all of them, off for the next line only.
+    """
+    states = [(-1, ())]
+    file_filters = []
+    changes = {}
+    next_lines = {}
+    errors = {}
+    blocks = []
+    current = 0
+    for linenumber, line in pragmas:
+        directive, filters = parse_pragma(line)
+        if directive == _PUSH:
+            blocks.append(current)
+        elif directive == _POP:
+            if blocks:
+                current = changes[linenumber] = blocks.pop()
+            else:
+                errors[linenumber] = "Pragma pop without a matching push"
+        elif directive == _DISABLE_NEXT_LINE:
+            next_lines[linenumber + 1] = filters
+        elif filters:
+            if not blocks:
+                file_filters.extend(filters)
+            states.append((current, tuple(filters)))
+            current = changes[linenumber] = len(states) - 1
+        if filters:
+            message = check_filters(filters, allowed_categories)
+            if message is not None:
+                errors[linenumber] = message
+    states[0] = (-1, tuple(file_filters))
+    if not next_lines:
+        return Pragmas(states, list(changes.items()), errors)
+    # A line disabled by the previous one derives a state from the one it
+    # would have had, which is restored on the line after it.
+    transitions = []
+    base = 0
+    for linenumber in sorted({*changes, *next_lines, *(linenumber + 1 for linenumber in next_lines)}):
+        base = changes.get(linenumber, base)
+        state = base
+        filters = next_lines.get(linenumber)
+        if filters is not None:
+            states.append((base, tuple(filters)))
+            state = len(states) - 1
+        transitions.append((linenumber, state))
+    return Pragmas(states, transitions, errors)
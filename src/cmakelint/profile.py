@@ -0,0 +1,168 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import time
+
+_CALLS = 0
+_SECONDS = 1
+_DIAGNOSTICS = 2
+
+
+def phase(profile, name, diagnostics=None):
+    """
+    Return profile.phase(name, diagnostics), or a context manager doing
+    nothing if profile is None.
+    """
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.phase(name, diagnostics)
+
+
+class _Phase:
+    __slots__ = ("stat", "diagnostics", "count", "start")
+
+    def __init__(self, stat, diagnostics):
+        self.stat = stat
+        self.diagnostics = diagnostics
+
+    def __enter__(self):
+        self.count = 0 if self.diagnostics is None else len(self.diagnostics)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        stat = self.stat
+        stat[_SECONDS] += time.perf_counter() - self.start
+        stat[_CALLS] += 1
+        if self.diagnostics is not None:
+            stat[_DIAGNOSTICS] += len(self.diagnostics) - self.count
+
+
+class _ProfiledDispatcher:
+    def __init__(self, dispatcher, profile):
+        self.dispatcher = dispatcher
+        self.profile = profile
+        self.table = {}
+
+    def checks(self, command, logic, raw=True):
+        key = (command, logic, raw)
+        checks = self.table.get(key)
+        if checks is None:
+            checks = tuple(self.profile.wrap(check) for check in self.dispatcher.checks(command, logic, raw))
+            self.table[key] = checks
+        return checks
+
+
+class Profile:
+    """
+    Call count, total time and diagnostics emitted per rule and per phase of
+    linting a file: read, pragma scan, clean_comments and tokenize (which
+    make up CleansedLines) and package done.
+
+    Diagnostics are counted before filtering. Streamed files are read and
+    cleaned while the rules run, so that time is counted in the rules.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._wrapped = {}
+        self._dispatchers = {}
+
+    def _stat(self, name):
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = [0, 0.0, 0]
+        return stat
+
+    def phase(self, name, diagnostics=None):
+        """
+        Context manager timing a phase, counting the items appended to the
+        diagnostics list meanwhile if one is given.
+        """
+        return _Phase(self._stat(name), diagnostics)
+
+    def wrap(self, check):
+        wrapped = self._wrapped.get(check)
+        if wrapped is not None:
+            return wrapped
+        stat = self._stat(check.__name__)
+
+        def wrapped(filename, linenumber, clean_lines, errors):
+            def counting_errors(*args):
+                stat[_DIAGNOSTICS] += 1
+                errors(*args)
+
+            start = time.perf_counter()
+            try:
+                return check(filename, linenumber, clean_lines, counting_errors)
+            finally:
+                stat[_SECONDS] += time.perf_counter() - start
+                stat[_CALLS] += 1
+
+        self._wrapped[check] = wrapped
+        return wrapped
+
+    def dispatcher(self, dispatcher):
+        """
+        Return a dispatcher running the checks of dispatcher timed.
+        """
+        profiled = self._dispatchers.get(dispatcher)
+        if profiled is None:
+            profiled = self._dispatchers[dispatcher] = _ProfiledDispatcher(dispatcher, self)
+        return profiled
+
+    def pop(self):
+        """
+        Return the stats gathered so far and start over.
+        """
+        stats = self.stats
+        self.stats = {}
+        self._wrapped = {}
+        self._dispatchers = {}
+        return stats
+
+    def merge(self, stats):
+        for name, (calls, seconds, diagnostics) in stats.items():
+            stat = self._stat(name)
+            stat[_CALLS] += calls
+            stat[_SECONDS] += seconds
+            stat[_DIAGNOSTICS] += diagnostics
+
+    def _sorted(self):
+        return sorted(self.stats.items(), key=lambda item: -item[1][_SECONDS])
+
+    def report(self, stream):
+        stream.write(f"{'rule':<28}{'calls':>10}{'total ms':>12}{'mean us':>10}{'diagnostics':>13}\n")
+        for name, (calls, seconds, diagnostics) in self._sorted():
+            mean = seconds / calls if calls else 0.0
+            stream.write(f"{name:<28}{calls:>10}{seconds * 1e3:>12.1f}{mean * 1e6:>10.2f}{diagnostics:>13}\n")
+
+    def to_json(self):
+        import json
+
+        return json.dumps(
+            {
+                name: {
+                    "calls": calls,
+                    "seconds": seconds,
+                    "mean_seconds": seconds / calls if calls else 0.0,
+                    "diagnostics": diagnostics,
+                }
+                for name, (calls, seconds, diagnostics) in self._sorted()
+            },
+            indent=2,
+        )
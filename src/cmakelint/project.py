@@ -0,0 +1,134 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import NamedTuple
+
+from cmakelint.lint import Diagnostic, FileSummary, should_print_error
+
+PROJECT_CATEGORIES = ("project/case", "project/duplicate", "project/unused")
+
+_RE_FIND_MODULE = re.compile(r"Find(.+)\.cmake", re.IGNORECASE)
+
+
+class ProjectFile(NamedTuple):
+    """
+    What a file brings to the project rules: its FileSummary and the
+    project categories left enabled for it by its filters and pragmas.
+    """
+
+    filename: str
+    summary: FileSummary
+    categories: frozenset
+
+
+def project_file(filename, result, config):
+    """
+    Return the ProjectFile of filename from its LintResult.
+    """
+    # The pragmas outside of push/pop blocks apply to the whole file.
+    filters = [*config.filters, *result.pragma_states[0][1]]
+    categories = frozenset(category for category in PROJECT_CATEGORIES if should_print_error(category, filters))
+    return ProjectFile(filename, result.summary, categories)
+
+
+def _find_module(path):
+    """
+    Return the lowercase package name of the Find module at path, or None if
+    path is not one.
+    """
+    m = _RE_FIND_MODULE.fullmatch(os.path.basename(path))
+    return None if m is None else m.group(1).lower()
+
+
+def _used_packages(files):
+    """
+    Return the lowercase names of the packages the files look up, or None if
+    one of them is computed, e.g. find_package(${name}), so any may be used.
+    """
+    used = set()
+    for file in files:
+        for package in file.summary.packages:
+            if "$" in package or '"' in package:
+                return None
+            used.add(package.lower())
+        for include in file.summary.includes:
+            # include(FindFoo) and include(${dir}/FindFoo.cmake) both use it.
+            basename = include.replace("\\", "/").rsplit("/", 1)[-1]
+            if not basename.lower().endswith(".cmake"):
+                basename += ".cmake"
+            package = _find_module(basename)
+            if package is not None:
+                used.add(package)
+    return used
+
+
+def _check_unused(files, modules):
+    used = _used_packages(files)
+    if used is None:
+        return
+    for file, package in modules:
+        if package not in used:
+            yield file, "project/unused", "Find module is not used by any find_package() or include() of the project"
+
+
+def _check_duplicate(modules):
+    paths = {}
+    for file, _ in modules:
+        paths.setdefault(os.path.basename(file.filename).lower(), []).append(file.filename)
+    for file, _ in modules:
+        others = [path for path in paths[os.path.basename(file.filename).lower()] if path != file.filename]
+        if others:
+            yield file, "project/duplicate", "Find module is also defined in " + ", ".join(others)
+
+
+def _check_case(files):
+    styles = {}
+    for file in files:
+        summary = file.summary
+        if summary.uppercase != summary.lowercase:
+            styles[file] = "upper" if summary.uppercase > summary.lowercase else "lower"
+    upper = sum(1 for style in styles.values() if style == "upper")
+    lower = len(styles) - upper
+    if upper == lower:
+        return
+    majority = "upper" if upper > lower else "lower"
+    for file, style in styles.items():
+        if style != majority:
+            yield (
+                file,
+                "project/case",
+                f"Commands are mostly {style} case, most files of the project use {majority} case",
+            )
+
+
+def analyze(files):
+    """
+    Return the Diagnostic of the project rules over files, a list of
+    ProjectFile, in the order of files. They are all on line 0, as they are
+    about a file as a whole.
+    """
+    modules = [(file, package) for file in files for package in [_find_module(file.filename)] if package is not None]
+    found = [*_check_unused(files, modules), *_check_duplicate(modules), *_check_case(files)]
+    order = {file.filename: index for index, file in enumerate(files)}
+    found.sort(key=lambda item: (order[item[0].filename], item[1]))
+    return [
+        Diagnostic(file.filename, 0, category, message)
+        for file, category, message in found
+        if category in file.categories
+    ]
@@ -15,11 +15,18 @@ the License.
 
 from __future__ import annotations
 
+import os
+import sys
+from typing import Callable, NamedTuple
+
 ERROR_CATEGORIES = """\
         convention/filename
         linelength
         package/consistency
         package/stdargs
+        project/case
+        project/duplicate
+        project/unused
         readability/logic
         readability/mixedcase
         readability/wonkycase
@@ -31,3 +38,189 @@ ERROR_CATEGORIES = """\
         whitespace/newline
         whitespace/tabs
 """
+
+# Entry point group of third-party rules. The name of an entry point is the
+# category its rules report, loading it registers them.
+ENTRY_POINT_GROUP = "cmakelint.rules"
+
+# Subscriptions to kinds of lines, next to command names (which are
+# lowercase identifiers, so these cannot clash with them).
+LINE = "<line>"
+COMMAND = "<command>"
+LOGIC = "<logic>"
+RAW = "<raw>"
+
+
+def register_categories(categories):
+    """
+    Add categories to ERROR_CATEGORIES, keeping it sorted.
+    """
+    global ERROR_CATEGORIES
+    known = ERROR_CATEGORIES.split()
+    if set(categories).issubset(known):
+        return
+    ERROR_CATEGORIES = "".join(f"        {category}\n" for category in sorted({*known, *categories}))
+
+
+class Rule(NamedTuple):
+    """
+    A check, the categories it reports and what it subscribes to: command
+    names (lowercase), LINE for every line, COMMAND for every line starting
+    a command, LOGIC for the lines holding a logic keyword and RAW for the
+    lines flagged by the precheck of the whole file (a tab, trailing
+    whitespace, more than linelength characters or an indentation that is
+    not a multiple of spaces), which is every line of the files that were
+    not prechecked. If files is given, the rule only applies to the files
+    for which it returns True.
+    """
+
+    check: Callable
+    categories: tuple
+    subscriptions: frozenset
+    files: Callable | None = None
+
+    def subscribes(self, command, logic, raw=True):
+        subscriptions = self.subscriptions
+        if LINE in subscriptions or (raw and RAW in subscriptions):
+            return True
+        if command is not None and (COMMAND in subscriptions or command in subscriptions):
+            return True
+        return logic and LOGIC in subscriptions
+
+
+class _Dispatcher:
+    """
+    The checks of the rules applying to a file, looked up by the command
+    starting a line, whether it holds a logic keyword and whether it is
+    flagged by the prechecks.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.table = {}
+
+    def checks(self, command, logic, raw=True):
+        key = (command, logic, raw)
+        checks = self.table.get(key)
+        if checks is None:
+            checks = tuple(rule.check for rule in self.rules if rule.subscribes(command, logic, raw))
+            self.table[key] = checks
+        return checks
+
+
+class Registry:
+    """
+    The rules run on every file, in the order they were registered, which
+    is the order their diagnostics are reported in for a line.
+
+    fixes maps categories to the function computing the fix of their
+    diagnostics, called as fix(linenumber, clean_lines) when one is reported
+    and returning a list of cmakelint.lint.Edit, empty if it cannot be fixed.
+    """
+
+    def __init__(self):
+        self.rules = []
+        self.fixes = {}
+        self._dispatchers = {}
+
+    def register(self, check, categories, subscriptions, files=None):
+        register_categories(categories)
+        subscriptions = frozenset(s if s in (LINE, COMMAND, LOGIC, RAW) else s.lower() for s in subscriptions)
+        self.rules.append(Rule(check, tuple(categories), subscriptions, files))
+        self._dispatchers.clear()
+        return check
+
+    def rule(self, categories, subscriptions, files=None):
+        """
+        Decorator registering a check, see Rule.
+        """
+        return lambda check: self.register(check, categories, subscriptions, files)
+
+    def register_fix(self, category, fix):
+        self.fixes[category] = fix
+        return fix
+
+    def dispatcher(self, filename, select=None):
+        """
+        Return the dispatcher of the rules applying to filename, of the ones
+        select(rule) accepts only if given.
+        """
+        applies = tuple(
+            (rule.files is None or rule.files(filename)) and (select is None or select(rule)) for rule in self.rules
+        )
+        dispatcher = self._dispatchers.get(applies)
+        if dispatcher is None:
+            rules = [rule for rule, applied in zip(self.rules, applies) if applied]
+            dispatcher = self._dispatchers[applies] = _Dispatcher(rules)
+        return dispatcher
+
+
+RULES = Registry()
+rule = RULES.rule
+
+_LOADED_PLUGINS = set()
+
+
+def _may_have_entry_points():
+    """
+    Return False if no distribution on sys.path declares entry points of
+    ENTRY_POINT_GROUP, by looking for the group in their entry_points.txt.
+
+    importlib.metadata takes longer to import than linting a small file, so
+    it is only imported when this finds a candidate.
+    """
+    header = f"[{ENTRY_POINT_GROUP}]"
+    for path in sys.path:
+        try:
+            it = os.scandir(path or os.curdir)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.name.endswith((".dist-info", ".egg-info")):
+                    filename = os.path.join(entry.path, "entry_points.txt")
+                elif entry.name.endswith(".egg"):
+                    filename = os.path.join(entry.path, "EGG-INFO", "entry_points.txt")
+                else:
+                    continue
+                try:
+                    with open(filename, encoding="utf-8") as f:
+                        if header in f.read():
+                            return True
+                except OSError:
+                    continue
+    return False
+
+
+def _entry_points():
+    if not _may_have_entry_points():
+        return []
+    from importlib.metadata import entry_points
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=ENTRY_POINT_GROUP))
+    return list(eps.get(ENTRY_POINT_GROUP, []))
+
+
+def discover_plugins():
+    """
+    Return the categories of the installed third-party rules and register
+    them, without importing the rules.
+    """
+    categories = sorted({ep.name for ep in _entry_points()})
+    register_categories(categories)
+    return categories
+
+
+def load_plugins(categories):
+    """
+    Import the third-party rules of categories, which registers them.
+    """
+    categories = set(categories) - _LOADED_PLUGINS
+    if not categories:
+        return
+    for ep in _entry_points():
+        if ep.name in categories:
+            ep.load()
+            _LOADED_PLUGINS.add(ep.name)
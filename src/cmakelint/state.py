@@ -15,6 +15,7 @@ the License.
 
 from __future__ import annotations
 
+import copy
 import os
 import re
 
@@ -41,18 +42,70 @@ def is_find_package(filename):
     return os.path.basename(filename).startswith("Find") and filename.endswith(".cmake")
 
 
-_DEFAULT_CMAKELINTRC = default_rc()
+_DEFAULT_CACHE_MAX_SIZE = 256 * 1024 * 1024
 
 
 class _CMakeLintState:
     def __init__(self):
         self.filters = []
-        self.config: str | None = _DEFAULT_CMAKELINTRC
+        self._checked_filters: tuple = (None, 0, None)
+        self._config: str | None = None
+        self._config_resolved = False
         self.errors = 0
         self.spaces = 2
         self.linelength = 80
         self.allowed_categories = ERROR_CATEGORIES.split()
         self.quiet = False
+        self.jobs = 1
+        self.cache_dir: str | None = None
+        self.cache_max_size = _DEFAULT_CACHE_MAX_SIZE
+        self.excludes: list[str] = []
+        self.plugins: list[str] = []
+        self.profile_rules = False
+        self.profile_output: str | None = None
+        self.output_format = "text"
+        self.output: str | None = None
+        self.daemon = False
+        self.socket: str | None = None
+        self.lsp = False
+        self.diff_base: str | None = None
+        self.encoding = "utf-8"
+        self.files_from: str | None = None
+        self.null = False
+        self.stdin = False
+        self.stdin_filename: str | None = None
+        self.fix = False
+        self.fix_dry_run = False
+        self.project = False
+        self.baseline: str | None = None
+        self.update_baseline = False
+        self.directory_rc = False
+        self.cli_filters: list[str] = []
+        self.cli_spaces = False
+
+    @property
+    def config(self) -> str | None:
+        """
+        The option file, looked up with default_rc() on first use unless set.
+        """
+        if not self._config_resolved:
+            self._config = default_rc()
+            self._config_resolved = True
+        return self._config
+
+    @config.setter
+    def config(self, config: str | None):
+        self._config = config
+        self._config_resolved = True
+
+    def copy(self):
+        """
+        Return a copy whose filters may be changed without affecting this state.
+        """
+        state = copy.copy(self)
+        state.filters = list(self.filters)
+        state.errors = 0
+        return state
 
     def set_filters(self, filters):
         if not filters:
@@ -64,16 +117,29 @@ class _CMakeLintState:
             self.filters.extend([f.strip() for f in filters.split(",") if f])
         else:
             raise ValueError("Filters should be a list or a comma separated string")
-        for f in self.filters:
-            if f.startswith("-") or f.startswith("+"):
-                allowed = False
-                for c in self.allowed_categories:
-                    if c.startswith(f[1:]):
-                        allowed = True
-                if not allowed:
-                    raise ValueError(f"Filter not allowed: {f}")
-            else:
-                raise ValueError("Filter should start with - or +")
+        # The filters of the list checked by the previous calls are not checked
+        # again, so that setting filters one pragma at a time stays linear. An
+        # invalid filter stays in the list and keeps being reported.
+        checked_list, checked, error = self._checked_filters
+        if checked_list is not self.filters:
+            checked, error = 0, None
+        if error is None:
+            for f in self.filters[checked:]:
+                if f.startswith("-") or f.startswith("+"):
+                    allowed = False
+                    for c in self.allowed_categories:
+                        if c.startswith(f[1:]):
+                            allowed = True
+                    if not allowed:
+                        error = f"Filter not allowed: {f}"
+                        break
+                else:
+                    error = "Filter should start with - or +"
+                    break
+            checked = len(self.filters)
+        self._checked_filters = (self.filters, checked, error)
+        if error is not None:
+            raise ValueError(error)
 
     def set_spaces(self, spaces: int):
         self.spaces = spaces
@@ -84,14 +150,106 @@ class _CMakeLintState:
     def set_line_length(self, linelength):
         self.linelength = int(linelength)
 
+    def set_jobs(self, jobs: int):
+        self.jobs = jobs
+
+    def set_cache(self, cache_dir: str | None, max_size_mb: int | None = None):
+        self.cache_dir = cache_dir
+        if max_size_mb is not None:
+            self.cache_max_size = max_size_mb * 1024 * 1024
+
+    def set_excludes(self, excludes: list[str]):
+        self.excludes = list(excludes)
+
+    def set_plugins(self, categories: list[str]):
+        self.plugins = list(categories)
+        self.allowed_categories.extend(c for c in categories if c not in self.allowed_categories)
+
+    def set_profile(self, profile_rules: bool, output: str | None = None):
+        self.profile_rules = profile_rules or output is not None
+        self.profile_output = output
+
+    def set_output(self, output_format: str, output: str | None = None):
+        self.output_format = output_format
+        self.output = output
+
+    def set_daemon(self, daemon: bool, socket: str | None = None):
+        self.daemon = daemon
+        self.socket = socket
+
+    def set_lsp(self, lsp: bool):
+        self.lsp = lsp
+
+    def set_diff_base(self, diff_base: str | None):
+        self.diff_base = diff_base
+
+    def set_encoding(self, encoding: str):
+        self.encoding = encoding
+
+    def set_files_from(self, files_from: str | None, null: bool = False):
+        self.files_from = files_from
+        self.null = null
+
+    def set_stdin(self, stdin: bool, filename: str | None = None):
+        self.stdin = stdin
+        self.stdin_filename = filename
+
+    def set_fix(self, fix: bool, dry_run: bool = False):
+        self.fix = fix
+        self.fix_dry_run = dry_run
+
+    def set_project(self, project: bool):
+        self.project = project
+
+    def set_baseline(self, baseline: str | None, update: bool = False):
+        self.baseline = baseline
+        self.update_baseline = update
+
+    def set_directory_rc(self, directory_rc: bool, cli_filters: list[str], cli_spaces: bool):
+        """
+        Look up .cmakelintrc files per directory if directory_rc, keeping the
+        filters and --spaces of the command line above them.
+        """
+        self.directory_rc = directory_rc
+        self.cli_filters = list(cli_filters)
+        self.cli_spaces = cli_spaces
+
     def reset(self):
         self.filters = []
-        self.config = _DEFAULT_CMAKELINTRC
+        self._checked_filters = (None, 0, None)
+        self._config = None
+        self._config_resolved = False
         self.errors = 0
         self.spaces = 2
         self.linelength = 80
         self.allowed_categories = ERROR_CATEGORIES.split()
         self.quiet = False
+        self.jobs = 1
+        self.cache_dir = None
+        self.cache_max_size = _DEFAULT_CACHE_MAX_SIZE
+        self.excludes = []
+        self.plugins = []
+        self.profile_rules = False
+        self.profile_output = None
+        self.output_format = "text"
+        self.output = None
+        self.daemon = False
+        self.socket = None
+        self.lsp = False
+        self.diff_base = None
+        self.encoding = "utf-8"
+        self.files_from = None
+        self.null = False
+        self.stdin = False
+        self.stdin_filename = None
+        self.fix = False
+        self.fix_dry_run = False
+        self.project = False
+        self.baseline = None
+        self.update_baseline = False
+        self.directory_rc = False
+        self.cli_filters = []
+        self.cli_spaces = False
 
 
 class _CMakePackageState:
@@ -0,0 +1,171 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import re
+
+_RE_COMMAND_TOKEN = re.compile(r"^\s*(\w+)(\s*)\((\s*)")
+_RE_PARENS = re.compile(r"[()]")
+_RE_WORD = re.compile(r"\w+")
+
+LOGIC_COMMANDS = """
+else
+endforeach
+endfunction
+endif
+endmacro
+endwhile
+""".split()
+# Only a prefilter, the keyword is confirmed as a word of the lowered line.
+# Word boundaries are left out since str.lower() may add some, e.g. "İ" is
+# lowered to "i" followed by a combining dot, which is not a word character.
+_RE_LOGIC_KEYWORD = re.compile("|".join(LOGIC_COMMANDS), re.IGNORECASE)
+
+
+class CommandToken:
+    """
+    A command invocation, found at the start of a cleaned line.
+
+    name_start/name_end and open_column are columns on the line of the
+    command. first_close is the (linenumber, column) of the first ")" at or
+    after the command, which is where the style checks expect the command to
+    end, and close the position of the ")" matching the opening one. Both are
+    None if the file ends before them.
+    """
+
+    __slots__ = (
+        "linenumber",
+        "name",
+        "name_start",
+        "name_end",
+        "spaces_before_paren",
+        "open_column",
+        "spaces_after_open",
+        "first_close",
+        "close",
+    )
+
+    def __init__(self, linenumber, match):
+        self.linenumber = linenumber
+        self.name = match.group(1)
+        self.name_start = match.start(1)
+        self.name_end = match.end(1)
+        self.spaces_before_paren = match.end(2) - match.start(2)
+        self.open_column = match.end(2)
+        self.spaces_after_open = match.end(3) - match.start(3)
+        self.first_close = None
+        self.close = None
+
+    def arguments(self, lines):
+        """
+        Yield the (linenumber, start, end) spans of the words inside the
+        parentheses of the command, up to its closing one or the end of lines.
+        """
+        linenumber = self.linenumber
+        start = self.open_column + 1
+        last = len(lines) - 1 if self.close is None else self.close[0]
+        while linenumber <= last:
+            line = lines[linenumber]
+            end = self.close[1] if self.close is not None and linenumber == last else len(line)
+            for m in _RE_WORD.finditer(line, start, end):
+                yield linenumber, m.start(), m.end()
+            linenumber += 1
+            start = 0
+
+
+def find_logic_keyword(line):
+    """
+    Return the first of LOGIC_COMMANDS that is a word of line, in the order
+    of LOGIC_COMMANDS, or None.
+    """
+    if not _RE_LOGIC_KEYWORD.search(line):
+        return None
+    words = set(_RE_WORD.findall(line.lower()))
+    for keyword in LOGIC_COMMANDS:
+        if keyword in words:
+            return keyword
+    return None
+
+
+class Tokenizer:
+    """
+    Single pass tokenizer over cleaned lines.
+
+    Lines are fed in order, and for each one it returns the command token
+    starting on it and the logic keyword it holds, if any. Command tokens get
+    their closing positions filled in as the lines holding them are fed.
+    """
+
+    def __init__(self):
+        self.linenumber = 0
+        self._waiting_first_close = []
+        self._open_parens = []
+
+    @property
+    def depth(self):
+        """
+        The number of parentheses left open by the lines fed so far. At 0, no
+        command is open and the lines fed next are tokenized on their own.
+        """
+        return len(self._open_parens)
+
+    def feed(self, line):
+        """
+        Return the (CommandToken or None, logic keyword or None) of line.
+        """
+        linenumber = self.linenumber
+        self.linenumber += 1
+        m = _RE_COMMAND_TOKEN.match(line)
+        token = None
+        if m:
+            token = CommandToken(linenumber, m)
+            self._waiting_first_close.append(token)
+
+        first_close = line.find(")")
+        if first_close != -1 and self._waiting_first_close:
+            for waiting in self._waiting_first_close:
+                waiting.first_close = (linenumber, first_close)
+            self._waiting_first_close = []
+        if first_close != -1 or "(" in line:
+            self._match_parens(linenumber, line, token)
+        return token, find_logic_keyword(line)
+
+    def _match_parens(self, linenumber, line, token):
+        open_parens = self._open_parens
+        for m in _RE_PARENS.finditer(line):
+            column = m.start()
+            if line[column] == "(":
+                open_parens.append(token if token is not None and column == token.open_column else None)
+            elif open_parens:
+                opener = open_parens.pop()
+                if opener is not None:
+                    opener.close = (linenumber, column)
+
+
+def tokenize(lines):
+    """
+    Return the list of the command tokens of lines, None for the lines
+    without one, and the dict of the logic keyword of the lines holding one.
+    """
+    tokenizer = Tokenizer()
+    commands = []
+    logic_keywords = {}
+    for linenumber, line in enumerate(lines):
+        token, keyword = tokenizer.feed(line)
+        commands.append(token)
+        if keyword is not None:
+            logic_keywords[linenumber] = keyword
+    return commands, logic_keywords
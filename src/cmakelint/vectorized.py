@@ -0,0 +1,56 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+_TAB = ord("\t")
+_NEWLINE = ord("\n")
+_SPACE = ord(" ")
+# The ASCII characters str.isspace() is True for, short of the newline.
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[[ord(c) for c in "\t\x0b\x0c\r\x1c\x1d\x1e\x1f "]] = True
+
+
+def precheck(data, linelength, spaces, start=0):
+    """
+    NumPy version of cmakelint.lint.precheck(), for data holding ASCII lines
+    joined by newlines.
+    """
+    # A newline is appended so that every line, the last one included, ends
+    # with one, and the indentation scan stops at the end of the data.
+    buffer = np.frombuffer(data + b"\n", dtype=np.uint8)
+    ends = np.flatnonzero(buffer == _NEWLINE)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts
+
+    flagged = lengths > linelength
+    flagged |= (lengths > 0) & _WHITESPACE[buffer[ends - 1]]
+    tabs = np.flatnonzero(buffer == _TAB)
+    if len(tabs):
+        flagged[np.searchsorted(ends, tabs)] = True
+    if spaces > 1:
+        # The indentation of the lines, one column at a time, only carrying on
+        # with the lines with a space in the current column.
+        indents = np.zeros_like(lengths)
+        indented = np.flatnonzero(buffer[starts] == _SPACE)
+        while len(indented):
+            indents[indented] += 1
+            indented = indented[buffer[starts[indented] + indents[indented]] == _SPACE]
+        flagged |= indents % spaces != 0
+    return set((np.flatnonzero(flagged) + start).tolist())
@@ -0,0 +1,70 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import json
+
+from benchmarks.__main__ import check, main
+from benchmarks.corpus import CORPORA, generate
+
+from ..conftest import TEST_DIR
+
+
+def test_generate():
+    for name in CORPORA:
+        manifest = generate(name, str(TEST_DIR / "corpus"), scale=0.001)
+        assert manifest["files"]
+        for entry in manifest["files"]:
+            with open(entry["path"]) as f:
+                assert len(f.read().splitlines()) == entry["lines"]
+        assert generate(name, str(TEST_DIR / "corpus"), scale=0.001) == manifest
+
+
+def test_check():
+    baseline = {"results": {"main/quotes": {"lines_per_sec": 1000.0}, "main/nested": {"lines_per_sec": 1000.0}}}
+    results = {"main/quotes": {"lines_per_sec": 850.0}, "main/nested": {"lines_per_sec": 700.0}}
+    assert check(results, baseline, 0.2) == ["main/nested: 700 lines/sec, 30% slower than the baseline 1,000"]
+    assert check(results, baseline, 0.4) == []
+
+
+def write_baseline(path, scale, lines_per_sec):
+    baseline = {"scale": scale, "results": {"clean_comments/quotes": {"lines_per_sec": lines_per_sec}}}
+    path.write_text(json.dumps(baseline))
+    return str(path)
+
+
+def test_main(capsys):
+    # Only the structure of the output and the exit codes are checked here;
+    # comparing timings is left to python -m benchmarks --check.
+    saved = TEST_DIR / "baseline.json"
+    args = ["--scale=0.001", "--repeat=1", f"--corpus-dir={TEST_DIR / 'corpus'}", "--corpus=quotes"]
+    assert main([*args, "--target=clean_comments", f"--save={saved}"]) == 0
+    header, row = capsys.readouterr().out.splitlines()
+    assert header.split() == ["target", "corpus", "files/sec", "lines/sec", "peak", "RSS"]
+    assert row.split()[:2] == ["clean_comments", "quotes"]
+    baseline = json.loads(saved.read_text())
+    assert baseline["scale"] == 0.001
+    assert sorted(baseline["results"]) == ["clean_comments/quotes"]
+    assert sorted(baseline["results"]["clean_comments/quotes"]) == ["files_per_sec", "lines_per_sec"]
+    # Baselines no run can be slower or faster than.
+    slow = write_baseline(TEST_DIR / "slow.json", 0.001, 1e-9)
+    fast = write_baseline(TEST_DIR / "fast.json", 0.001, 1e30)
+    assert main([*args, "--target=clean_comments", f"--check={slow}"]) == 0
+    capsys.readouterr()
+    assert main([*args, "--target=clean_comments", f"--check={fast}"]) == 1
+    assert "Regression: clean_comments/quotes" in capsys.readouterr().err
+    other_scale = write_baseline(TEST_DIR / "other_scale.json", 1.0, 1e-9)
+    assert main([*args, "--target=clean_comments", f"--check={other_scale}"]) == 2
@@ -0,0 +1,73 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import subprocess
+
+from ..conftest import TEST_DIR
+from .utils import run_command, with_base_cmd
+
+
+def test_baseline():
+    project = TEST_DIR / "baseline"
+    (project / "sub").mkdir(parents=True)
+    (project / "CMakeLists.txt").write_text("project(x)\nSET(a b) \n\tset(c d)\n")
+    (project / "sub" / "CMakeLists.txt").write_text("set(a b) \n")
+    args = ["--baseline=baseline.txt", "CMakeLists.txt", "sub"]
+    result = run_command("baseline", ["--update-baseline", *args])
+    assert result["status"] == 0
+    assert result["stdout"] == [""]
+    assert result["stderr"] == ["Baselined Errors: 4", "Total Errors: 0", ""]
+    assert run_command("baseline", args)["status"] == 0
+
+    # Only the new diagnostics are reported, wherever the old ones moved.
+    (project / "CMakeLists.txt").write_text("# moved\nproject(x)\n  SET(a  b) \n\tset(c d)\n\tset(e f)\n")
+    result = run_command("baseline", args)
+    assert result["status"] == 1
+    assert result["stdout"] == ["CMakeLists.txt:5: Tab found; please use spaces [whitespace/tabs]", ""]
+    assert run_command("baseline", ["--jobs=2", *args]) == result
+    command = with_base_cmd(["--stdin", "--baseline=baseline.txt"])
+    proc = subprocess.run(
+        command, shell=True, cwd=project, input=(project / "CMakeLists.txt").read_bytes(), capture_output=True
+    )
+    assert proc.stdout.decode().splitlines() == ["CMakeLists.txt:5: Tab found; please use spaces [whitespace/tabs]"]
+
+    # Updating for some of the files keeps the entries of the others.
+    run_command("baseline", ["--update-baseline", "--baseline=baseline.txt", "CMakeLists.txt"])
+    assert run_command("baseline", args)["status"] == 0
+    (project / "sub" / "CMakeLists.txt").write_text("set(a b) \nset(a b) \n")
+    assert run_command("baseline", args)["stdout"] == [
+        "sub/CMakeLists.txt:2: Line ends in whitespace [whitespace/eol]",
+        "",
+    ]
+
+
+def test_baseline_usage():
+    for args, message in [
+        (["--baseline=missing.txt"], "--baseline: no such file: 'missing.txt'"),
+        (["--update-baseline"], "--update-baseline needs --baseline"),
+        (
+            ["--baseline=b.txt", "--update-baseline", "--diff-base=HEAD"],
+            "--update-baseline cannot be used with --diff-base",
+        ),
+    ]:
+        result = run_command("samples", [*args, "CMakeLists.txt"])
+        assert result["status"] == 32
+        assert result["stderr"][-2].endswith(message)
+    (TEST_DIR / "samples" / "invalid-baseline.txt").write_text("CMakeLists.txt\n")
+    result = run_command("samples", ["--baseline=invalid-baseline.txt", "CMakeLists.txt"])
+    assert result["status"] == 32
+    assert result["stderr"] == ["cmakelint: error: invalid-baseline.txt: not a cmakelint baseline", ""]
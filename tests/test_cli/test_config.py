@@ -0,0 +1,58 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+from ..conftest import TEST_DIR
+from .utils import run_command
+
+LINE = "set(VARIABLE_NAME some_value)\n"
+
+
+def test_directory_rc():
+    root = TEST_DIR / "rc_tree"
+    (root / "third_party" / "gen").mkdir(parents=True)
+    (root / ".cmakelintrc").write_text("linelength=20\n[*.in.cmake]\nfilter=-linelength\n")
+    (root / "CMakeLists.txt").write_text(LINE)
+    (root / "a.in.cmake").write_text(LINE)
+    (root / "third_party" / ".cmakelintrc").write_text("filter=-linelength\n[gen/]\nfilter=+linelength\n")
+    (root / "third_party" / "CMakeLists.txt").write_text(LINE)
+    (root / "third_party" / "gen" / "x.cmake").write_text(LINE)
+
+    result = run_command(root, ["."])
+    assert result["stdout"] == [
+        "CMakeLists.txt:1: Lines should be <= 20 characters long [linelength]",
+        "third_party/gen/x.cmake:1: Lines should be <= 20 characters long [linelength]",
+        "",
+    ]
+    assert run_command(root, ["--jobs=2", "."]) == result
+    # The filters of the command line apply last.
+    result = run_command(root, ["--filter=+linelength", "."])
+    assert len(result["stdout"]) == 5
+    # An explicit --config is the only option file used.
+    result = run_command(root, ["--config=.cmakelintrc", "."])
+    assert len(result["stdout"]) == 4
+    assert not any(line.startswith("a.in.cmake") for line in result["stdout"])
+
+
+def test_directory_rc_error():
+    root = TEST_DIR / "rc_error"
+    (root / "sub").mkdir(parents=True)
+    (root / "sub" / ".cmakelintrc").write_text("filter=-nothing\n")
+    (root / "sub" / "CMakeLists.txt").write_text(LINE)
+    result = run_command(root, ["."])
+    assert result["status"] == 32
+    assert result["stderr"][0].startswith("cmakelint: error: ")
+    assert result["stderr"][0].endswith("Filter not allowed: -nothing")
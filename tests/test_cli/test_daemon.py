@@ -0,0 +1,98 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import os
+import shlex
+import socket
+import subprocess
+import time
+
+import pytest
+
+from ..conftest import TEST_DIR
+from .utils import BASE_CMD, run_command
+
+SAMPLES = ["llvm/CMakeLists.txt", "opencv/CMakeLists.txt", "not_cmake.h"]
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def daemon():
+    path = str(TEST_DIR / "daemon.sock")
+    proc = subprocess.Popen([*shlex.split(BASE_CMD), "--daemon", "--socket", path], cwd=TEST_DIR)
+    deadline = time.monotonic() + 30
+    while not os.path.exists(path):
+        assert proc.poll() is None and time.monotonic() < deadline
+        time.sleep(0.05)
+    yield ["--client", "--socket", path]
+    proc.terminate()
+    assert proc.wait(timeout=30) == 0
+    assert not os.path.exists(path)
+
+
+def test_client_matches_direct_run(daemon):
+    for args in [SAMPLES, ["--format=jsonl", *SAMPLES], ["--filter=-whitespace", "--linelength=120", *SAMPLES]]:
+        expected = run_command("samples", args)
+        assert run_command("samples", [*daemon, *args]) == expected
+        # Answered from the results kept by the daemon.
+        assert run_command("samples", [*daemon, *args]) == expected
+
+
+def test_client_config_changes(daemon):
+    project = TEST_DIR / "daemon_project"
+    project.mkdir()
+    (project / "CMakeLists.txt").write_text("project(x)\nSET(a b)\n")
+    result = run_command(project, [*daemon, "CMakeLists.txt"])
+    assert result["status"] == 1
+    config = project / ".cmakelintrc"
+    config.write_text("filter=-readability\n")
+    result = run_command(project, [*daemon, "CMakeLists.txt"])
+    assert result["status"] == 0
+    config.write_text("filter=-whitespace\n")
+    # The mtime may not change at all within the filesystem granularity.
+    os.utime(config, ns=(0, 0))
+    result = run_command(project, [*daemon, "CMakeLists.txt"])
+    assert result["status"] == 1
+    assert result == run_command(project, ["CMakeLists.txt"])
+
+
+def test_client_usage_errors(daemon):
+    assert run_command("samples", [*daemon, "--daemon"])["status"] == 32
+    assert run_command("samples", [*daemon, "--linelength=x", *SAMPLES]) == run_command(
+        "samples", ["--linelength=x", *SAMPLES]
+    )
+
+
+def test_client_without_daemon():
+    args = ["--client", "--socket", str(TEST_DIR / "missing.sock"), *SAMPLES]
+    assert run_command("samples", args) == run_command("samples", SAMPLES)
+
+
+def test_socket_directory_writable_by_others():
+    directory = TEST_DIR / "shared"
+    directory.mkdir()
+    directory.chmod(0o777)
+    path = str(directory / "daemon.sock")
+    result = run_command("samples", ["--daemon", "--socket", path])
+    assert result["status"] == 1
+    assert result["stderr"][0].endswith("shared is writable by other users")
+    # A socket another user could have put there is not connected to.
+    (directory / "daemon.sock").touch()
+    result = run_command("samples", ["--client", "--socket", path, *SAMPLES])
+    assert result["stderr"][0].startswith("cmakelint: warning: not using the daemon:")
+    assert result["stdout"] == run_command("samples", SAMPLES)["stdout"]
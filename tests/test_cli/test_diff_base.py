@@ -0,0 +1,115 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+
+import pytest
+
+from ..conftest import TEST_DIR
+from .utils import run_command
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+BEFORE = """\
+project(foo)
+SET(A B)
+if(A)
+  set(C D)
+endif()
+"""
+AFTER = """\
+project(foo)
+SET(A B)
+if(A)
+  set(C D)
+  SET(E F)\t
+endif()
+"""
+
+
+def git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=cmakelint", "-c", "user.email=cmakelint@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+def file_diagnostics(filename, package):
+    return [
+        f"{filename}:0: Find modules should use uppercase names; "
+        f"consider using Find{package}.cmake [convention/filename]",
+        f"{filename}:0: Package should include FindPackageHandleStandardArgs [package/consistency]",
+        f"{filename}:0: Package should use FIND_PACKAGE_HANDLE_STANDARD_ARGS [package/consistency]",
+    ]
+
+
+FIND_BAZ = file_diagnostics("FindBaz.cmake", "BAZ")
+FIND_BAR = file_diagnostics("sub/FindBar.cmake", "BAR")
+
+
+@pytest.fixture(scope="module")
+def repo():
+    repo = TEST_DIR / "diff_base"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    (repo / "CMakeLists.txt").write_text(BEFORE)
+    (repo / "old.cmake").write_text("set(Baz_FOUND TRUE)\n")
+    (repo / "FindFoo.cmake").write_text("set(Foo_FOUND TRUE)\n")
+    (repo / "untouched.cmake").write_text("SET(A B)\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "base")
+    git(repo, "branch", "base")
+    git(repo, "mv", "old.cmake", "FindBaz.cmake")
+    git(repo, "commit", "-q", "-m", "rename")
+    (repo / "CMakeLists.txt").write_text(AFTER)
+    (repo / "FindFoo.cmake").write_text("set(Foo_FOUND TRUE)\nSET(Foo_LIBRARIES foo)\n")
+    (repo / "sub").mkdir()
+    (repo / "sub" / "FindBar.cmake").write_text("SET(Bar_FOUND TRUE)\n")
+    git(repo, "add", "sub")
+    return repo
+
+
+def test_diff_base(repo):
+    result = run_command(repo, ["--diff-base", "base"])
+    assert result["status"] == 1
+    # FindFoo.cmake is only modified, so its file level diagnostics are dropped.
+    assert result["stdout"] == [
+        "CMakeLists.txt:5: Do not mix upper and lower case commands [readability/mixedcase]",
+        "CMakeLists.txt:5: Tab found; please use spaces [whitespace/tabs]",
+        "CMakeLists.txt:5: Line ends in whitespace [whitespace/eol]",
+        *FIND_BAZ,
+        "FindFoo.cmake:2: Do not mix upper and lower case commands [readability/mixedcase]",
+        *FIND_BAR,
+        "",
+    ]
+    assert result["stderr"] == ["Total Errors: 10", ""]
+
+
+def test_diff_base_paths(repo):
+    result = run_command(repo, ["--diff-base=base", "sub", "untouched.cmake"])
+    assert result["stdout"] == [*FIND_BAR, ""]
+    result = run_command(repo / "sub", ["--diff-base=base"])
+    assert result["stdout"] == [line[len("sub/") :] for line in FIND_BAR] + [""]
+
+
+def test_diff_base_errors(repo):
+    result = run_command(repo, ["--diff-base=missing"])
+    assert result["status"] == 32
+    assert result["stderr"][0].startswith("cmakelint: error: ")
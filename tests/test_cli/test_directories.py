@@ -0,0 +1,28 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import os
+
+from .utils import run_command
+
+SAMPLES = [os.path.join(*name.split("/")) for name in ["blender/src/CMakeLists.txt", "llvm/CMakeLists.txt"]]
+
+
+def test_directory():
+    expected = run_command("samples", SAMPLES)
+    assert run_command("samples", ["--exclude=opencv", "."]) == expected
+    assert run_command("samples", ["--exclude=/opencv/", "--jobs=2", "."]) == expected
@@ -0,0 +1,64 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import os
+
+from ..conftest import TEST_DIR
+from .utils import run_command
+
+SAMPLES = [os.path.join(*name.split("/")) for name in ["llvm/CMakeLists.txt", "opencv/CMakeLists.txt", "not_cmake.h"]]
+
+
+def test_files_from():
+    expected = run_command("samples", SAMPLES)
+    file_list = TEST_DIR / "files.txt"
+    file_list.write_text("\n".join(SAMPLES[1:]) + "\n\n")
+    assert run_command("samples", [SAMPLES[0], f"--files-from={file_list}"]) == expected
+    assert run_command("samples", ["--jobs=2", "--files-from", "-", "<", str(file_list), SAMPLES[0]]) == expected
+    file_list.write_bytes(b"\0".join(os.fsencode(name) for name in SAMPLES))
+    assert run_command("samples", ["--files-from=-", "-0", "<", str(file_list)]) == expected
+
+
+def test_files_from_directories():
+    file_list = TEST_DIR / "dirs.txt"
+    file_list.write_text("llvm\nopencv\n")
+    assert run_command("samples", ["--files-from", str(file_list)]) == run_command("samples", ["llvm", "opencv"])
+
+
+def test_stdin():
+    for name in SAMPLES[:2]:
+        expected = run_command("samples", [name])
+        assert run_command("samples", ["--stdin", f"--stdin-filename={name}", "<", name]) == expected
+    # The name decides the checks, not the file read.
+    result = run_command("samples", ["--stdin", "--stdin-filename", "FindLLVM.cmake", "<", SAMPLES[0]])
+    assert result["status"] == 1
+    assert [line for line in result["stdout"] if line.startswith("FindLLVM.cmake:0:")] == [
+        "FindLLVM.cmake:0: Package should include FindPackageHandleStandardArgs [package/consistency]",
+        "FindLLVM.cmake:0: Package should use FIND_PACKAGE_HANDLE_STANDARD_ARGS [package/consistency]",
+    ]
+    result = run_command("samples", ["--stdin", "--stdin-filename", "not_cmake.h", "<", SAMPLES[0]])
+    assert result["stdout"] == ["Ignoring file: not_cmake.h", ""]
+
+
+def test_usage_errors():
+    for args in [
+        ["--stdin", SAMPLES[0]],
+        ["--stdin-filename=CMakeLists.txt", SAMPLES[0]],
+        ["-0", SAMPLES[0]],
+        ["--files-from=missing.txt"],
+    ]:
+        assert run_command("samples", args)["status"] == 32
@@ -0,0 +1,69 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import shutil
+
+from ..conftest import TEST_DIR
+from .utils import run_command
+
+SAMPLES = ["blender/src/CMakeLists.txt", "llvm/CMakeLists.txt", "opencv/CMakeLists.txt"]
+
+
+def copy_samples(name):
+    shutil.copytree(TEST_DIR / "samples", TEST_DIR / name)
+    return {path: (TEST_DIR / name / path).read_bytes() for path in SAMPLES}
+
+
+def test_fix():
+    original = copy_samples("fix_serial")
+    copy_samples("fix_parallel")
+    result = run_command("fix_serial", ["--fix", *SAMPLES])
+    assert result["status"] == 1
+    assert result["stderr"][-3:] == ["Fixed Errors: 120", "Total Errors: 907", ""]
+    # The diagnostics left are the ones of the fixed files.
+    assert result["stdout"] == run_command("fix_serial", SAMPLES)["stdout"]
+    cache_dir = str(TEST_DIR / "fix-cache")
+    run_command("fix_parallel", [f"--cache-dir={cache_dir}", *SAMPLES])
+    assert run_command("fix_parallel", ["--fix", "--jobs=2", f"--cache-dir={cache_dir}", *SAMPLES]) == result
+    for path in SAMPLES:
+        fixed = (TEST_DIR / "fix_serial" / path).read_bytes()
+        assert fixed != original[path]
+        assert (TEST_DIR / "fix_parallel" / path).read_bytes() == fixed
+    # Nothing is left to fix.
+    result = run_command("fix_serial", ["--fix", *SAMPLES])
+    assert result["stderr"][-3:] == ["Fixed Errors: 0", "Total Errors: 907", ""]
+
+
+def test_fix_dry_run():
+    original = copy_samples("fix_dry_run")
+    expected = run_command("fix_dry_run", SAMPLES)
+    result = run_command("fix_dry_run", ["--fix-dry-run", *SAMPLES])
+    assert result["status"] == 1
+    assert result["stderr"][-3:] == ["Fixable Errors: 120", *expected["stderr"][-2:]]
+    assert [line for line in result["stdout"] if line.startswith("+++ ")] == [f"+++ {path}" for path in SAMPLES]
+    assert [line for line in result["stdout"] if line in expected["stdout"]] == expected["stdout"]
+    for path in SAMPLES:
+        assert (TEST_DIR / "fix_dry_run" / path).read_bytes() == original[path]
+
+
+def test_fix_usage_errors():
+    for args in [
+        ["--fix", "--stdin"],
+        ["--fix-dry-run", "--diff-base=HEAD"],
+        ["--fix-dry-run", "--format=sarif", SAMPLES[0]],
+    ]:
+        assert run_command("samples", args)["status"] == 32
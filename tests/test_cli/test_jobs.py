@@ -0,0 +1,47 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+from ..conftest import TEST_DIR
+from .utils import run_command
+
+SAMPLES = ["blender/src/CMakeLists.txt", "llvm/CMakeLists.txt", "opencv/CMakeLists.txt"]
+
+
+def test_jobs_same_as_serial():
+    serial = run_command("samples", [*SAMPLES, "not_cmake.h"])
+    assert run_command("samples", ["--jobs=2", *SAMPLES, "not_cmake.h"]) == serial
+    assert run_command("samples", ["--jobs=auto", *SAMPLES, "not_cmake.h"]) == serial
+
+
+def test_jobs_keep_report_order():
+    (TEST_DIR / "jobs").mkdir(exist_ok=True)
+    (TEST_DIR / "jobs" / "FindFoo.cmake").write_text("set(FOO 1) \n")
+    (TEST_DIR / "jobs" / "CMakeLists.txt").write_text("project( foo)\n")
+    files = ["FindFoo.cmake", "CMakeLists.txt"]
+    result = run_command("jobs", ["-j", "2", *files])
+    assert result == run_command("jobs", files)
+    assert result["status"] == 1
+    # The package checks of the whole file come last, as they always did.
+    assert result["stdout"] == [
+        "FindFoo.cmake:0: Find modules should use uppercase names; consider using FindFOO.cmake [convention/filename]",
+        "FindFoo.cmake:1: Line ends in whitespace [whitespace/eol]",
+        "FindFoo.cmake:0: Package should include FindPackageHandleStandardArgs [package/consistency]",
+        "FindFoo.cmake:0: Package should use FIND_PACKAGE_HANDLE_STANDARD_ARGS [package/consistency]",
+        "CMakeLists.txt:1: Mismatching spaces inside () after command [whitespace/mismatch]",
+        "",
+    ]
+    assert result["stderr"] == ["Total Errors: 5", ""]
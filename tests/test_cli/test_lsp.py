@@ -0,0 +1,51 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import io
+import shlex
+import subprocess
+
+from cmakelint.lsp import read_message, write_message
+
+from ..conftest import TEST_DIR
+from .utils import BASE_CMD, run_command
+
+
+def test_lsp():
+    input = io.BytesIO()
+    uri = (TEST_DIR / "samples" / "CMakeLists.txt").as_uri()
+    item = {"uri": uri, "languageId": "cmake", "version": 1, "text": "project( foo)\n"}
+    for message in [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"capabilities": {}}},
+        {"jsonrpc": "2.0", "method": "initialized", "params": {}},
+        {"jsonrpc": "2.0", "method": "textDocument/didOpen", "params": {"textDocument": item}},
+        {"jsonrpc": "2.0", "id": 2, "method": "shutdown"},
+        {"jsonrpc": "2.0", "method": "exit"},
+    ]:
+        write_message(input, message)
+    proc = subprocess.run([*shlex.split(BASE_CMD), "--lsp"], input=input.getvalue(), capture_output=True, timeout=60)
+    assert proc.returncode == 0
+    output = io.BytesIO(proc.stdout)
+    replies = list(iter(lambda: read_message(output), None))
+    assert [reply.get("id") for reply in replies] == [1, None, 2]
+    assert replies[1]["params"]["uri"] == uri
+    assert [diagnostic["code"] for diagnostic in replies[1]["params"]["diagnostics"]] == ["whitespace/mismatch"]
+
+
+def test_lsp_usage_errors():
+    for args in [["--lsp", "CMakeLists.txt"], ["--lsp", "--stdin"], ["--lsp", "--daemon"]]:
+        assert run_command("samples", args)["status"] == 32
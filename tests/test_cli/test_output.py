@@ -0,0 +1,53 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import json
+
+from ..conftest import TEST_DIR
+from .utils import run_command
+
+SAMPLES = ["llvm/CMakeLists.txt", "opencv/CMakeLists.txt", "not_cmake.h"]
+
+
+def test_format_text():
+    expected = run_command("samples", SAMPLES)
+    assert run_command("samples", ["--format=text", *SAMPLES]) == expected
+    output = TEST_DIR / "output.txt"
+    result = run_command("samples", [f"--output={output}", *SAMPLES])
+    assert result["stdout"] == [""]
+    assert result["stderr"] == expected["stderr"]
+    assert output.read_text().split("\n") == expected["stdout"]
+
+
+def test_format_jsonl():
+    expected = run_command("samples", SAMPLES)
+    result = run_command("samples", ["--format=jsonl", "-j", "2", *SAMPLES])
+    assert result["status"] == expected["status"]
+    assert result["stderr"] == ["Ignoring file: not_cmake.h", *expected["stderr"]]
+    records = [json.loads(line) for line in result["stdout"] if line]
+    assert [f"{r['filename']}:{r['linenumber']}: {r['message']} [{r['category']}]" for r in records] == [
+        line for line in expected["stdout"] if line and not line.startswith("Ignoring file")
+    ]
+
+
+def test_format_sarif():
+    expected = run_command("samples", SAMPLES)
+    output = TEST_DIR / "report.sarif"
+    result = run_command("samples", ["--format=sarif", f"--output={output}", *SAMPLES])
+    assert result["status"] == expected["status"]
+    results = json.loads(output.read_text())["runs"][0]["results"]
+    assert len(results) == int(expected["stderr"][0].split()[-1])
@@ -0,0 +1,40 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import json
+
+from ..conftest import TEST_DIR
+from .utils import run_command
+
+SAMPLES = ["llvm/CMakeLists.txt", "opencv/CMakeLists.txt"]
+
+
+def test_profile_rules():
+    expected = run_command("samples", SAMPLES)
+    for jobs in ["--jobs=1", "--jobs=2"]:
+        result = run_command("samples", [jobs, "--profile-rules", *SAMPLES])
+        assert result["stdout"] == expected["stdout"]
+        assert result["stderr"][0] == expected["stderr"][0]
+        assert result["stderr"][1].split() == ["rule", "calls", "total", "ms", "mean", "us", "diagnostics"]
+        assert any(line.startswith("check_command_spaces ") for line in result["stderr"])
+
+        output = TEST_DIR / "profile.json"
+        result = run_command("samples", [jobs, f"--profile-output={output}", *SAMPLES])
+        assert result == expected
+        profile = json.loads(output.read_text())
+        assert profile["read"]["calls"] == 2
+        assert sum(stat["diagnostics"] for stat in profile.values()) == int(expected["stderr"][0].split()[-1])
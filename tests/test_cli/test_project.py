@@ -0,0 +1,74 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+from ..conftest import TEST_DIR
+from .utils import run_command
+
+FILES = {
+    "CMakeLists.txt": "project(foo)\nfind_package(Foo REQUIRED)\ninclude(cmake/FindBar.cmake)\nadd_subdirectory(b)\n",
+    "cmake/FindFoo.cmake": "set(Foo_FOUND TRUE)\n",
+    "cmake/FindBar.cmake": "set(Bar_FOUND TRUE)\n",
+    "cmake/FindBaz.cmake": "set(Baz_FOUND TRUE)\n",
+    "b/CMakeLists.txt": "# lint_cmake: -project/case\nADD_LIBRARY(b b.c)\n",
+    "b/FindFoo.cmake": "SET(Foo_FOUND TRUE)\n",
+}
+
+
+def write_project(name):
+    for path, text in FILES.items():
+        (TEST_DIR / name / path).parent.mkdir(parents=True, exist_ok=True)
+        (TEST_DIR / name / path).write_text(text)
+
+
+def test_project():
+    write_project("project")
+    args = ["--project", "--filter=-convention,-package", "."]
+    result = run_command("project", args)
+    assert result["status"] == 1
+    assert result["stdout"] == [
+        "b/FindFoo.cmake:0: Commands are mostly upper case, most files of the project use lower case [project/case]",
+        "b/FindFoo.cmake:0: Find module is also defined in cmake/FindFoo.cmake [project/duplicate]",
+        "cmake/FindBaz.cmake:0: Find module is not used by any find_package() or include() of the project"
+        " [project/unused]",
+        "cmake/FindFoo.cmake:0: Find module is also defined in b/FindFoo.cmake [project/duplicate]",
+        "",
+    ]
+    assert result["stderr"] == ["Total Errors: 4", ""]
+    assert run_command("project", ["--jobs=2", *args]) == result
+    # Without --project, these are not checked.
+    assert run_command("project", args[1:])["stdout"] == [""]
+
+
+def test_project_cache():
+    write_project("project_cache")
+    cache_dir = str(TEST_DIR / "project-cache")
+    args = ["--project", f"--cache-dir={cache_dir}", "--filter=-convention,-package", "."]
+    expected = run_command("project_cache", args[:1] + args[2:])
+    assert run_command("project_cache", args) == expected
+    assert run_command("project_cache", args) == expected
+    # Summaries of the unchanged files come from the cache, the changed file is read again.
+    (TEST_DIR / "project_cache" / "CMakeLists.txt").write_text(FILES["CMakeLists.txt"] + "find_package(Baz)\n")
+    result = run_command("project_cache", ["--jobs=2", *args])
+    assert result == run_command("project_cache", args[:1] + args[2:])
+    assert not any("FindBaz" in line for line in result["stdout"])
+
+
+def test_project_usage():
+    for args in [["--stdin"], ["--diff-base=HEAD"]]:
+        result = run_command(".", ["--project", *args])
+        assert result["status"] == 32
+        assert "--project cannot be used with --stdin or --diff-base" in result["stderr"][-2]
@@ -0,0 +1,115 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+from ..conftest import TEST_DIR
+
+# Cumulative import time of cmakelint for linting a single file, in
+# microseconds, as reported by python -X importtime: the median of RUNS runs,
+# about 50 ms on an idle machine.
+IMPORT_BUDGET_US = 250_000
+RUNS = 5
+# Runs further apart than this factor are too noisy to be compared.
+MAX_SPREAD = 2
+# Modules a serial run without cache nor third-party rules does not need:
+# heavy standard modules and the modules of the other modes of cmakelint.
+DEFERRED_MODULES = [
+    "concurrent.futures",
+    "multiprocessing",
+    "importlib.metadata",
+    "hashlib",
+    "json",
+    "tempfile",
+    "socket",
+    "numpy",
+    "cmakelint.baseline",
+    "cmakelint.cache",
+    "cmakelint.daemon",
+    "cmakelint.document",
+    "cmakelint.fix",
+    "cmakelint.lsp",
+    "cmakelint.project",
+    "cmakelint.vectorized",
+]
+# Lint the files given as arguments as the entry point does, then print the
+# modules imported.
+RUN_MAIN = """
+import sys
+from cmakelint.__main__ import main
+try:
+    main()
+finally:
+    print(" ".join(sys.modules))
+"""
+
+
+def python(args, cwd="."):
+    proc = subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, text=True)
+    assert proc.returncode in (0, 1), proc.stderr
+    return proc
+
+
+def import_time(stderr):
+    """
+    Return the cumulative import time in us of the modules of cmakelint
+    imported at top level, from the output of python -X importtime. They
+    include the time of everything they import.
+    """
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if name.startswith(" cmakelint"):
+            total += int(cumulative)
+    return total
+
+
+def test_import_is_lazy():
+    proc = python(["-c", "import sys, cmakelint; print(' '.join(sys.modules))"])
+    modules = proc.stdout.split()
+    assert "argparse" not in modules
+    assert "cmakelint.lint" not in modules
+    code = "from cmakelint.state import LINT_STATE; print(LINT_STATE._config_resolved)"
+    assert python(["-c", code]).stdout.strip() == "False"
+
+
+@pytest.mark.parametrize("args", [[], ["--format=text", "--quiet"]])
+def test_serial_run_imports(args):
+    project = TEST_DIR / "startup"
+    project.mkdir(exist_ok=True)
+    (project / "CMakeLists.txt").write_text("project(foo)\nset(A B) \n")
+    proc = python(["-c", RUN_MAIN, *args, "CMakeLists.txt"], cwd=project)
+    modules = proc.stdout.split()
+    assert "cmakelint.lint" in modules
+    assert [module for module in DEFERRED_MODULES if module in modules] == []
+
+
+def test_startup_budget():
+    project = TEST_DIR / "startup"
+    project.mkdir(exist_ok=True)
+    (project / "CMakeLists.txt").write_text("project(foo)\n")
+    args = ["-X", "importtime", "-c", RUN_MAIN, "CMakeLists.txt"]
+    times = sorted(import_time(python(args, cwd=project).stderr) for _ in range(RUNS))
+    if times[-1] > times[0] * MAX_SPREAD:
+        pytest.skip(f"import times too noisy to measure: {times}")
+    assert statistics.median(times) < IMPORT_BUDGET_US
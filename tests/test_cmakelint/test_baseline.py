@@ -0,0 +1,107 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from cmakelint.baseline import Baseline, BaselineError, fingerprint
+from cmakelint.lint import Diagnostic, Linter
+from cmakelint.state import _CMakeLintState
+
+from ..conftest import TEST_DIR
+
+
+def diagnostics(filename, *entries):
+    return [Diagnostic(filename, linenumber, category, "message") for linenumber, category in entries]
+
+
+def test_fingerprint():
+    assert fingerprint("whitespace/eol", "  set(A  B) \n") == fingerprint("whitespace/eol", "set(A B)")
+    assert fingerprint("whitespace/eol", "set(A B)") != fingerprint("whitespace/tabs", "set(A B)")
+    assert fingerprint("whitespace/eol", "set(A B)") != fingerprint("whitespace/eol", "set(A C)")
+
+
+def test_result_lines():
+    # The lines of the diagnostics are kept from the lint, streamed or not.
+    data = b"set(A B) \r\nset(C)\n\tset(D)\n"
+    linter = Linter(_CMakeLintState())
+    result = linter.run_bytes("CMakeLists.txt", data)
+    assert result.lines == {0: "", 1: "set(A B) ", 3: "\tset(D)"}
+    path = TEST_DIR / "lines.cmake"
+    path.write_bytes(data)
+    assert linter.run_stream(str(path)).lines == {0: "", 1: "set(A B) ", 3: "\tset(D)"}
+
+
+def digest(line):
+    return fingerprint("", line).split("\t")[1]
+
+
+def test_baseline(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "CMakeLists.txt").write_text("set(A B) \nset(A B) \n\tset(C)\n")
+    (tmp_path / "FindFoo.cmake").write_text("")
+    filename = str(tmp_path / "sub" / "CMakeLists.txt")
+    path = tmp_path / "baseline.txt"
+    baseline = Baseline.load(str(path), missing_ok=True)
+    found = diagnostics(filename, (1, "whitespace/eol"), (2, "whitespace/eol"), (3, "whitespace/tabs"))
+    baseline.update(filename, found, {1: "set(A B) ", 2: "set(A B) ", 3: "\tset(C)"})
+    found = diagnostics("FindFoo.cmake", (0, "package/consistency"))
+    baseline.update(str(tmp_path / "FindFoo.cmake"), found, {})
+    baseline.save()
+    assert path.read_text() == (
+        "# cmakelint baseline 1\n"
+        "FindFoo.cmake\n"
+        f"\tpackage/consistency\t{digest('')}\t1\n"
+        "sub/CMakeLists.txt\n"
+        f"\twhitespace/eol\t{digest('set(A B)')}\t2\n"
+        f"\twhitespace/tabs\t{digest('set(C)')}\t1\n"
+    )
+
+    # Lines moved and reindented are still suppressed, once per entry.
+    lines = {2: "  set(A B)", 3: "set(A B) ", 4: "set(A B)", 5: "\tset(C)", 6: "\tset(D)"}
+    found = diagnostics(
+        filename,
+        (2, "whitespace/eol"),
+        (3, "whitespace/eol"),
+        (4, "whitespace/eol"),
+        (5, "whitespace/tabs"),
+        (6, "whitespace/tabs"),
+    )
+    assert Baseline.load(str(path)).filter(filename, found, lines) == [found[2], found[4]]
+    assert Baseline.load(str(path)).filter(str(tmp_path / "CMakeLists.txt"), found, lines) == found
+
+    # The files not updated keep their entries, unless they no longer exist.
+    baseline = Baseline.load(str(path))
+    baseline.update(filename, [], {})
+    baseline.save()
+    assert path.read_text() == f"# cmakelint baseline 1\nFindFoo.cmake\n\tpackage/consistency\t{digest('')}\t1\n"
+    (tmp_path / "FindFoo.cmake").unlink()
+    Baseline.load(str(path)).save()
+    assert path.read_text() == "# cmakelint baseline 1\n"
+
+
+def test_baseline_errors(tmp_path):
+    path = tmp_path / "baseline.txt"
+    with pytest.raises(BaselineError, match="no such file"):
+        Baseline.load(str(path))
+    path.write_text("CMakeLists.txt\n")
+    with pytest.raises(BaselineError, match="not a cmakelint baseline"):
+        Baseline.load(str(path))
+    path.write_text("# cmakelint baseline 1\nCMakeLists.txt\n\twhitespace/eol\tabc\n")
+    baseline = Baseline.load(str(path))
+    found = diagnostics("CMakeLists.txt", (1, "whitespace/eol"))
+    with pytest.raises(BaselineError, match="invalid entry of CMakeLists.txt"):
+        baseline.filter(str(tmp_path / "CMakeLists.txt"), found, {1: "set(A) "})
@@ -0,0 +1,153 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+from cmakelint.cache import MemoryCache, ResultCache
+from cmakelint.lint import Linter
+from cmakelint.state import _CMakeLintState
+
+CODE = "# lint_cmake: -whitespace/eol\nproject( foo) \n\tset(A B) \n"
+
+
+class CountingLinter(Linter):
+    def __init__(self, config):
+        super().__init__(config)
+        self.runs = 0
+
+    def run_bytes(self, filename, data):
+        self.runs += 1
+        return super().run_bytes(filename, data)
+
+    def run_stream(self, filename):
+        self.runs += 1
+        return super().run_stream(filename)
+
+
+def write_old_file(path, text):
+    path.write_text(text)
+    os.utime(path, (1000000000, 1000000000))
+
+
+def test_cache_hit():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "CMakeLists.txt"
+        write_old_file(path, CODE)
+        config = _CMakeLintState()
+        linter = CountingLinter(config)
+        expected = linter.run_file(str(path))
+
+        cache = ResultCache(os.path.join(tmp, "cache"), config, 1024 * 1024)
+        result, update = cache.lint(str(path), linter)
+        assert result == expected
+        assert update is not None
+        assert linter.runs == 1
+        cache.save()
+
+        cache = ResultCache(os.path.join(tmp, "cache"), config, 1024 * 1024)
+        result, update = cache.lint(str(path), linter)
+        assert result == expected
+        assert update is None
+        assert linter.runs == 1
+
+        # The stat index answers without reading the file
+        path.write_text(CODE.replace("foo", "bar"))
+        os.utime(path, (1000000000, 1000000000))
+        assert cache.lint(str(path), linter)[0] == expected
+        assert linter.runs == 1
+
+        # A change of the settings misses
+        config.set_spaces(4)
+        cache = ResultCache(os.path.join(tmp, "cache"), config, 1024 * 1024)
+        cache.lint(str(path), linter)
+        assert linter.runs == 2
+
+
+def test_cache_replays_filters():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "CMakeLists.txt"
+        write_old_file(path, CODE)
+        cache = ResultCache(os.path.join(tmp, "cache"), _CMakeLintState(), 1024 * 1024)
+        cache.lint(str(path), Linter(_CMakeLintState()))
+        for filters in ["-whitespace/tabs", "+whitespace/eol", "-whitespace,+whitespace/mismatch"]:
+            config = _CMakeLintState()
+            config.set_filters(filters)
+            result, update = cache.lint(str(path), Linter(config))
+            assert update is None
+            assert result.filtered(config.filters) == Linter(config).lint_file(str(path))
+
+
+def test_cache_large_file(monkeypatch):
+    monkeypatch.setattr("cmakelint.cache._STREAMING_THRESHOLD", 16)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "CMakeLists.txt"
+        write_old_file(path, CODE)
+        config = _CMakeLintState()
+        linter = CountingLinter(config)
+        expected = linter.run_file(str(path))
+        for _ in range(2):
+            cache = ResultCache(os.path.join(tmp, "cache"), config, 1024 * 1024)
+            assert cache.lint(str(path), linter)[0] == expected
+            cache.save()
+        assert linter.runs == 1
+
+
+def test_cache_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(os.path.join(tmp, "cache"), _CMakeLintState(), 800)
+        linter = Linter(_CMakeLintState())
+        for i in range(4):
+            path = Path(tmp) / f"CMakeLists{i}.txt"
+            write_old_file(path, f"project( foo{i})\n" * 4)
+            cache.lint(str(path), linter)
+        cache.save()
+        sizes = [entry.stat().st_size for entry in Path(tmp, "cache", "entries").glob("*/*.json")]
+        assert 0 < len(sizes) < 4
+        assert sum(sizes) <= 800
+
+
+def test_memory_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / f"{name}.cmake" for name in "abc"]
+        for path in paths:
+            write_old_file(path, CODE)
+        linter = CountingLinter(_CMakeLintState())
+        memory = MemoryCache(2)
+
+        def lint(filename):
+            return linter.run_bytes(filename, Path(filename).read_bytes()), None
+
+        a, b, c = (str(path) for path in paths)
+        expected = memory.lint(a, "settings", lint)
+        assert memory.lint(a, "settings", lint) == expected
+        assert linter.runs == 1
+        memory.lint(a, "other settings", lint)
+        assert linter.runs == 2
+        # a was used last, so "other settings" is evicted first.
+        memory.lint(a, "settings", lint)
+        memory.lint(b, "settings", lint)
+        memory.lint(a, "settings", lint)
+        assert linter.runs == 3
+        memory.lint(c, "settings", lint)
+        memory.lint(a, "other settings", lint)
+        assert linter.runs == 5
+
+        write_old_file(paths[0], CODE + "\n")
+        memory.lint(a, "settings", lint)
+        assert linter.runs == 6
@@ -42,6 +42,8 @@ def test_parse_args():
             pytest.raises(SystemExit, cmakelint.cli.parse_args, ["--filter=+x,b,-c", "foo.cmake"])
             pytest.raises(SystemExit, cmakelint.cli.parse_args, ["--spaces=c", "foo.cmake"])
             pytest.raises(SystemExit, cmakelint.cli.parse_args, ["--version"])
+            pytest.raises(SystemExit, cmakelint.cli.parse_args, ["--jobs=0", "foo.cmake"])
+            pytest.raises(SystemExit, cmakelint.cli.parse_args, ["--jobs=many", "foo.cmake"])
         cmakelint.state.LINT_STATE.filters = []
         assert cmakelint.cli.parse_args(["--filter=-whitespace", "foo.cmake"]) == ["foo.cmake"]
         cmakelint.state.LINT_STATE.filters = []
@@ -61,6 +63,12 @@ def test_parse_args():
         ]
         assert cmakelint.state.LINT_STATE.filters == ["-", "+whitespace/eol", "+whitespace/tabs"]
 
+        cmakelint.state.LINT_STATE.filters = []
+        cmakelint.cli.parse_args(["--jobs=4", "foo.cmake"])
+        assert cmakelint.state.LINT_STATE.jobs == 4
+        cmakelint.cli.parse_args(["--jobs=auto", "foo.cmake"])
+        assert cmakelint.state.LINT_STATE.jobs == (os.cpu_count() or 1)
+
         cmakelint.state.LINT_STATE.filters = []
         cmakelint.cli.parse_args(["--config=./foo/bar", "foo.cmake"])
         assert cmakelint.state.LINT_STATE.config == "./foo/bar"
@@ -0,0 +1,137 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from cmakelint.config import ConfigError, ConfigResolver, Options, apply_options, load_option_file, read_option_file
+from cmakelint.state import _CMakeLintState
+
+TREE = {
+    ".cmakelintrc": "filter=-whitespace\nlinelength=100\n[third_party/]\nlinelength=120\n[*.in.cmake]\nspaces=4\n",
+    "src/CMakeLists.txt": "",
+    "src/a.cmake": "",
+    "src/b.in.cmake": "",
+    "third_party/lib/.cmakelintrc": "filter=-readability/mixedcase\n[gen/]\nfilter=+whitespace/tabs\n",
+    "third_party/lib/CMakeLists.txt": "",
+    "third_party/lib/gen/x.cmake": "",
+}
+
+
+def make_tree(root, tree):
+    for name, text in tree.items():
+        path = Path(root, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def make_config(rc, cli_filters=""):
+    # As parse_args() does without --config.
+    config = _CMakeLintState()
+    config.config = rc
+    apply_options(load_option_file(rc), False, config)
+    num_filters = len(config.filters)
+    config.set_filters(cli_filters)
+    config.set_directory_rc(True, config.filters[num_filters:], False)
+    return config
+
+
+def test_read_option_file():
+    assert read_option_file(["filter=-syntax", "[a/*.cmake]", "linelength=90", "quiet", "[b]", "spaces=4"]) == Options(
+        "-syntax",
+        None,
+        None,
+        False,
+        (("a/*.cmake", Options(None, None, "90", True)), ("b", Options(None, "4", None, False))),
+    )
+
+
+def test_resolver():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, TREE)
+        config = make_config(os.path.join(root, ".cmakelintrc"), "+whitespace/eol")
+        resolver = ConfigResolver(config)
+
+        def resolve(name):
+            return resolver.resolve(os.path.join(root, name))
+
+        assert resolve("src/CMakeLists.txt") is config
+        assert resolve("src/a.cmake") is config
+        b = resolve("src/b.in.cmake")
+        assert (b.spaces, b.linelength, b.filters) == (4, 100, ["-whitespace", "+whitespace/eol"])
+
+        lib = resolve("third_party/lib/CMakeLists.txt")
+        assert (lib.spaces, lib.linelength) == (2, 120)
+        assert lib.filters == ["-whitespace", "-readability/mixedcase", "+whitespace/eol"]
+        gen = resolve("third_party/lib/gen/x.cmake")
+        assert gen.filters == ["-whitespace", "-readability/mixedcase", "+whitespace/tabs", "+whitespace/eol"]
+        # Configs are shared by the files resolving to the same settings.
+        assert resolve("third_party/lib/CMakeLists.txt") is lib
+        assert resolve("third_party/lib/gen/y.cmake") is gen
+
+
+def test_resolver_skips_outer_files():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, {".cmakelintrc": "linelength=60\n", "project/.cmakelintrc": "", "project/a.cmake": ""})
+        config = make_config(os.path.join(root, "project", ".cmakelintrc"))
+        assert ConfigResolver(config).resolve(os.path.join(root, "project", "a.cmake")) is config
+        config.set_directory_rc(False, [], False)
+        make_tree(root, {"project/sub/.cmakelintrc": "linelength=60\n"})
+        assert ConfigResolver(config).resolve(os.path.join(root, "project", "sub", "a.cmake")) is config
+
+
+def test_resolver_errors():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, {".cmakelintrc": "", "sub/.cmakelintrc": "filter=-nothing\n"})
+        resolver = ConfigResolver(make_config(os.path.join(root, ".cmakelintrc")))
+        with pytest.raises(ConfigError, match="sub"):
+            resolver.resolve(os.path.join(root, "sub", "a.cmake"))
+
+
+def test_resolver_load_options():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, TREE)
+        parsed = {}
+        loaded = []
+
+        def load_options(path):
+            # Parses each file once, as the loader of the daemon does while
+            # the files do not change.
+            loaded.append(path)
+            if path not in parsed:
+                parsed[path] = load_option_file(path)
+            return parsed[path]
+
+        config = make_config(os.path.join(root, ".cmakelintrc"))
+        resolver = ConfigResolver(config, load_options)
+        lib = os.path.join(root, "third_party", "lib")
+        gen = resolver.resolve(os.path.join(lib, "gen", "x.cmake"))
+        assert sorted(parsed) == [os.path.join(root, ".cmakelintrc"), os.path.join(lib, ".cmakelintrc")]
+        option_files = resolver._option_files(os.path.join(lib, "gen"))
+        # A new run looks the option files up again through load_options,
+        # which may have been added since, and reuses their compiled globs.
+        loaded.clear()
+        make_tree(root, {"third_party/lib/gen/.cmakelintrc": "linelength=90\n"})
+        resolver.rebind(config)
+        reused = resolver._option_files(os.path.join(lib, "gen"))[:2]
+        assert all(new is old for new, old in zip(reused, option_files))
+        assert os.path.join(lib, "gen", ".cmakelintrc") in loaded
+        assert resolver.resolve(os.path.join(lib, "gen", "x.cmake")).linelength == 90
+        assert gen.linelength == 120
@@ -0,0 +1,121 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from cmakelint.discovery import IgnoreRules, discover, read_paths
+
+
+def make_tree(root, files):
+    for name in files:
+        path = Path(root, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+
+def relative(paths, root):
+    return [os.path.relpath(path, root).replace(os.sep, "/") for path in paths]
+
+
+def test_ignore_rules():
+    rules = IgnoreRules(["# comment", "*.gen.cmake", "build/", "/top.cmake", "docs/**/*.cmake", "!keep.gen.cmake"])
+    assert rules.match("a/b/foo.gen.cmake", False)
+    assert rules.match("keep.gen.cmake", False) is False
+    assert rules.match("build", True)
+    assert rules.match("build", False) is None
+    assert rules.match("a/build", True)
+    assert rules.match("top.cmake", False)
+    assert rules.match("a/top.cmake", False) is None
+    assert rules.match("docs/x/y/z.cmake", False)
+    assert rules.match("docs/z.cmake", False)
+    assert rules.match("CMakeLists.txt", False) is None
+    assert IgnoreRules(["[]a]*.cmake"]).match("]x.cmake", False)
+    assert IgnoreRules(["[!a]*.cmake"]).match("b.cmake", False)
+    assert IgnoreRules(["[!a]*.cmake"]).match("a.cmake", False) is None
+
+
+def test_discover_walk():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(
+            root,
+            [
+                "CMakeLists.txt",
+                "main.c",
+                "cmake/FindFOO.cmake",
+                "cmake/foo.gen.cmake",
+                "third_party/CMakeLists.txt",
+                "vendor/CMakeLists.txt",
+                "vendor/lib/keep.cmake",
+                "vendor/lib/drop.cmake",
+                "build/CMakeCache.txt",
+                "build/CMakeLists.txt",
+                "out/_deps/x/CMakeLists.txt",
+                "out/CMakeLists.txt",
+            ],
+        )
+        Path(root, ".gitignore").write_text("*.gen.cmake\nvendor/lib/*\n!vendor/lib/keep.cmake\n")
+        Path(root, "vendor", ".gitignore").write_text("/CMakeLists.txt\n")
+        found = relative(discover([root, os.path.join(root, "main.c")], ["third_party/"]), root)
+        assert found == ["CMakeLists.txt", "cmake/FindFOO.cmake", "vendor/lib/keep.cmake", "main.c"]
+        # Build trees are walked when given explicitly
+        assert relative(discover([os.path.join(root, "build")]), root) == ["build/CMakeLists.txt"]
+
+
+def test_discover_symlinks():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, ["src/CMakeLists.txt", "src/sub/helpers.cmake"])
+        try:
+            os.symlink(os.path.join(root, "src", "sub"), os.path.join(root, "src", "alias"))
+            os.symlink(os.path.join(root, "src", "CMakeLists.txt"), os.path.join(root, "link.cmake"))
+            os.symlink(root, os.path.join(root, "src", "loop"))
+        except (OSError, NotImplementedError):
+            pytest.skip("symlinks are not supported")
+        found = relative(discover([root, os.path.join(root, "src")]), root)
+        assert sorted(found) == ["link.cmake", "src/alias/helpers.cmake"]
+
+
+def test_discover_files_once():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, ["a/CMakeLists.txt", "b.cmake"])
+        explicit = [os.path.join(root, "a", "CMakeLists.txt"), os.path.join(root, "b.cmake")]
+        found = relative(discover([root, *explicit, explicit[1]]), root)
+        assert found == ["b.cmake", "a/CMakeLists.txt"]
+
+
+def test_discover_is_lazy():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, ["a/CMakeLists.txt", "b/CMakeLists.txt"])
+        files = discover([root])
+        assert relative([next(files)], root) == ["a/CMakeLists.txt"]
+        Path(root, "b", "CMakeLists.txt").unlink()
+        assert list(files) == []
+
+
+def test_read_paths(monkeypatch):
+    assert list(read_paths(io.BytesIO(b"a.cmake\r\n\nb c/CMakeLists.txt\nd\xff.cmake"))) == [
+        "a.cmake",
+        "b c/CMakeLists.txt",
+        os.fsdecode(b"d\xff.cmake"),
+    ]
+    monkeypatch.setattr("cmakelint.discovery._READ_SIZE", 3)
+    data = b"a.cmake\0\0with\nnewline.cmake\0b.cmake"
+    assert list(read_paths(io.BytesIO(data), null=True)) == ["a.cmake", "with\nnewline.cmake", "b.cmake"]
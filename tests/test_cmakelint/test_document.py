@@ -0,0 +1,154 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from cmakelint.document import Document
+from cmakelint.lint import Linter
+from cmakelint.state import _CMakeLintState
+
+TEXT = (
+    "# lint_cmake: -whitespace/eol\n"
+    "project(foo)\n"
+    "if(A)\n"
+    "  set(B\n"
+    "      c d) \n"
+    '  message("x # y")\n'
+    "endif()\n" + "\n" * 40 + "include(FindPackageHandleStandardArgs)\n"
+    "find_package_handle_standard_args(FOO DEFAULT_MSG)\n"
+)
+
+
+# Lines the random documents and edits are made of.
+LINES = [
+    "",
+    "# comment",
+    "include(FindPackageHandleStandardArgs)",
+    "include()",
+    "find_package_handle_standard_args()",
+    "find_package_handle_standard_args(FOO DEFAULT_MSG)",
+    "set(FOO 1)",
+    "LIST(APPEND FOO x)",
+    "if(A)",
+    "endif()",
+    "  set(B",
+    "      c d) ",
+    '  message("x # y")',
+    "\tset(C [[",
+    "]])",
+    "# lint_cmake: -whitespace/eol",
+]
+
+
+def check(filename, text, edits, config=None):
+    config = config or _CMakeLintState()
+    document = Document(filename, text, config)
+    for start, end, new_text in edits:
+        document.edit(start, end, new_text)
+        assert document.diagnostics() == sorted(
+            Linter(config).lint_text(filename, document.text), key=lambda diagnostic: diagnostic.linenumber
+        )
+    return document
+
+
+@pytest.mark.parametrize("filename", ["CMakeLists.txt", "FindFOO.cmake", "FindFoo.cmake"])
+@pytest.mark.parametrize(
+    "edit",
+    [
+        ((1, 0), (1, 0), "\t"),
+        ((1, 0), (1, 7), "PROJECT"),
+        ((3, 7), (3, 7), "\n"),
+        ((4, 9), (5, 0), ""),
+        ((5, 11), (5, 11), '"'),
+        ((3, 0), (3, 0), "set(C [[\n"),
+        ((2, 0), (2, 0), "#[[ "),
+        ((0, 0), (1, 0), ""),
+        ((0, 0), (0, 0), "# lint_cmake: -readability\n"),
+        ((47, 0), (48, 0), ""),
+        ((46, 8), (46, 17), "Other"),
+        ((48, 0), (48, 0), "SET(X y)\r\n"),
+        ((2, 3), (100, 0), ")"),
+        ((0, 100), (0, 100), "\r"),
+    ],
+)
+def test_edit_matches_linter(filename, edit):
+    check(filename, TEXT, [edit, edit])
+
+
+def test_random_edits_match_linter():
+    # The diagnostics of a line may come in another order than the Linter's.
+    rng = random.Random(0)
+    config = _CMakeLintState()
+    linter = Linter(config)
+    # Commands without arguments read the lines after them, up to the first word.
+    weights = [4 if line in ("", "find_package_handle_standard_args()") else 1 for line in LINES]
+
+    def random_text(count):
+        return "\n".join(rng.choices(LINES, weights, k=count))
+
+    for _ in range(500):
+        filename = rng.choice(["CMakeLists.txt", "FindFOO.cmake"])
+        document = Document(filename, random_text(rng.randrange(8)), config)
+        for _ in range(4):
+            start = (rng.randrange(8), rng.randrange(12))
+            end = (start[0] + rng.randrange(2), rng.randrange(12))
+            document.edit(start, end, rng.choice([random_text(rng.randrange(3)), *'()"x ']))
+            assert sorted(document.diagnostics()) == sorted(linter.lint_text(filename, document.text))
+
+
+def test_edit_relints_the_commands_changed():
+    document = check("CMakeLists.txt", TEXT, [((4, 6), (4, 6), "e ")])
+    # The lines around the edit are split again.
+    assert document.relinted == (4, 7)
+    document = check("CMakeLists.txt", TEXT, [((20, 0), (20, 0), "if(C)\nendif()\n")])
+    assert document.relinted == (20, 25)
+    # An opened quote changes every line after it, up to the last one.
+    document = check("CMakeLists.txt", TEXT, [((20, 0), (20, 0), '"')])
+    assert document.relinted == (20, document.line_count + 2)
+    # Pragmas only filter the diagnostics, the lines are checked as before.
+    document = check(
+        "CMakeLists.txt",
+        TEXT,
+        [
+            ((20, 0), (20, 0), "# lint_cmake: push\n# lint_cmake: -whitespace\n"),
+            ((4, 0), (4, 0), "# lint_cmake: disable-next-line\n"),
+            ((0, 0), (1, 0), "# lint_cmake: pop\n"),
+        ],
+    )
+    assert document.relinted == (1, 4)
+
+
+def test_edit_relints_the_commands_reading_it():
+    # The arguments of a command without any are looked up on the lines after it.
+    text = "include(FindPackageHandleStandardArgs)\nfind_package_handle_standard_args()\n\n\nset(FOO 1)\n"
+    document = check("FindFOO.cmake", text, [((4, 0), (4, 3), "list"), ((2, 0), (2, 0), "FOO")])
+    assert document.diagnostics() == []
+
+
+def test_edit_positions():
+    # Positions past the end of a line or of the document are moved back to it.
+    document = check("CMakeLists.txt", "set(A)\nset(B)", [((0, 100), (0, 100), "\r"), ((1, 2), (5, 0), "")])
+    assert document.text == "set(A)\r\nse"
+    assert document.line_count == 2
+    assert document.line(0) == "set(A)"
+    # A carriage return and a newline inserted on both sides of an edit make
+    # a single line ending.
+    document = check("CMakeLists.txt", "set(A)\r\nset(B)\r\n", [((0, 6), (1, 0), "\r"), ((1, 0), (1, 0), "\n")])
+    assert document.text == "set(A)\r\nset(B)\r\n"
+    assert document.line_count == 3
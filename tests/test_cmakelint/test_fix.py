@@ -0,0 +1,149 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import stat
+
+import pytest
+
+from cmakelint.cache import ResultCache
+from cmakelint.fix import apply_edits, fix_file, select_fixes
+from cmakelint.lint import Edit, Linter
+from cmakelint.state import _CMakeLintState
+
+from ..conftest import TEST_DIR
+
+
+def fix_text(text, filters=None, dry_run=False):
+    config = _CMakeLintState()
+    if filters is not None:
+        config.set_filters(filters)
+    config.set_fix(True, dry_run)
+    (TEST_DIR / "fix").mkdir(exist_ok=True)
+    path = TEST_DIR / "fix" / "CMakeLists.txt"
+    path.write_bytes(text.encode())
+    diagnostics, fix = fix_file(str(path), Linter(config).run_file(str(path)), config)
+    return path.read_bytes().decode(), diagnostics, fix
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("foo() \t\n", "foo()\n"),
+        ("\tset(A\tB)\n", "  set(A B)\n"),
+        ('set(A "a\tb")\t\n', 'set(A "a\tb")\n'),
+        ('set(A "a"\tB)\n', 'set(A "a" B)\n'),
+        ("   foo()\n if(A)\n", "    foo()\n  if(A)\n"),
+        ("foo (A)\n", "foo(A)\n"),
+        ("foo( A)\nfoo(A  )\nfoo(  A )\n", "foo(A)\nfoo(A)\nfoo( A )\n"),
+        ('foo( "a" A)\nfoo("a"  )\n', 'foo("a" A)\nfoo("a")\n'),
+        ("foo(A)\r\nbar(B)\r\n", "foo(A)\nbar(B)\n"),
+        # Whitespace within arguments and comments is kept.
+        ('set(A "a  \n   b")\n', 'set(A "a  \n   b")\n'),
+        ("set(A [[a  \n   b]])\n", "set(A [[a  \n   b]])\n"),
+        ("foo() # a\tb\n", "foo() # a\tb\n"),
+        ("#[[ a \n   ]] foo (A)\n", "#[[ a \n   ]] foo(A)\n"),
+    ],
+)
+def test_fix(code, expected):
+    fixed, diagnostics, fix = fix_text(code)
+    assert fixed == expected
+    # The diagnostics left are the ones of the fixed file.
+    assert diagnostics == Linter(_CMakeLintState()).lint_text(str(TEST_DIR / "fix" / "CMakeLists.txt"), fixed)
+    assert fix.error is None
+
+
+def test_fix_filters():
+    code = "# lint_cmake: -whitespace/eol\nfoo() \n  bar (A) \n"
+    fixed, diagnostics, fix = fix_text(code, "-whitespace/extra")
+    assert fixed == code
+    assert (diagnostics, fix.fixed) == ([], 0)
+
+
+def test_fix_dry_run():
+    code = "foo( A)\n\tbar()\n"
+    fixed, diagnostics, fix = fix_text(code, dry_run=True)
+    assert fixed == code
+    assert [diagnostic.linenumber for diagnostic in diagnostics] == [1, 2]
+    assert fix.fixed == 2
+    path = str(TEST_DIR / "fix" / "CMakeLists.txt")
+    assert fix.diff == (f"--- {path}\n+++ {path}\n@@ -1,2 +1,2 @@\n-foo( A)\n-\tbar()\n+foo(A)\n+  bar()\n")
+
+
+def test_fix_undecodable():
+    (TEST_DIR / "fix").mkdir(exist_ok=True)
+    path = TEST_DIR / "fix" / "CMakeLists.txt"
+    path.write_bytes(b"foo() \nset(A \xff)\n")
+    config = _CMakeLintState()
+    diagnostics, fix = fix_file(str(path), Linter(config).run_file(str(path)), config)
+    assert path.read_bytes() == b"foo() \nset(A \xff)\n"
+    assert (len(diagnostics), fix.fixed, fix.error) == (1, 0, "not valid utf-8")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permissions and symlinks")
+def test_fix_keeps_file():
+    (TEST_DIR / "fix_link").mkdir()
+    path = TEST_DIR / "fix_link" / "real.cmake"
+    link = TEST_DIR / "fix_link" / "link.cmake"
+    path.write_text("foo() \n")
+    path.chmod(0o640)
+    link.symlink_to(path.name)
+    config = _CMakeLintState()
+    fix_file(str(link), Linter(config).run_file(str(link)), config)
+    assert link.is_symlink()
+    assert path.read_text() == "foo()\n"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+    assert sorted(os.listdir(TEST_DIR / "fix_link")) == ["link.cmake", "real.cmake"]
+
+
+def test_fix_samples():
+    shutil.copytree(TEST_DIR / "samples", TEST_DIR / "fixed")
+    paths = [str(TEST_DIR / "fixed" / name / "CMakeLists.txt") for name in ["llvm", "opencv", "blender/src"]]
+    config = _CMakeLintState()
+    linter = Linter(config)
+    for path in paths:
+        diagnostics, fix = fix_file(path, linter.run_file(path), config)
+        assert fix.fixed > 0
+        assert diagnostics == linter.lint_file(path)
+
+
+def test_select_fixes():
+    fixes = {
+        0: (Edit(1, 0, 3, "  "),),
+        1: (Edit(1, 2, 4, ""),),
+        2: (Edit(1, 4, 5, " "), Edit(1, 7, 9, "")),
+        3: (Edit(1, 7, 9, ""),),
+        4: (Edit(0, 0, 0, "\n"),),
+    }
+    selected, edits = select_fixes(fixes)
+    assert selected == [4, 0, 2, 3]
+    assert apply_edits("   a\tbc  \r\nd\r\n", edits) == "  a bc\nd\n"
+
+
+def test_cached_fixes(tmp_path):
+    path = tmp_path / "CMakeLists.txt"
+    path.write_text("foo( A) \n")
+    os.utime(path, (1000000000, 1000000000))
+    config = _CMakeLintState()
+    linter = Linter(config)
+    cache = ResultCache(str(tmp_path / "cache"), config, 1 << 20)
+    result, _ = cache.lint(str(path), linter)
+    cache.save()
+    assert result.fixes
+    cache = ResultCache(str(tmp_path / "cache"), config, 1 << 20)
+    assert cache.lint(str(path), linter) == (result, None)
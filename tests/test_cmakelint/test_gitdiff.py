@@ -0,0 +1,80 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+from cmakelint.gitdiff import ChangedFile, parse_diff
+from cmakelint.lint import Diagnostic
+
+DIFF = """\
+diff --git a/CMakeLists.txt b/CMakeLists.txt
+index 1111111..2222222 100644
+--- a/CMakeLists.txt
++++ b/CMakeLists.txt
+@@ -2,0 +3,2 @@ project(foo)
++++ this(line)
++set(A B)
+@@ -7 +9 @@ endif()
+-x()
++y()
+@@ -12,3 +13,0 @@
+-a()
+-b()
+-c()
+diff --git a/old.cmake b/new.cmake
+similarity index 100%
+rename from old.cmake
+rename to new.cmake
+diff --git a/x y.cmake b/x y.cmake
+new file mode 100644
+index 0000000..3333333
+--- /dev/null
++++ b/x y.cmake\t
+@@ -0,0 +1 @@
++a()
+diff --git "a/\\303\\251.cmake" "b/\\303\\251.cmake"
+index 4444444..5555555 100644
+--- "a/\\303\\251.cmake"
++++ "b/\\303\\251.cmake"
+@@ -1 +1 @@
+-b()
++B()
+"""
+
+
+def test_parse_diff():
+    assert parse_diff(DIFF) == {
+        "CMakeLists.txt": ChangedFile(False, [3, 9], [4, 9]),
+        "new.cmake": ChangedFile(True, [], []),
+        "x y.cmake": ChangedFile(True, [1], [1]),
+        "é.cmake": ChangedFile(False, [1], [1]),
+    }
+
+
+def test_parse_diff_line_breaks():
+    # Only newlines end the lines of a diff, the lines of a file may hold
+    # other line breaks.
+    diff = "diff --git a/x.cmake b/x.cmake\n--- a/x.cmake\n+++ b/x.cmake\n@@ -1 +1,2 @@\n-a\n+a\x0c@@ b\n+c\u2028@@\n"
+    assert parse_diff(diff) == {"x.cmake": ChangedFile(False, [1], [2])}
+
+
+def test_keeps():
+    def keeps(change, linenumber):
+        return change.keeps(Diagnostic("CMakeLists.txt", linenumber, "syntax", ""))
+
+    change = ChangedFile(False, [3, 9], [4, 9])
+    assert [linenumber for linenumber in range(12) if keeps(change, linenumber)] == [3, 4, 9]
+    assert keeps(ChangedFile(True, [], []), 0)
+    assert not keeps(ChangedFile(True, [], []), 1)
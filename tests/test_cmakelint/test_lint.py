@@ -15,6 +15,8 @@ the License.
 
 from __future__ import annotations
 
+import pytest
+
 import cmakelint
 
 from .utils import (
@@ -75,6 +77,51 @@ def test_clean_comment_quotes():
     assert cmakelint.lint.clean_comments(' end of comment") ', True) == ('")', False)
 
 
+def test_clean_comment_brackets():
+    clean_comments = cmakelint.lint.clean_comments
+    assert clean_comments("set(A [[x # y]]) # c") == ("set(A [[]])", False)
+    assert clean_comments('message([=[ a ]] " ]=])') == ("message([=[]=])", False)
+    assert clean_comments("#[==[ c ]==] set(C) # d") == (" set(C)", False)
+    assert clean_comments("set(A x[[y]]) ") == ("set(A x[[y]]) ", False)
+    cleaned, quote = clean_comments("#[[ comment")
+    assert cleaned == ""
+    assert clean_comments('  "quoted" ( ]=] #', quote) == ("", quote)
+    assert clean_comments("]] set(B)", quote) == (" set(B)", False)
+
+
+def test_bracket_argument_and_comment():
+    do_test_multi_line_lint(
+        (
+            "set(VAR [=[\n"
+            "  SeT ( A)\n"
+            "  # ]] not the end\n"
+            "]=])\n"
+            "#[[\n"
+            "PROJECT (B)\n"
+            "endif(C)\n"
+            "]] message(STATUS done)\n"
+        ),
+        "",
+    )
+
+
+def test_cleansed_lines():
+    lines = ["# Lines start at 1", "set(A B) ", 'message("a # b") # c', "", "\tendif()", "# Lines end here"]
+    clean_lines = cmakelint.lint.CleansedLines(lines)
+    assert list(clean_lines.raw_lines) == lines
+    assert [clean_lines.raw_lines[i] for i in range(-len(lines), len(lines))] == lines * 2
+    assert list(clean_lines.lines) == ["", "set(A B) ", 'message("")', "", "\tendif()", ""]
+    assert clean_lines.lines[2] == 'message("")'
+    assert clean_lines.lines[-2] == "\tendif()"
+    # Only the lines changed by the cleaning are stored twice.
+    assert sorted(clean_lines.lines.changed) == [0, 2, 5]
+    assert len(clean_lines.lines) == len(clean_lines.raw_lines) == len(lines)
+    for index in [len(lines), -len(lines) - 1]:
+        for sequence in [clean_lines.raw_lines, clean_lines.lines]:
+            with pytest.raises(IndexError):
+                sequence[index]
+
+
 def test_command_spaces():
     do_test_multi_line_lint("""project ()""", "Extra spaces between 'project' and its ()")
 
@@ -0,0 +1,242 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import random
+import subprocess
+import sys
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cmakelint.lint import Diagnostic, Linter, precheck
+from cmakelint.state import _CMakeLintState
+
+from ..conftest import TEST_DIR
+
+
+def test_lint_text():
+    linter = Linter(_CMakeLintState())
+    assert linter.lint_text("CMakeLists.txt", "project( foo)\n\tset(A B) \n") == [
+        Diagnostic("CMakeLists.txt", 1, "whitespace/mismatch", "Mismatching spaces inside () after command"),
+        Diagnostic("CMakeLists.txt", 2, "whitespace/tabs", "Tab found; please use spaces"),
+        Diagnostic("CMakeLists.txt", 2, "whitespace/eol", "Line ends in whitespace"),
+    ]
+    assert str(linter.lint_text("CMakeLists.txt", "project( foo)\n")[0]) == (
+        "CMakeLists.txt:1: Mismatching spaces inside () after command [whitespace/mismatch]"
+    )
+
+
+def test_lint_text_config():
+    config = _CMakeLintState()
+    config.set_filters("-whitespace/eol")
+    config.set_line_length(20)
+    config.set_spaces(4)
+    assert Linter(config).lint_text("CMakeLists.txt", "  set(VARIABLE value) \n") == [
+        Diagnostic("CMakeLists.txt", 1, "linelength", "Lines should be <= 20 characters long"),
+        Diagnostic("CMakeLists.txt", 1, "whitespace/indent", "Weird indentation; use 4 spaces"),
+    ]
+
+
+def test_pragma_is_local_to_file():
+    config = _CMakeLintState()
+    linter = Linter(config)
+    assert linter.lint_text("CMakeLists.txt", "# lint_cmake: -whitespace/eol\nfoo() \n") == []
+    assert config.filters == []
+    assert linter.lint_text("CMakeLists.txt", "foo() \n") == [
+        Diagnostic("CMakeLists.txt", 1, "whitespace/eol", "Line ends in whitespace"),
+    ]
+
+
+def test_package_state_is_local_to_file():
+    linter = Linter(_CMakeLintState())
+    found = "INCLUDE(FindPackageHandleStandardArgs)\nFIND_PACKAGE_HANDLE_STANDARD_ARGS(FOO DEFAULT_MSG)\n"
+    assert linter.lint_text("FindFOO.cmake", found) == []
+    assert [d.message for d in linter.lint_text("FindFOO.cmake", "")] == [
+        "Package should include FindPackageHandleStandardArgs",
+        "Package should use FIND_PACKAGE_HANDLE_STANDARD_ARGS",
+    ]
+
+
+def test_lint_file():
+    path = TEST_DIR / "samples" / "opencv" / "CMakeLists.txt"
+    linter = Linter(_CMakeLintState())
+    assert linter.lint_file(str(path)) == linter.lint_text(str(path), path.read_text())
+
+
+def test_precheck(monkeypatch):
+    lines = ["a\tb", "  ok", "c ", "\u3000", " d\u3000e", "", "x" * 81]
+    assert precheck(lines, 80, 2) == {0, 2, 3, 4, 6}
+    assert precheck(lines, 80, 1, start=1) == {1, 3, 4, 7}
+    assert precheck([], 80, 2) == set()
+    texts = [(TEST_DIR / "samples" / name / "CMakeLists.txt").read_text() for name in ["llvm", "opencv", "blender/src"]]
+    linter = Linter(_CMakeLintState())
+    expected = [linter.run_text("CMakeLists.txt", text) for text in texts]
+    # Every line goes through the raw line checks without a precheck.
+    monkeypatch.setattr(Linter, "precheck", lambda *args: None)
+    assert [linter.run_text("CMakeLists.txt", text) for text in texts] == expected
+
+
+def test_precheck_vectorized():
+    pytest.importorskip("numpy")
+    lines = (TEST_DIR / "samples" / "llvm" / "CMakeLists.txt").read_text().splitlines()
+    lines += ["", "\t", " ", "   x", "x" * 81]
+    for linelength, spaces in [(80, 2), (10, 3), (200, 1)]:
+        expected = precheck(lines, linelength, spaces, vectorize=False)
+        assert precheck(lines, linelength, spaces, vectorize=True) == expected
+
+
+def test_run_bytes_encoding():
+    config = _CMakeLintState()
+    data = "# caf\xe9 \nset(A B)\n".encode("latin-1")
+    diagnostics = Linter(config).run_bytes("CMakeLists.txt", data).filtered(config.filters)
+    assert [(d.linenumber, d.category) for d in diagnostics] == [(1, "whitespace/eol")]
+    config.set_encoding("latin-1")
+    assert Linter(config).run_bytes("CMakeLists.txt", data) == Linter(config).run_text(
+        "CMakeLists.txt", data.decode("latin-1")
+    )
+
+
+def test_carriage_returns():
+    linter = Linter(_CMakeLintState())
+    diagnostics = linter.lint_text("CMakeLists.txt", "set(A B)\r\nset(C\tD)\rset(E F) \n")
+    assert [(d.linenumber, d.category) for d in diagnostics] == [
+        (0, "whitespace/newline"),
+        (2, "whitespace/tabs"),
+        (3, "whitespace/eol"),
+    ]
+
+
+def test_run_file_large():
+    (TEST_DIR / "large").mkdir(exist_ok=True)
+    path = TEST_DIR / "large" / "CMakeLists.txt"
+    path.write_text("set(A B)\n" * 10000 + "set(C\tD)\n")
+    linter = Linter(_CMakeLintState())
+    assert linter.run_file(str(path)) == linter.run_stream(str(path))
+    assert [d.linenumber for d in linter.lint_file(str(path))] == [10001]
+
+
+def test_run_stream():
+    paths = [TEST_DIR / "samples" / name / "CMakeLists.txt" for name in ["llvm", "opencv", "blender/src"]]
+    (TEST_DIR / "stream").mkdir(exist_ok=True)
+    find_module = TEST_DIR / "stream" / "FindFOO.cmake"
+    find_module.write_text(
+        "# lint_cmake: -whitespace/eol\ninclude(\n  FindPackageHandleStandardArgs)\n"
+        "FIND_PACKAGE_HANDLE_STANDARD_ARGS(\nFOO DEFAULT_MSG) \nset(A\n"
+    )
+    linter = Linter(_CMakeLintState())
+    for path in [*paths, find_module]:
+        assert linter.run_stream(str(path)) == linter.run_file(str(path))
+
+
+def test_run_stream_memory():
+    def peak_memory(path, num_lines):
+        path.write_text("if(FOO)\n  set(A\n    B)\nendif()\n" * (num_lines // 4))
+        tracemalloc.start()
+        try:
+            assert linter.run_stream(str(path)).diagnostics == []
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    (TEST_DIR / "stream").mkdir(exist_ok=True)
+    linter = Linter(_CMakeLintState())
+    small = peak_memory(TEST_DIR / "stream" / "small.cmake", 2000)
+    large = peak_memory(TEST_DIR / "stream" / "large.cmake", 20000)
+    assert large < small * 2
+
+
+# Inputs on which a single rule or phase used to take quadratic time, each
+# built from n repetitions of a piece.
+ADVERSARIAL = {
+    "commands_without_arguments": lambda n: "include()\n" * n,
+    "unterminated_commands": lambda n: "include(\n" * n,
+    "unterminated_standard_args": lambda n: "find_package_handle_standard_args(\n" * n,
+    "closing_parens": lambda n: ")\n" * n,
+    "pragmas": lambda n: "# lint_cmake: -whitespace/eol\nset(a b) \n" * n,
+    "pragmas_toggling": lambda n: "# lint_cmake: -linelength, +linelength\nset(A b)\n" * n,
+    "invalid_pragmas": lambda n: "# lint_cmake: -nope\n" * n,
+    "nested_pragma_blocks": lambda n: "# lint_cmake: push\n# lint_cmake: -whitespace/eol\nset(a b) \n" * n,
+    "disabled_lines": lambda n: "# lint_cmake: disable-next-line whitespace\nset(a b) \n" * n,
+    "long_logic_line": lambda n: "endif(" + "a" * (n * 10) + "\n",
+    "unterminated_quotes": lambda n: 'set(A "\n' * n,
+    "unterminated_brackets": lambda n: "set(A [[\n" * n,
+    "nested_parens": lambda n: "set(" * n + "\n" + ")" * n + "\n",
+    "nested_lines": lambda n: "if(\n" * n + ")\n" * n,
+}
+
+
+def lint_steps(linter, text):
+    """
+    Return the number of Python calls and lines run to lint text, which
+    unlike its duration does not depend on the load of the machine.
+    """
+    steps = 0
+
+    def trace(frame, event, arg):
+        nonlocal steps
+        steps += 1
+        return trace
+
+    saved = sys.gettrace()
+    sys.settrace(trace)
+    try:
+        linter.lint_text("FindFOO.cmake", text)
+    finally:
+        sys.settrace(saved)
+    return steps
+
+
+@pytest.mark.parametrize("name", sorted(ADVERSARIAL))
+def test_linear_time(name):
+    linter = Linter(_CMakeLintState())
+    # Fill the caches of the rules first.
+    linter.lint_text("FindFOO.cmake", ADVERSARIAL[name](1))
+    # 8 times the input takes 64 times more steps in quadratic time.
+    assert lint_steps(linter, ADVERSARIAL[name](4000)) < lint_steps(linter, ADVERSARIAL[name](500)) * 10
+
+
+def test_logic_check_regex_is_linear():
+    # The regular expressions run in C, out of reach of lint_steps(): each
+    # search must finish within a timeout that a backtracking one, which
+    # takes hours on these lines, cannot meet even on a loaded machine.
+    code = """
+from cmakelint.lint import _RE_LOGIC_CHECK
+for line in ["endif(" + "a" * 100000, "endif(" + "a " * 50000, "endif(a" + "(" * 100000, "a(" * 100000]:
+    _RE_LOGIC_CHECK.search(line)
+"""
+    subprocess.run([sys.executable, "-c", code], check=True, timeout=60)
+
+
+def test_adversarial_fuzz():
+    rng = random.Random(0)
+    pieces = [make(1) for make in ADVERSARIAL.values()] + ["set(A B)\n", "  endif(A)\n", "#[[\n", "]]\n", "(\n"]
+    (TEST_DIR / "stream").mkdir(exist_ok=True)
+    path = TEST_DIR / "stream" / "FindFUZZ.cmake"
+    linter = Linter(_CMakeLintState())
+    for _ in range(50):
+        path.write_text("".join(rng.choice(pieces) for _ in range(rng.randint(1, 40))))
+        assert linter.run_stream(str(path)) == linter.run_file(str(path))
+
+
+def test_threads():
+    samples = [TEST_DIR / "samples" / name / "CMakeLists.txt" for name in ["llvm", "opencv", "blender/src"]]
+    texts = [path.read_text() for path in samples] * 4
+    linter = Linter(_CMakeLintState())
+    expected = [linter.lint_text("CMakeLists.txt", text) for text in texts]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(lambda text: linter.lint_text("CMakeLists.txt", text), texts)) == expected
@@ -0,0 +1,158 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import io
+
+from cmakelint.lsp import read_message, serve, write_message
+from cmakelint.state import _CMakeLintState
+
+URI = "file:///project/CMakeLists.txt"
+
+
+class Client:
+    """
+    Runs the messages sent to it through a server, in process.
+    """
+
+    def __init__(self, config=None, encodings=()):
+        self.config = config or _CMakeLintState()
+        self.messages = []
+        self.request(1, "initialize", {"capabilities": {"general": {"positionEncodings": list(encodings)}}})
+        self.notify("initialized", {})
+
+    def request(self, id, method, params=None):
+        self.messages.append({"jsonrpc": "2.0", "id": id, "method": method, "params": params})
+
+    def notify(self, method, params):
+        self.messages.append({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def open(self, text, uri=URI, language_id="cmake"):
+        item = {"uri": uri, "languageId": language_id, "version": 1, "text": text}
+        self.notify("textDocument/didOpen", {"textDocument": item})
+
+    def change(self, version, *changes, uri=URI):
+        self.notify(
+            "textDocument/didChange", {"textDocument": {"uri": uri, "version": version}, "contentChanges": changes}
+        )
+
+    def run(self, shutdown=True):
+        if shutdown:
+            self.request(2, "shutdown")
+        self.notify("exit", None)
+        input = io.BytesIO()
+        for message in self.messages:
+            write_message(input, message)
+        input.seek(0)
+        output = io.BytesIO()
+        status = serve(self.config, input, output)
+        output.seek(0)
+        replies = []
+        while True:
+            message = read_message(output)
+            if message is None:
+                return status, replies
+            replies.append(message)
+
+
+def published(replies):
+    return [
+        [(diagnostic["range"]["start"]["line"], diagnostic["code"]) for diagnostic in message["params"]["diagnostics"]]
+        for message in replies
+        if message.get("method") == "textDocument/publishDiagnostics"
+    ]
+
+
+def change_range(start, end, text):
+    return {
+        "range": {"start": dict(zip(["line", "character"], start)), "end": dict(zip(["line", "character"], end))},
+        "text": text,
+    }
+
+
+def test_initialize():
+    status, replies = Client().run()
+    assert status == 0
+    assert replies[0]["id"] == 1
+    capabilities = replies[0]["result"]["capabilities"]
+    assert capabilities["positionEncoding"] == "utf-16"
+    assert capabilities["textDocumentSync"] == {"openClose": True, "change": 2}
+    assert replies[1] == {"jsonrpc": "2.0", "id": 2, "result": None}
+    status, replies = Client(encodings=["utf-8", "utf-32"]).run(shutdown=False)
+    assert status == 1
+    assert replies[0]["result"]["capabilities"]["positionEncoding"] == "utf-32"
+
+
+def test_diagnostics_follow_edits():
+    client = Client()
+    client.open("project(foo)\nif(A)\n  set(B c) \nendif()\n")
+    client.change(2, change_range((2, 10), (2, 11), ""))
+    client.change(3, change_range((0, 8), (0, 8), " "), change_range((3, 0), (3, 0), "\tSET(C)\n"))
+    client.change(4, {"text": ""})
+    client.notify("textDocument/didClose", {"textDocument": {"uri": URI}})
+    status, replies = client.run()
+    assert published(replies) == [
+        [(2, "whitespace/eol")],
+        [],
+        [(0, "whitespace/mismatch"), (3, "whitespace/tabs"), (3, "readability/mixedcase")],
+        [],
+        [],
+    ]
+    diagnostic = replies[1]["params"]["diagnostics"][0]
+    assert replies[1]["params"]["version"] == 1
+    assert diagnostic == {
+        "range": {"start": {"line": 2, "character": 0}, "end": {"line": 2, "character": 11}},
+        "severity": 2,
+        "code": "whitespace/eol",
+        "source": "cmakelint",
+        "message": "Line ends in whitespace",
+    }
+
+
+def test_position_encodings():
+    text = 'message("\U0001d11e") \n'
+    for encodings, column in [((), 13), (["utf-32"], 12)]:
+        client = Client(encodings=encodings)
+        client.open(text)
+        client.change(2, change_range((0, column), (0, column + 1), ""))
+        _, replies = client.run()
+        assert published(replies) == [[(0, "whitespace/eol")], []]
+        assert replies[1]["params"]["diagnostics"][0]["range"]["end"]["character"] == column + 1
+
+
+def test_filters_and_files():
+    config = _CMakeLintState()
+    config.set_filters("-whitespace/eol")
+    client = Client(config)
+    client.open("set(A) \n\tset(B)\n")
+    client.open("set(A) \n", uri="file:///project/main.cpp", language_id="cpp")
+    client.open("\tset(A)\n", uri="untitled:Untitled-1")
+    client.change(2, change_range((0, 0), (0, 0), " "), uri="file:///project/main.cpp")
+    _, replies = client.run()
+    assert published(replies) == [[(1, "whitespace/tabs")], [(0, "whitespace/tabs")]]
+
+
+def test_errors():
+    client = Client()
+    client.request(3, "textDocument/hover", {})
+    client.notify("$/cancelRequest", {"id": 3})
+    client.notify("textDocument/didChange", {"textDocument": {"uri": URI}})
+    _, replies = client.run()
+    assert replies[1] == {
+        "jsonrpc": "2.0",
+        "id": 3,
+        "error": {"code": -32601, "message": "Unknown method: textDocument/hover"},
+    }
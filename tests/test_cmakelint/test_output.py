@@ -0,0 +1,92 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+import cmakelint.output
+from cmakelint.lint import Diagnostic
+from cmakelint.output import JsonLinesSink, SarifSink, Sink, TextSink
+
+DIAGNOSTICS = [
+    Diagnostic("FindFoo.cmake", 0, "convention/filename", "Find modules should use uppercase names"),
+    Diagnostic("dir/CMakeLists.txt", 3, "whitespace/eol", 'Line ends in "whitespace"'),
+    Diagnostic("dir/CMakeLists.txt", 4, "acme/custom", "Not a builtin category"),
+]
+
+
+def write(sink_class):
+    stream = io.StringIO()
+    sink = sink_class(stream)
+    sink.start()
+    for diagnostic in DIAGNOSTICS:
+        sink.diagnostic(diagnostic)
+    sink.finish()
+    return stream.getvalue()
+
+
+def test_text():
+    assert write(TextSink) == "".join(f"{diagnostic}\n" for diagnostic in DIAGNOSTICS)
+
+
+def test_jsonl():
+    records = [json.loads(line) for line in write(JsonLinesSink).splitlines()]
+    assert records == [diagnostic._asdict() for diagnostic in DIAGNOSTICS]
+
+
+def test_sarif():
+    log = json.loads(write(SarifSink))
+    assert log["version"] == "2.1.0"
+    run = log["runs"][0]
+    rule_ids = [rule["id"] for rule in run["tool"]["driver"]["rules"]]
+    results = run["results"]
+    assert [result["ruleId"] for result in results] == [diagnostic.category for diagnostic in DIAGNOSTICS]
+    assert rule_ids[results[1]["ruleIndex"]] == "whitespace/eol"
+    assert "ruleIndex" not in results[2]
+    assert "region" not in results[0]["locations"][0]["physicalLocation"]
+    assert results[1]["locations"][0]["physicalLocation"] == {
+        "artifactLocation": {"uri": "dir/CMakeLists.txt"},
+        "region": {"startLine": 3},
+    }
+
+
+def test_sarif_empty():
+    stream = io.StringIO()
+    sink = SarifSink(stream)
+    sink.start()
+    sink.finish()
+    assert json.loads(stream.getvalue())["runs"][0]["results"] == []
+
+
+def test_incomplete_sink():
+    class NoDiagnosticSink(Sink):
+        pass
+
+    with pytest.raises(TypeError):
+        NoDiagnosticSink(io.StringIO())
+
+
+def test_buffering(monkeypatch):
+    monkeypatch.setattr(cmakelint.output, "_BUFFER_SIZE", 100)
+    stream = io.StringIO()
+    sink = TextSink(stream)
+    sink.diagnostic(DIAGNOSTICS[1])
+    assert stream.getvalue() == ""
+    sink.diagnostic(DIAGNOSTICS[1])
+    assert stream.getvalue() == f"{DIAGNOSTICS[1]}\n" * 2
@@ -0,0 +1,157 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+from cmakelint.lint import Diagnostic, Linter
+from cmakelint.pragmas import Pragmas, compile_pragmas
+from cmakelint.state import _CMakeLintState
+
+CATEGORIES = ["whitespace/eol", "whitespace/tabs", "linelength"]
+
+
+def lint(text, config=None):
+    config = _CMakeLintState() if config is None else config
+    return [(d.linenumber, d.category) for d in Linter(config).lint_text("CMakeLists.txt", text)]
+
+
+def test_compile_pragmas():
+    pragmas = compile_pragmas(
+        [
+            (1, "# lint_cmake: -whitespace"),
+            (3, "# lint_cmake: push"),
+            (4, "# lint_cmake: +whitespace/eol, -linelength"),
+            (6, "# lint_cmake: pop"),
+            (8, "# lint_cmake: disable-next-line whitespace/tabs, linelength"),
+        ],
+        CATEGORIES,
+    )
+    assert pragmas == Pragmas(
+        states=[
+            (-1, ("-whitespace",)),
+            (0, ("-whitespace",)),
+            (1, ("+whitespace/eol", "-linelength")),
+            (1, ("-whitespace/tabs", "-linelength")),
+        ],
+        transitions=[(1, 1), (4, 2), (6, 1), (9, 3), (10, 1)],
+        errors={},
+    )
+    assert [pragmas.state_at(linenumber) for linenumber in range(12)] == [0, 1, 1, 1, 2, 2, 1, 1, 1, 3, 1, 1]
+
+
+def test_compile_pragmas_errors():
+    pragmas = compile_pragmas(
+        [
+            (1, "# lint_cmake: pop"),
+            (2, "# lint_cmake: -whitespace/eol, bad"),
+            (3, "# lint_cmake: -nope"),
+            (4, "# lint_cmake: disable-next-line whitespace/nope"),
+            (5, "# lint_cmake: +whitespace/"),
+        ],
+        CATEGORIES,
+    )
+    assert pragmas.errors == {
+        1: "Pragma pop without a matching push",
+        2: "Filter should start with - or +",
+        3: "Filter not allowed: -nope",
+        4: "Filter not allowed: -whitespace/nope",
+    }
+
+
+def test_pragma_applies_to_whole_file():
+    text = "set(A B) \n# lint_cmake: -whitespace/eol\nset(C D) \n"
+    assert lint(text) == []
+
+
+def test_pragma_order():
+    # The last pragma of the file applies before the first one, each one
+    # from its line on.
+    text = "set(A B) \n# lint_cmake: -whitespace/eol\nset(C D) \n# lint_cmake: +whitespace/eol\nset(E F) \n"
+    assert lint(text) == [(1, "whitespace/eol"), (5, "whitespace/eol")]
+
+
+def test_push_pop():
+    text = (
+        "set(A B) \n"
+        "# lint_cmake: push\n"
+        "# lint_cmake: -whitespace/eol\n"
+        "set(C D) \n"
+        "# lint_cmake: pop\n"
+        "set(E F) \n"
+    )
+    assert lint(text) == [(1, "whitespace/eol"), (6, "whitespace/eol")]
+
+
+def test_nested_push_pop():
+    text = (
+        "# lint_cmake: push\n"
+        "# lint_cmake: -whitespace\n"
+        "# lint_cmake: push\n"
+        "# lint_cmake: +whitespace/tabs\n"
+        "\tset(A B) \n"
+        "# lint_cmake: pop\n"
+        "\tset(C D) \n"
+        "# lint_cmake: pop\n"
+        "\tset(E F) \n"
+    )
+    assert lint(text) == [(5, "whitespace/tabs"), (9, "whitespace/tabs"), (9, "whitespace/eol")]
+
+
+def test_disable_next_line():
+    text = (
+        "# lint_cmake: disable-next-line whitespace/eol\n"
+        "\tset(A B) \n"
+        "\tset(C D) \n"
+        "# lint_cmake: disable-next-line\n"
+        "\tset(E F) \n"
+    )
+    assert lint(text) == [(2, "whitespace/tabs"), (3, "whitespace/tabs"), (3, "whitespace/eol")]
+
+
+def test_disable_next_line_in_block():
+    text = (
+        "# lint_cmake: push\n"
+        "# lint_cmake: -whitespace/tabs\n"
+        "# lint_cmake: disable-next-line whitespace/eol\n"
+        "\tset(A B) \n"
+        "# lint_cmake: pop\n"
+        "\tset(C D) \n"
+    )
+    assert lint(text) == [(6, "whitespace/tabs"), (6, "whitespace/eol")]
+
+
+def test_pragma_errors_reported_once():
+    text = "# lint_cmake: -nope\n# lint_cmake: -whitespace/eol\nset(A B) \n# lint_cmake: pop\n"
+    assert lint(text) == [(1, "syntax"), (4, "syntax")]
+
+
+def test_configured_filters_come_first():
+    config = _CMakeLintState()
+    config.set_filters("-whitespace")
+    text = "# lint_cmake: push\n# lint_cmake: +whitespace/eol\n\tset(A B) \n# lint_cmake: pop\n\tset(C D) \n"
+    assert lint(text, config) == [(3, "whitespace/eol")]
+    assert config.filters == ["-whitespace"]
+
+
+def test_run_stream(tmp_path):
+    path = tmp_path / "CMakeLists.txt"
+    path.write_text(
+        "# lint_cmake: push\n# lint_cmake: -whitespace/eol\nset(A B) \n# lint_cmake: pop\n"
+        "# lint_cmake: disable-next-line\nset(C D) \nset(E F) \n"
+    )
+    linter = Linter(_CMakeLintState())
+    result = linter.run_stream(str(path))
+    assert result == linter.run_file(str(path))
+    assert result.filtered([]) == [Diagnostic(str(path), 7, "whitespace/eol", "Line ends in whitespace")]
@@ -0,0 +1,57 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import io
+
+from cmakelint.lint import Linter
+from cmakelint.profile import Profile
+from cmakelint.state import _CMakeLintState
+
+CODE = "project( foo)\n\tset(A B) \nif(A)\nendif(A)\n"
+
+
+def test_profile():
+    profile = Profile()
+    linter = Linter(_CMakeLintState(), profile)
+    diagnostics = linter.lint_text("FindFoo.cmake", CODE)
+    stats = profile.stats
+    # Only the lines flagged by the precheck go through the raw line checks.
+    assert stats["check_whitespace"] == [1, stats["check_whitespace"][1], 2]
+    assert stats["precheck"][0] == 1
+    assert stats["check_repeat_logic"][0] == 1
+    assert stats["check_command_spaces"][0] == 4
+    assert stats["package done"][2] == 2
+    assert stats["tokenize"][0] == 1
+    assert sum(stat[2] for stat in stats.values()) == len(diagnostics) - 1
+
+    other = Profile()
+    Linter(_CMakeLintState(), other).lint_text("FindFoo.cmake", CODE)
+    profile.merge(other.pop())
+    assert other.stats == {}
+    assert profile.stats["check_repeat_logic"][0] == 2
+
+    report = io.StringIO()
+    profile.report(report)
+    assert report.getvalue().splitlines()[0].split() == ["rule", "calls", "total", "ms", "mean", "us", "diagnostics"]
+
+
+def test_profile_off():
+    linter = Linter(_CMakeLintState())
+    assert linter.profile is None
+    assert linter.lint_text("CMakeLists.txt", CODE) == Linter(_CMakeLintState(), Profile()).lint_text(
+        "CMakeLists.txt", CODE
+    )
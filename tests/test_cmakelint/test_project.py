@@ -0,0 +1,110 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from cmakelint.lint import FileSummary, Linter
+from cmakelint.project import PROJECT_CATEGORIES, ProjectFile, analyze
+from cmakelint.state import _CMakeLintState
+
+from ..conftest import TEST_DIR
+
+SUMMARY = FileSummary((), 0, 0, (), ())
+
+
+def project(filename, summary=SUMMARY, categories=PROJECT_CATEGORIES):
+    return ProjectFile(filename, summary, frozenset(categories))
+
+
+def summarize(code):
+    return Linter(_CMakeLintState()).run_bytes("CMakeLists.txt", code.encode()).summary
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("", SUMMARY),
+        ("set(A B)\nSET(C D)\nset(E)\nSet(F)\n", FileSummary(("set",), 1, 2, (), ())),
+        (
+            "find_package(Foo REQUIRED)\nfind_package(\n  Bar)\ninclude(cmake/FindBaz.cmake)\n",
+            FileSummary(("find_package", "include"), 0, 3, ("Foo", "Bar"), ("cmake/FindBaz.cmake",)),
+        ),
+        (
+            'include("a")\nfind_package(${name})\n',
+            FileSummary(("find_package", "include"), 0, 2, ("${name}",), ('""',)),
+        ),
+        # Commands without arguments or left open have none.
+        ("find_package()\ninclude(\n", FileSummary(("find_package", "include"), 0, 2, (), ())),
+    ],
+)
+def test_summary(code, expected):
+    assert summarize(code) == expected
+
+
+def test_summary_streaming():
+    code = "FIND_PACKAGE(\n  Foo\n)\ninclude(FindBar)\n" * 3
+    (TEST_DIR / "project").mkdir(exist_ok=True)
+    path = TEST_DIR / "project" / "CMakeLists.txt"
+    path.write_text(code)
+    assert Linter(_CMakeLintState()).run_stream(str(path)).summary == summarize(code)
+
+
+def test_unused():
+    files = [
+        project("CMakeLists.txt", FileSummary((), 0, 0, ("foo",), ("cmake/FindBar.cmake", "FindQux"))),
+        project("cmake/FindFoo.cmake"),
+        project("cmake/FindBar.cmake"),
+        project("cmake/FindBaz.cmake"),
+        project("cmake/FindQux.cmake"),
+    ]
+    assert [str(diagnostic) for diagnostic in analyze(files)] == [
+        "cmake/FindBaz.cmake:0: Find module is not used by any find_package() or include() of the project"
+        " [project/unused]"
+    ]
+    # Any package may be used by a computed find_package().
+    files[0] = project("CMakeLists.txt", FileSummary((), 0, 0, ("${name}",), ()))
+    assert analyze(files) == []
+
+
+def test_duplicate():
+    files = [project("a/FindFoo.cmake"), project("b/findfoo.cmake"), project("c/FindBar.cmake")]
+    messages = [(diagnostic.filename, diagnostic.message) for diagnostic in analyze(files)]
+    assert ("a/FindFoo.cmake", "Find module is also defined in b/findfoo.cmake") in messages
+    assert ("b/findfoo.cmake", "Find module is also defined in a/FindFoo.cmake") in messages
+    assert all(filename != "c/FindBar.cmake" for filename, message in messages if "also defined" in message)
+
+
+def test_case():
+    lower = FileSummary(("set",), 0, 3, (), ())
+    upper = FileSummary(("set",), 2, 1, (), ())
+    files = [project("a.cmake", lower), project("b.cmake", upper), project("c.cmake", lower)]
+    assert [str(diagnostic) for diagnostic in analyze(files)] == [
+        "b.cmake:0: Commands are mostly upper case, most files of the project use lower case [project/case]"
+    ]
+    # No majority, no report.
+    assert analyze(files[:2]) == []
+
+
+def test_categories():
+    upper = FileSummary(("set",), 1, 0, (), ())
+    lower = FileSummary(("set",), 0, 1, (), ())
+    files = [
+        project("a/FindFoo.cmake", upper, ["project/unused"]),
+        project("b.cmake", lower),
+        project("c.cmake", lower),
+    ]
+    assert [diagnostic.category for diagnostic in analyze(files)] == ["project/unused"]
@@ -0,0 +1,103 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+import cmakelint.rules
+from cmakelint.lint import CleansedLines, Linter, process_line
+from cmakelint.rules import COMMAND, LINE, LOGIC, RULES, Registry, discover_plugins, register_categories
+from cmakelint.state import _CMakeLintState
+
+RULES_SPEC = [
+    ("line", [LINE], None),
+    ("command", [COMMAND], None),
+    ("include", ["INCLUDE"], None),
+    ("logic", [LOGIC], None),
+    ("find", ["include"], lambda filename: filename.startswith("Find")),
+]
+
+
+def run_rules(filename, code):
+    calls = []
+    registry = Registry()
+    for name, subscriptions, files in RULES_SPEC:
+        check = lambda filename, linenumber, clean_lines, errors, name=name: calls.append((name, linenumber))
+        registry.register(check, [], subscriptions, files)
+    clean_lines = CleansedLines(code.split("\n"))
+    for linenumber in clean_lines.line_numbers():
+        process_line(filename, linenumber, clean_lines, lambda *args: None, registry.dispatcher(filename))
+    return calls
+
+
+def test_dispatch():
+    code = "set(A)\n\ninclude(B)\nendif()"
+    assert run_rules("CMakeLists.txt", code) == [
+        ("line", 0),
+        ("command", 0),
+        ("line", 1),
+        ("line", 2),
+        ("command", 2),
+        ("include", 2),
+        ("line", 3),
+        ("command", 3),
+        ("logic", 3),
+    ]
+    assert ("find", 2) in run_rules("FindFOO.cmake", code)
+    assert ("find", 2) not in run_rules("foo.cmake", code)
+
+
+def test_register_categories(monkeypatch):
+    monkeypatch.setattr(cmakelint.rules, "ERROR_CATEGORIES", "        linelength\n        syntax\n")
+    register_categories(["acme/custom", "syntax"])
+    assert cmakelint.rules.ERROR_CATEGORIES == "        acme/custom\n        linelength\n        syntax\n"
+
+
+class FakeEntryPoint:
+    def __init__(self, name):
+        self.name = name
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        RULES.register(check_no_custom_command, [self.name], ["add_custom_command"])
+
+
+def check_no_custom_command(filename, linenumber, clean_lines, errors):
+    errors(filename, linenumber, "acme/custom", "Do not use add_custom_command")
+
+
+def test_plugins(monkeypatch):
+    entry_point = FakeEntryPoint("acme/custom")
+    monkeypatch.setattr(cmakelint.rules, "ERROR_CATEGORIES", cmakelint.rules.ERROR_CATEGORIES)
+    monkeypatch.setattr(cmakelint.rules, "_entry_points", lambda: [entry_point])
+    monkeypatch.setattr(cmakelint.rules, "_LOADED_PLUGINS", set())
+    monkeypatch.setattr(RULES, "rules", list(RULES.rules))
+    monkeypatch.setattr(RULES, "_dispatchers", {})
+
+    config = _CMakeLintState()
+    config.set_plugins(discover_plugins())
+    assert "acme/custom" in cmakelint.rules.ERROR_CATEGORIES.split()
+    config.set_filters("-acme")
+    code = "set(A)\nadd_custom_command(B)\n"
+    assert Linter(config).lint_text("CMakeLists.txt", code) == []
+    assert entry_point.loads == 0
+
+    config = _CMakeLintState()
+    config.set_plugins(discover_plugins())
+    assert [str(d) for d in Linter(config).lint_text("CMakeLists.txt", code)] == [
+        "CMakeLists.txt:2: Do not use add_custom_command [acme/custom]"
+    ]
+    Linter(config)
+    assert entry_point.loads == 1
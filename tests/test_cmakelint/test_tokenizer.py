@@ -0,0 +1,56 @@
+"""
+Copyright 2009 Richard Quirk
+Copyright 2023 Nyakku Shigure, PaddlePaddle Authors
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not
+use this file except in compliance with the License. You may obtain a copy of
+the License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+License for the specific language governing permissions and limitations under
+the License.
+"""
+
+from __future__ import annotations
+
+from cmakelint.tokenizer import find_logic_keyword, tokenize
+
+
+def test_command_token():
+    commands, _ = tokenize(["", "  set (A B)", ""])
+    assert commands[0] is None
+    token = commands[1]
+    assert token.name == "set"
+    assert (token.name_start, token.name_end) == (2, 5)
+    assert token.spaces_before_paren == 1
+    assert token.open_column == 6
+    assert token.first_close == (1, 10)
+    assert token.close == (1, 10)
+
+
+def test_command_token_closes():
+    lines = ["", "foo(A (B", "C) D", ")", ""]
+    token = tokenize(lines)[0][1]
+    assert token.first_close == (2, 1)
+    assert token.close == (3, 0)
+    assert [lines[n][s:e] for n, s, e in token.arguments(lines)] == ["A", "B", "C", "D"]
+
+
+def test_command_token_unclosed():
+    lines = ["", "foo(A", "B"]
+    token = tokenize(lines)[0][1]
+    assert token.first_close is None
+    assert token.close is None
+    assert [lines[n][s:e] for n, s, e in token.arguments(lines)] == ["A", "B"]
+
+
+def test_find_logic_keyword():
+    assert find_logic_keyword("ENDIF()") == "endif"
+    assert find_logic_keyword("else(foo) endif()") == "else"
+    assert find_logic_keyword("endiffy()") is None
+    assert find_logic_keyword("set(A B)") is None
+    # str.lower() turns this into "i" and a combining dot, a word boundary.
+    assert find_logic_keyword("İendif()") == "endif"
+    assert tokenize(["", "  endif()", ""])[1] == {1: "endif"}